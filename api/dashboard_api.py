@@ -1,27 +1,83 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 from database.models import SessionLocal, FaceAttendance
 from datetime import datetime, timedelta
+import csv
+import io
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+FIELDS = ('id', 'person_id', 'in_time', 'out_time', 'duration_seconds', 'confidence')
+STREAM_BATCH = 1000
+
+
+def _to_dict(record):
+    return {
+        'id': record.id,
+        'person_id': record.person_id,
+        'in_time': record.in_time.isoformat() if record.in_time else None,
+        'out_time': record.out_time.isoformat() if record.out_time else None,
+        'duration_seconds': record.duration_seconds,
+        'confidence': record.confidence
+    }
+
+
+def _stream(fmt):
+    """Yield the whole table in id order, STREAM_BATCH ORM rows at a time"""
+    db = SessionLocal()
+    try:
+        records = db.query(FaceAttendance).order_by(FaceAttendance.id).yield_per(STREAM_BATCH)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if fmt == 'csv':
+            writer.writerow(FIELDS)
+
+        for count, record in enumerate(records, 1):
+            row = _to_dict(record)
+            if fmt == 'csv':
+                writer.writerow([row[f] for f in FIELDS])
+            else:
+                out.write(json.dumps(row) + "\n")
+            if count % STREAM_BATCH == 0:
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+        yield out.getvalue()
+    finally:
+        db.close()
+
+
 @app.route('/api/attendance', methods=['GET'])
 def get_attendance():
+    """
+    All sessions. ?after_id=&limit= returns one keyset page
+    ({"records", "next_after_id"}); ?format=ndjson|csv streams everything.
+    """
+    fmt = request.args.get('format')
+    if fmt in ('ndjson', 'csv'):
+        mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'text/csv'
+        return Response(stream_with_context(_stream(fmt)), mimetype=mimetype)
+
     db = SessionLocal()
     try:
+        if 'after_id' in request.args or 'limit' in request.args:
+            after_id = request.args.get('after_id', 0, type=int)
+            limit = min(request.args.get('limit', 1000, type=int), 10000)
+            records = db.query(FaceAttendance).filter(
+                FaceAttendance.id > after_id
+            ).order_by(FaceAttendance.id).limit(limit).all()
+            return jsonify({
+                'records': [_to_dict(r) for r in records],
+                'next_after_id': records[-1].id if len(records) == limit else None
+            })
+
         records = db.query(FaceAttendance).all()
         result = []
         for record in records:
-            result.append({
-                'id': record.id,
-                'person_id': record.person_id,
-                'in_time': record.in_time.isoformat() if record.in_time else None,
-                'out_time': record.out_time.isoformat() if record.out_time else None,
-                'duration_seconds': record.duration_seconds,
-                'confidence': record.confidence
-            })
+            result.append(_to_dict(record))
         return jsonify(result)
     except Exception as e:
         logger.error(f"API error: {e}")
@@ -37,17 +93,10 @@ def get_today_attendance():
         records = db.query(FaceAttendance).filter(
             FaceAttendance.date == today
         ).all()
-        
+
         result = []
         for record in records:
-            result.append({
-                'id': record.id,
-                'person_id': record.person_id,
-                'in_time': record.in_time.isoformat() if record.in_time else None,
-                'out_time': record.out_time.isoformat() if record.out_time else None,
-                'duration_seconds': record.duration_seconds,
-                'confidence': record.confidence
-            })
+            result.append(_to_dict(record))
         return jsonify(result)
     except Exception as e:
         logger.error(f"API error: {e}")
@@ -56,4 +105,4 @@ def get_today_attendance():
         db.close()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -5,6 +5,8 @@ Reads data from CSV logs, state manager, and database.
 import csv
 import os
 import pickle
+import sqlite3
+import threading
 from datetime import datetime, time as dt_time, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -15,60 +17,244 @@ BASE_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
 from attendance.state.state_manager import StateManager
+from database.retention import read_archived, archived_months
+from database.worker_registry import WorkerRegistry
+
+# Field order of the tuples yielded by AttendanceDataReader.iter_attendance_rows
+RECORD_FIELDS = ('person_id', 'date', 'in_time', 'out_time', 'duration_sec', 'confidence', 'is_active')
+
+# Formatting done by SQLite on the stored text (YYYY-MM-DD HH:MM:SS.ffffff)
+_RECORD_COLUMNS = (
+    "id, person_id, COALESCE(substr(date, 1, 10), ''), COALESCE(substr(in_time, 12, 8), ''), "
+    "substr(out_time, 12, 8), COALESCE(duration_seconds, 0), COALESCE(confidence, 0.0), out_time IS NULL"
+)
+_RECORD_SQL = f"SELECT {_RECORD_COLUMNS} FROM face_attendance"
+
+
+def summarise_sessions(records: Optional[List[Dict]]) -> Optional[Dict]:
+    """
+    One worker's day from their RECORD_FIELDS dicts (None if there are none):
+    what the worker stats, status badges and dashboard metrics are built from.
+    """
+    if not records:
+        return None
+    active = [r for r in records if r['out_time'] is None]
+    closed = [r for r in records if r['out_time']]
+    latest = max(records, key=lambda r: r['out_time'] or r['in_time'])
+    confidences = [r['confidence'] for r in records if r.get('confidence', 0) > 0]
+    return {
+        'state': 'IN' if active else 'OUT',
+        'in_time': max(r['in_time'] for r in active) if active else None,
+        'last_seen': latest['out_time'] or latest['in_time'],
+        'confidence': latest['confidence'],
+        'sessions': len(records),
+        'total_sec': sum(r['duration_sec'] for r in records),
+        'present': bool(active) or any(r['duration_sec'] > 0 for r in records),
+        'first_in': min(r['in_time'] for r in records),
+        'last_out': max(r['out_time'] for r in closed) if closed else None,
+        'in_times': sorted(r['in_time'] for r in records if r['in_time']),
+        'confidence_sum': sum(confidences),
+        'confidence_count': len(confidences)
+    }
 
 
 class AttendanceDataReader:
     """Reads attendance data from various sources"""
     
-    def __init__(self, base_path: str = None):
+    def __init__(self, base_path: str = None, session_factory=None):
         self.base_path = Path(base_path) if base_path else BASE_DIR
         self.csv_path = self.base_path / "attendance_log.csv"
         self.known_faces_path = self.base_path / "data" / "known_faces"
         self.embeddings_path = self.base_path / "data" / "embeddings.pkl"
+        # Monthly files written by database.retention.archive_sessions
+        self.archive_path = self.base_path / "data" / "archive"
+        # Defaults to database.models.SessionLocal (the live DB)
+        self.session_factory = session_factory
+        # One read-only sqlite3 connection per API worker thread, reused across requests
+        self._local = threading.local()
+        self._schema_ready = False
+        # Distinct-worker counts of closed days (never change unless the rows do)
+        self._daily_cache = {}
+        self._daily_workers = None     # registered workers the cache was computed for
+        self._daily_cursor = 0         # change_seq the cache is current with
+        self._daily_lock = threading.Lock()
+        self.registry = WorkerRegistry(self.known_faces_path, session_factory)
+
+    def _session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        from database.models import SessionLocal
+        return SessionLocal()
+
+    def _db_path(self) -> str:
+        if self.session_factory is not None:
+            return self.session_factory.kw["bind"].url.database
+        from database.models import engine
+        return engine.url.database
         
     def get_registered_workers(self) -> List[str]:
-        """Get list of all registered worker IDs from known_faces directory"""
-        workers = []
-        if self.known_faces_path.exists():
-            for item in self.known_faces_path.iterdir():
-                if item.is_dir():
-                    workers.append(item.name)
-        return sorted(workers)
+        """Get list of all registered worker IDs (cached registry of known_faces)"""
+        return self.registry.worker_ids()
     
-    def read_attendance_log(self) -> List[Dict]:
-        """Read all attendance records from Database"""
-        from database.models import SessionLocal, FaceAttendance
-        db = SessionLocal()
-        records = []
+    def _connect(self):
+        """This thread's read-only raw connection to the attendance DB"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self, check_same_thread: bool = True):
+        uri = Path(self._db_path()).resolve().as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+
+    def _ensure_schema(self):
+        """Indexes and change tracking the raw read paths rely on (once per reader)"""
+        if self._schema_ready:
+            return
+        from database.models import upgrade_schema
+        db = self._session()
         try:
-            db_records = db.query(FaceAttendance).all()
-            for row in db_records:
-                records.append({
-                    'person_id': row.person_id,
-                    'date': row.date.strftime("%Y-%m-%d") if row.date else "",
-                    'in_time': row.in_time.strftime("%H:%M:%S") if row.in_time else "",
-                    'out_time': row.out_time.strftime("%H:%M:%S") if row.out_time else None,
-                    'duration_sec': row.duration_seconds if row.duration_seconds is not None else 0,
-                    'confidence': row.confidence if row.confidence else 0.0,
-                    'is_active': row.out_time is None # Flag to identify active sessions
-                })
-        except Exception as e:
-            print(f"Error reading DB: {e}")
+            upgrade_schema(db.get_bind())
         finally:
             db.close()
-            
-        return records
+        self._schema_ready = True
+
+    @staticmethod
+    def _date_filter(start_date: str = None, end_date: str = None):
+        where, params = [], []
+        if start_date:
+            where.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            where.append("date < ?")
+            params.append((datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d"))
+        return where, params
+
+    def iter_attendance_rows(self, start_date: str = None, end_date: str = None, batch_size: int = 5000,
+                             with_ids: bool = False):
+        """
+        Stream attendance records as RECORD_FIELDS tuples (dates YYYY-MM-DD,
+        None = unbounded), led by the row id if with_ids. Read-only raw
+        sqlite3, no ORM objects, memory bounded by batch_size; archived months
+        overlapping the range follow the hot table.
+
+        The generator owns its connection: a StreamingResponse resumes it on
+        whichever threadpool thread is free. Errors are raised, not logged, so
+        a broken stream is aborted instead of ending early with a 200.
+        """
+        where, params = self._date_filter(start_date, end_date)
+        sql = _RECORD_SQL + (" WHERE " + " AND ".join(where) if where else "")
+
+        months = [
+            m for m in archived_months(self.archive_path)
+            if (not start_date or m >= start_date[:7]) and (not end_date or m <= end_date[:7])
+        ]
+
+        # Ids of the streamed hot rows dated inside an archived month. The
+        # archive cutoff is a day, so the newest archived month normally has
+        # rows still in the hot table; an interrupted archive run leaves rows
+        # in both places. Archived rows with these ids are skipped.
+        archive_end = ""
+        if months:
+            year, month = map(int, months[-1].split("-"))
+            archive_end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+
+        first = 0 if with_ids else 1
+        overlap_ids = set()
+        conn = self._open(check_same_thread=False)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    if row[2] < archive_end:
+                        overlap_ids.add(row[0])
+                    yield row[first:7] + (row[7] == 1,)
+        finally:
+            conn.close()
+
+        for row in read_archived(self.archive_path, start_date, end_date):
+            if row['id'] in overlap_ids:
+                continue  # archived but not yet deleted from the hot table
+            yield (row['id'],) * with_ids + (
+                row['person_id'],
+                row['date'][:10],
+                row['in_time'][11:19] if row['in_time'] else "",
+                row['out_time'][11:19] if row['out_time'] else None,
+                row['duration_seconds'] if row['duration_seconds'] is not None else 0,
+                row['confidence'] if row['confidence'] else 0.0,
+                row['out_time'] is None
+            )
+
+    def read_attendance_page(self, after_id: int = 0, limit: int = 1000,
+                             start_date: str = None, end_date: str = None) -> Dict:
+        """
+        Keyset page of the live table in id order: records with id > after_id.
+        Pass next_after_id back for the following page (None on the last one).
+        Archived months are only reachable through iter_attendance_rows.
+        """
+        where, params = self._date_filter(start_date, end_date)
+        where.append("id > ?")
+        params.append(after_id or 0)
+        sql = _RECORD_SQL + " WHERE " + " AND ".join(where) + " ORDER BY id LIMIT ?"
+
+        rows = self._connect().execute(sql, params + [limit]).fetchall()
+
+        return {
+            'records': [dict(zip(('id',) + RECORD_FIELDS, row[:7] + (row[7] == 1,))) for row in rows],
+            'next_after_id': rows[-1][0] if len(rows) == limit else None
+        }
+
+    def change_cursor(self) -> int:
+        """Current value of the face_attendance change counter"""
+        self._ensure_schema()
+        return self._connect().execute("SELECT seq FROM change_counter WHERE id = 1").fetchone()[0]
+
+    def read_changes(self, since: int = 0, limit: int = 5000) -> Dict:
+        """
+        Sessions inserted or updated (opened / closed) after change cursor
+        `since`, oldest change first, each with its id so clients can upsert.
+        Pass the returned cursor back on the next poll; has_more means call
+        again straight away. Rows removed by archiving are not reported.
+        """
+        self._ensure_schema()
+        rows = self._connect().execute(
+            f"SELECT {_RECORD_COLUMNS}, change_seq FROM face_attendance "
+            "WHERE change_seq > ? ORDER BY change_seq LIMIT ?",
+            (since or 0, limit)
+        ).fetchall()
+
+        return {
+            'records': [dict(zip(('id',) + RECORD_FIELDS, row[:7] + (row[7] == 1,))) for row in rows],
+            # Taken from the rows, not change_counter, so a commit landing between
+            # this query and the next poll can't be skipped
+            'cursor': rows[-1][8] if rows else (since or 0),
+            'has_more': len(rows) == limit
+        }
+
+    def read_attendance_log(self, start_date: str = None, end_date: str = None) -> List[Dict]:
+        """
+        Read attendance records from Database, plus archived months when the
+        range reaches past the hot table (dates YYYY-MM-DD, None = unbounded)
+        """
+        try:
+            return [dict(zip(RECORD_FIELDS, row)) for row in self.iter_attendance_rows(start_date, end_date)]
+        except Exception as e:
+            print(f"Error reading DB: {e}")
+            return []
     
     def get_today_records(self) -> List[Dict]:
         """Get attendance records for today only"""
         today = datetime.now().strftime("%Y-%m-%d")
-        all_records = self.read_attendance_log()
-        return [r for r in all_records if r['date'] == today]
+        return self.read_attendance_log(today, today)
     
     def get_system_settings(self) -> Dict[str, str]:
         """Fetch system settings from database"""
-        from database.models import SessionLocal, SystemSettings
-        db = SessionLocal()
+        from database.models import SystemSettings
+        db = self._session()
         settings = {}
         try:
             results = db.query(SystemSettings).all()
@@ -89,10 +275,36 @@ class AttendanceDataReader:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
             
-        all_records = self.read_attendance_log()
-        worker_records = [r for r in all_records if r['person_id'] == worker_id and r['date'] == date]
-        
+        day_records = self.read_attendance_log(date, date)
+        worker_records = [r for r in day_records if r['person_id'] == worker_id]
+        return self._worker_stats(worker_id, date, worker_records, self.get_system_settings())
+
+    def get_all_worker_stats(self, workers: List[str], date: str = None,
+                             summaries: Dict[str, Dict] = None) -> Dict[str, Dict]:
+        """
+        get_worker_stats for many workers from one read of the day's records,
+        or from summarise_sessions() results already at hand (`summaries`)
+        """
+        if date is None:
+            date = datetime.now().strftime("%Y-%m-%d")
+
+        if summaries is None:
+            by_worker = {}
+            for record in self.read_attendance_log(date, date):
+                by_worker.setdefault(record['person_id'], []).append(record)
+            summaries = {worker_id: summarise_sessions(by_worker.get(worker_id)) for worker_id in workers}
+
         settings = self.get_system_settings()
+        return {
+            worker_id: self._summary_stats(worker_id, date, summaries.get(worker_id), settings)
+            for worker_id in workers
+        }
+
+    def _worker_stats(self, worker_id: str, date: str, worker_records: List[Dict], settings: Dict) -> Dict:
+        return self._summary_stats(worker_id, date, summarise_sessions(worker_records), settings)
+
+    @staticmethod
+    def _summary_stats(worker_id: str, date: str, summary: Optional[Dict], settings: Dict) -> Dict:
         start_time_limit = datetime.strptime(f"{date} {settings['work_start_time']}", "%Y-%m-%d %H:%M")
         end_time_limit = datetime.strptime(f"{date} {settings['work_end_time']}", "%Y-%m-%d %H:%M")
 
@@ -100,7 +312,7 @@ class AttendanceDataReader:
         is_late = False
         left_early = False
         
-        if not worker_records:
+        if summary is None:
             return {
                 'worker_id': worker_id,
                 'date': date,
@@ -115,17 +327,14 @@ class AttendanceDataReader:
                 'left_early': False
             }
         
-        total_duration = sum(r['duration_sec'] for r in worker_records)
-        first_seen_str = min(worker_records, key=lambda x: x['in_time'])['in_time']
-        
-        # Handle out_time safely (active sessions have None)
-        completed_sessions = [r for r in worker_records if r['out_time']]
-        active_sessions = [r for r in worker_records if r['out_time'] is None]
+        total_duration = summary['total_sec']
+        first_seen_str = summary['first_in']
+        active = summary['state'] == 'IN'
         
-        if completed_sessions:
-            last_seen_str = max(completed_sessions, key=lambda x: x['out_time'])['out_time']
-        elif active_sessions:
-            last_seen_str = active_sessions[0]['in_time'] # Use in_time if currently active
+        if summary['last_out']:
+            last_seen_str = summary['last_out']
+        elif active:
+            last_seen_str = summary['in_time'] # Use in_time if currently active
         else:
             last_seen_str = first_seen_str # Fallback
 
@@ -137,7 +346,7 @@ class AttendanceDataReader:
             
         # LOGIC: LEFT EARLY
         # If currently active, they haven't left.
-        if active_sessions:
+        if active:
             left_early = False
         else:
             try:
@@ -148,11 +357,11 @@ class AttendanceDataReader:
                 left_early = False
             
         # Refine Status
-        if total_duration > 0 or active_sessions:
+        if summary['present']:
             status = 'present'
             if is_late: status += ' (Late)'
             if left_early: status += ' (Early Leave)'
-            if active_sessions: status += ' (Active)'
+            if active: status += ' (Active)'
         
         hours = int(total_duration // 3600)
         minutes = int((total_duration % 3600) // 60)
@@ -165,7 +374,7 @@ class AttendanceDataReader:
             'total_minutes': int(total_duration / 60),
             'first_seen': first_seen_str,
             'last_seen': last_seen_str,
-            'num_sessions': len(worker_records),
+            'num_sessions': summary['sessions'],
             'status': status,
             'is_late': is_late,
             'left_early': left_early
@@ -177,8 +386,7 @@ class AttendanceDataReader:
             date = datetime.now().strftime("%Y-%m-%d")
             
         workers = self.get_registered_workers()
-        all_records = self.read_attendance_log()
-        day_records = [r for r in all_records if r['date'] == date]
+        day_records = self.read_attendance_log(date, date)
         
         # Define hourly slots (9 AM to 10 PM)
         time_slots = []
@@ -242,6 +450,11 @@ class AttendanceDataReader:
             
         return hour
     
+    def _calculate_overlap(self, start: float, end: float, slot_start: int, slot_end: int) -> int:
+        """Minutes of [start, end] (decimal hours) that fall inside the hour slot"""
+        overlap = min(end, slot_end) - max(start, slot_start)
+        return int(round(overlap * 60)) if overlap > 0 else 0
+
     def _parse_hms(self, time_str: str) -> Optional[float]:
         """Parse HH:MM:SS to decimal hours"""
         try:
@@ -251,62 +464,82 @@ class AttendanceDataReader:
             return None
     
     def get_daily_occupancy(self, days: int = 30) -> List[Dict]:
-        """Get daily unique worker counts for the last N days"""
-        all_records = self.read_attendance_log()
-        registered_workers = set(self.get_registered_workers())
-        
-        # Group by date
-        daily_counts = {}
+        """
+        Get daily unique worker counts for the last N days.
+        Closed days are cached; each call re-counts today plus any day whose
+        rows changed since the last call (change_seq), and only registered
+        workers count (excludes test data/unknowns).
+        """
+        self._ensure_schema()
+        registered_workers = self.get_registered_workers()
         today = datetime.now().date()
         start_date = today - timedelta(days=days)
-        
-        # Initialize all dates in range with 0
-        current = start_date
-        while current <= today:
-            d_str = current.strftime("%Y-%m-%d")
-            daily_counts[d_str] = set()
-            current += timedelta(days=1)
-            
-        for r in all_records:
-            date_str = r['date']
-            person_id = r['person_id']
-            # Only count if within range AND is a registered worker (exclude test data/unknowns)
-            if date_str in daily_counts and person_id and person_id in registered_workers:
-                daily_counts[date_str].add(person_id)
-                
-        # Format for frontend
-        result = []
-        for date_str, workers in daily_counts.items():
-            result.append({
-                "date": date_str,
-                "count": len(workers)
-            })
-            
-        return sorted(result, key=lambda x: x['date'])
 
+        with self._daily_lock:
+            conn = self._connect()
+            workers_key = frozenset(registered_workers)
+            if workers_key != self._daily_workers:
+                self._daily_cache.clear()
+                self._daily_workers = workers_key
 
-class UnknownPersonTracker:
-    """Track unknown person detections"""
-    
-    def __init__(self):
-        self.unknown_detections = []
-    
-    def add_detection(self, snapshot_path: str, confidence: float = 0.0):
-        """Add a new unknown person detection"""
-        detection = {
-            'id': f'UNK-{len(self.unknown_detections) + 1:03d}',
-            'timestamp': datetime.now().strftime("%I:%M %p"),
-            'snapshot_path': snapshot_path,
-            'confidence': int(confidence * 100) if confidence > 0 else 85,
-            'location': 'Camera Feed'
-        }
-        self.unknown_detections.append(detection)
-        return detection
-    
-    def get_all(self) -> List[Dict]:
-        """Get all unknown detections"""
-        return self.unknown_detections
-    
-    def clear(self):
-        """Clear all detections"""
-        self.unknown_detections.clear()
+            cursor = conn.execute("SELECT seq FROM change_counter WHERE id = 1").fetchone()[0]
+            if not self._daily_cache:
+                self._daily_cursor = cursor
+            elif cursor != self._daily_cursor:
+                for (day,) in conn.execute(
+                    "SELECT DISTINCT substr(date, 1, 10) FROM face_attendance WHERE change_seq > ?",
+                    (self._daily_cursor,)
+                ):
+                    self._daily_cache.pop(day, None)
+                self._daily_cursor = cursor
+
+            closed_days = [
+                (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
+                for i in range((today - start_date).days)
+            ]
+            missing = [d for d in closed_days if d not in self._daily_cache]
+            if missing:
+                counts = self._count_daily(missing[0], missing[-1], registered_workers)
+                for d in missing:
+                    self._daily_cache[d] = counts.get(d, 0)
+
+            today_str = today.strftime("%Y-%m-%d")
+            today_count = self._count_daily(today_str, today_str, registered_workers).get(today_str, 0)
+
+            result = [{"date": d, "count": self._daily_cache[d]} for d in closed_days]
+        result.append({"date": today_str, "count": today_count})
+        return result
+
+    def _count_daily(self, start_date: str, end_date: str, workers: List[str]) -> Dict[str, int]:
+        """{YYYY-MM-DD: distinct workers seen} for start_date..end_date, hot table + archive"""
+        if not workers:
+            return {}
+        where, params = self._date_filter(start_date, end_date)
+        placeholders = ", ".join("?" * len(workers))
+        # GROUP BY the stored value (midnight of the day) so the (date, person_id)
+        # index covers the whole query
+        rows = self._connect().execute(
+            f"SELECT date, COUNT(DISTINCT person_id) FROM face_attendance "
+            f"WHERE {' AND '.join(where)} AND person_id IN ({placeholders}) GROUP BY date",
+            params + list(workers)
+        ).fetchall()
+        counts = {date[:10]: count for date, count in rows}
+
+        # Archived months: only reached for closed days missing from the cache
+        if any(start_date[:7] <= m <= end_date[:7] for m in archived_months(self.archive_path)):
+            workers = set(workers)
+            archived = {}
+            for row in read_archived(self.archive_path, start_date, end_date):
+                if row['person_id'] in workers:
+                    archived.setdefault(row['date'][:10], set()).add(row['person_id'])
+            for day, people in archived.items():
+                if counts.get(day):
+                    # Left in both places by an interrupted archive run
+                    people |= {
+                        person_id for (person_id,) in self._connect().execute(
+                            "SELECT DISTINCT person_id FROM face_attendance WHERE date >= ? AND date < ?",
+                            self._date_filter(day, day)[1]
+                        )
+                    } & workers
+                counts[day] = len(people)
+        return counts
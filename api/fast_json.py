@@ -0,0 +1,26 @@
+"""
+JSON responses for large payloads. Uses orjson when it is installed
+(optional, ~10x faster) and compact stdlib json otherwise. Returning a
+FastJSONResponse directly also skips FastAPI's jsonable_encoder pass.
+"""
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,186 @@
+"""
+Live tracker state held in the API process, fed by the tracker's event bus
+(utils.event_bus). Lets read endpoints answer "is the system up / how many
+are inside / who is here" from memory instead of the heartbeat file or SQLite.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class PresenceIndex:
+    """
+    Today's sessions per worker, in the RECORD_FIELDS dict shape the data
+    reader returns, with a summarise_sessions() summary cached per worker so
+    status badges and metrics are lookups, not scans.
+
+    Sessions are keyed by face_attendance row id. Check-in / check-out events
+    update the index as they happen (a closed session is never reopened by a
+    late event). sync() keeps it exact against the DB: it records the change
+    cursor it is current with and, when the cursor has moved, pulls the
+    changed rows (read_changes), so writes that never produced an event
+    (compaction, manual edits, another writer) show up as well. The DB copy
+    of a row always wins.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.day = None          # YYYY-MM-DD the index holds
+        self.cursor = None       # change cursor the index is current with
+        self.version = 0         # bumped on every change
+        self._sessions = {}      # worker -> {row id: record}
+        self._owner = {}         # row id -> worker
+        self._summary = {}       # worker -> summarise_sessions() of their sessions
+
+    def invalidate(self):
+        """Rebuild from the DB on the next sync (events were lost)"""
+        with self._lock:
+            self.day = None
+
+    def sync(self, reader, day: str):
+        """Bring the index up to the DB's change cursor for `day` (reader: AttendanceDataReader)"""
+        with self._sync_lock:
+            cursor = reader.change_cursor()
+            if self.day != day:
+                records, after_id = [], 0
+                while after_id is not None:
+                    page = reader.read_attendance_page(after_id, 10000, day, day)
+                    records.extend(page['records'])
+                    after_id = page['next_after_id']
+                self.load(records, day, cursor)
+                return
+            while self.cursor < cursor:
+                changes = reader.read_changes(self.cursor)
+                with self._lock:
+                    for record in changes['records']:
+                        self._store(record, authoritative=True)
+                    self.cursor = changes['cursor']
+                    self.version += 1
+                if not changes['has_more']:
+                    # Anything newer is picked up by the next sync
+                    self.cursor = max(self.cursor, cursor)
+                    break
+
+    def load(self, records: List[Dict], day: str, cursor: int = 0):
+        """Replace the index with the day's records (each with its row id)"""
+        with self._lock:
+            self.day = day
+            self.cursor = cursor
+            self._sessions, self._owner, self._summary = {}, {}, {}
+            for record in records:
+                self._store(record, authoritative=True)
+            self.version += 1
+
+    def _store(self, record, authoritative):
+        record = dict(record)
+        row_id = record['id']
+        worker_id = record['person_id']
+        previous = self._owner.get(row_id)
+        if previous is not None and previous != worker_id:
+            # Row moved to another worker (edited): drop it from the old one
+            del self._sessions[previous][row_id]
+            self._summarise(previous)
+        if record['date'] != self.day:
+            if previous == worker_id:
+                del self._sessions[worker_id][row_id]
+                self._summarise(worker_id)
+            self._owner.pop(row_id, None)
+            return False
+
+        sessions = self._sessions.setdefault(worker_id, {})
+        existing = sessions.get(row_id)
+        if not authoritative and existing is not None and (not existing['is_active'] or record['is_active']):
+            return False
+        sessions[row_id] = record
+        self._owner[row_id] = worker_id
+        self._summarise(worker_id)
+        return True
+
+    def _summarise(self, worker_id):
+        from api.data_reader import summarise_sessions
+        summary = summarise_sessions(list(self._sessions.get(worker_id, {}).values()))
+        if summary is None:
+            self._summary.pop(worker_id, None)
+        else:
+            self._summary[worker_id] = summary
+
+    def apply(self, event: Dict):
+        """check_in / check_out event (ISO timestamps, row id) for the indexed day"""
+        in_time = event['in_time']
+        if self.day is None or event.get('id') is None:
+            return
+        if event['type'] == 'check_in':
+            out_time, duration, active = None, 0, True
+        else:
+            out_time, duration, active = event['out_time'][11:19], event['duration'], False
+        record = {
+            'id': event['id'], 'person_id': event['person_id'], 'date': in_time[:10],
+            'in_time': in_time[11:19], 'out_time': out_time, 'duration_sec': duration,
+            'confidence': event.get('confidence', 100.0), 'is_active': active
+        }
+        with self._lock:
+            if self._store(record, authoritative=False):
+                self.version += 1
+
+    def state(self, worker_id: str) -> Optional[Dict]:
+        """summarise_sessions() of the worker's day (None if not seen)"""
+        with self._lock:
+            summary = self._summary.get(worker_id)
+            return dict(summary) if summary else None
+
+    def summaries(self, workers: List[str]) -> Dict[str, Optional[Dict]]:
+        """state() for many workers"""
+        with self._lock:
+            return {worker_id: self._summary.get(worker_id) for worker_id in workers}
+
+    def present(self) -> List[str]:
+        """Workers with an open session right now"""
+        with self._lock:
+            return [w for w, summary in self._summary.items() if summary['state'] == 'IN']
+
+    def records(self) -> List[Dict]:
+        """All of the day's sessions (copies), like read_attendance_log(day, day) plus ids"""
+        with self._lock:
+            return [dict(r) for sessions in self._sessions.values() for r in sessions.values()]
+
+
+class LiveState:
+    def __init__(self, stale_after: float = 30.0):
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self.presence = PresenceIndex()
+        self.reset()
+
+    def reset(self):
+        """Forget everything (events were lost; rebuild from the DB / next events)"""
+        with self._lock:
+            self.health: Optional[Dict] = None
+            self.occupancy: Optional[Dict] = None
+            self.last_event_at = 0.0
+            self.unknown_events = 0
+
+    def apply(self, event: Dict):
+        """EventSubscriber handler"""
+        with self._lock:
+            self.last_event_at = time.time()
+            kind = event["type"]
+            if kind == "health":
+                self.health = event
+                if event.get("occupancy") is not None:
+                    self.occupancy = event["occupancy"]
+            elif kind == "occupancy":
+                self.occupancy = {k: v for k, v in event.items() if k not in ("seq", "type", "ts")}
+            elif kind == "unknown":
+                self.unknown_events += 1
+        if kind in ("check_in", "check_out"):
+            self.presence.apply(event)
+
+    def heartbeat(self) -> Optional[Dict]:
+        """Heartbeat-file shaped dict from the last health event (None if stale / never seen)"""
+        with self._lock:
+            health = self.health
+            occupancy = self.occupancy
+        if health is None or time.time() - health["ts"] > self.stale_after:
+            return None
+        return {"timestamp": health["ts"], "status": health.get("status", "running"), "occupancy": occupancy}
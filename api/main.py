@@ -2,13 +2,22 @@
 FastAPI server for Factory Flow Monitor Dashboard
 Serves attendance data from the Python tracking system
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import List, Dict, Optional
+import asyncio
+import bisect
+import functools
+import hashlib
 import uvicorn
+import json
 import os
+import time
 import sys
 from pathlib import Path
 
@@ -16,12 +25,39 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
-from api.data_reader import AttendanceDataReader, UnknownPersonTracker
+from api.data_reader import AttendanceDataReader, RECORD_FIELDS
+from api.fast_json import FastJSONResponse
+from api.live_state import LiveState
+from api.streaming import ndjson_chunks, csv_chunks
+from database.columnar_store import ColumnarAttendanceStore
+from database.unknown_store import UnknownDetectionStore
+from config.attendance_config import (
+    API_DB_WORKERS, API_COMPRESS_MIN_BYTES,
+    UNKNOWN_CLUSTER_SIMILARITY, UNKNOWN_RING_SIZE, UNKNOWN_MAX_STORED, UNKNOWN_SNAPSHOT_DIR,
+    EVENT_BUS_ENABLED, EVENT_BUS_PORT
+)
+from tracking.unknown_snapshots import thumbnail_path
+from utils.event_bus import EventSubscriber
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Follow the tracking process's event bus while the server runs
+    if EVENT_BUS_ENABLED:
+        try:
+            _load_presence()
+        except Exception as e:
+            print(f"Error loading presence index: {e}")
+        event_subscriber.start()
+    yield
+    event_subscriber.stop()
+
 
 app = FastAPI(
     title="Factory Flow Monitor API",
     description="Real-time attendance monitoring API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration - allow dashboard to access API
@@ -40,9 +76,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large bodies (raw history, hourly reports): brotli when the
+# optional brotli-asgi package is installed (gzip for clients without br),
+# plain gzip otherwise
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=API_COMPRESS_MIN_BYTES)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=API_COMPRESS_MIN_BYTES)
+
 # Initialize data readers
 data_reader = AttendanceDataReader()
-unknown_tracker = UnknownPersonTracker()
+# Live tracker state pushed by run_system.py (health, occupancy, ...)
+live_state = LiveState()
+
+def _load_presence(day: Optional[str] = None):
+    """Bring the presence index up to date with the day's sessions in the DB"""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    live_state.presence.sync(data_reader, day)
+
+
+def _resync():
+    # Events were lost: drop what we had and start again from SQLite
+    live_state.reset()
+    live_state.presence.invalidate()
+    _load_presence()
+
+
+event_subscriber = EventSubscriber(live_state.apply, port=EVENT_BUS_PORT, on_resync=_resync)
+
+# Persistent, one entry per stranger (repeat sightings are counted, not listed)
+unknown_tracker = UnknownDetectionStore(
+    capacity=UNKNOWN_RING_SIZE,
+    similarity=UNKNOWN_CLUSTER_SIMILARITY,
+    max_rows=UNKNOWN_MAX_STORED
+)
+
+# Read endpoints are async and hand their blocking DB / filesystem work to
+# this pool, so slow reports can't starve the event loop or the default
+# threadpool that serves everything else
+db_executor = ThreadPoolExecutor(max_workers=API_DB_WORKERS, thread_name_prefix="api-db")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _etag(*parts) -> str:
+    """Content version of a response built from `parts` (change cursor, settings, ...)"""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:16] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: a comma-separated list of tags, weak (W/"...") or not, or *"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _conditional(if_none_match: Optional[str], etag: str, build):
+    """304 when the client already has `etag`, else build() as JSON tagged with it"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(build(), headers=headers)
 
 
 @app.get("/")
@@ -56,125 +158,199 @@ def read_root():
     }
 
 
+HEARTBEAT_FILE = BASE_DIR / "data" / "system_heartbeat.json"
+COLUMNAR_DIR = BASE_DIR / "data" / "columnar"
+SNAPSHOT_DIR = (BASE_DIR / UNKNOWN_SNAPSHOT_DIR).resolve()
+
+
+def _presence_summaries(date: str, workers: List[str]) -> Optional[Dict[str, Optional[Dict]]]:
+    """
+    summarise_sessions() per worker from the presence index (None for days
+    other than today: read the DB). Synced to the change cursor first, so
+    writes that never went through the event bus are included.
+    """
+    if date != datetime.now().strftime("%Y-%m-%d"):
+        return None
+    _load_presence(date)
+    return live_state.presence.summaries(workers)
+
+
+def _read_heartbeat() -> Dict:
+    """Last heartbeat of the tracking process ({} if unavailable): from the event bus, else the file"""
+    if event_subscriber.connected:
+        heartbeat = live_state.heartbeat()
+        if heartbeat is not None:
+            return heartbeat
+    if HEARTBEAT_FILE.exists():
+        try:
+            with open(HEARTBEAT_FILE, "r") as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+
 @app.get("/api/metrics")
-def get_metrics():
-    """Get real-time metrics for the dashboard"""
+async def get_metrics(request: Request):
+    """Get real-time metrics for the dashboard (ETag; 304 while nothing changed)"""
+    return await run_blocking(_get_metrics, if_none_match=request.headers.get("if-none-match"))
+
+
+def _get_metrics(if_none_match: Optional[str] = None):
     try:
-        workers = data_reader.get_registered_workers()
-        today_records = data_reader.get_today_records()
-        
-        # Count present workers today
-        present_workers = set()
-        for record in today_records:
-            # Count if duration > 0 (completed) OR if currently active (ongoing)
-            if (record.get('duration_sec', 0) > 0 or record.get('is_active')) and record['person_id'] in workers:
-                present_workers.add(record['person_id'])
-        
-        # Calculate On-Time Percentage
-        on_time_count = 0
-        total_present_count = len(present_workers)
-        
-        # Get settings for start time
         settings = data_reader.get_system_settings()
-        start_time_limit = datetime.strptime(f"{datetime.now().strftime('%Y-%m-%d')} {settings['work_start_time']}", "%Y-%m-%d %H:%M")
-
-        # CHECK HEARTBEAT
-        import json
-        import time
-        heartbeat_file = BASE_DIR / "data" / "system_heartbeat.json"
-        is_system_active = False
-        if heartbeat_file.exists():
-            try:
-                with open(heartbeat_file, "r") as f:
-                    hb_data = json.load(f)
-                    if time.time() - hb_data.get("timestamp", 0) < 30:
-                        is_system_active = True
-            except:
-                pass
-
-        if not is_system_active:
-             # System is offline, so no one is "Live"
-             present_workers = set() 
-             # We still want to count people who have COMPLETED sessions today as "present" in the total, 
-             # but "activePresent" usually implies "currently here". 
-             # However, the user said "LIVE PRESENT NOW DATA... STUCK AT 1".
-             # If I clear present_workers, it clears "realtimeCount" AND "activePresent" in the return.
-             pass
-
-
-        # Calculate Avg Confidence and On-Time Count
-        total_confidence = 0
-        confidence_count = 0
-
-        for record in today_records:
-            if record['person_id'] in present_workers:
-                # On Time Check
-                if record['in_time']:
-                    in_dt = datetime.strptime(f"{datetime.now().strftime('%Y-%m-%d')} {record['in_time']}", "%Y-%m-%d %H:%M:%S")
-                    if in_dt <= start_time_limit:
-                        on_time_count += 1
-                
-                # Confidence Check
-                if record.get('confidence', 0) > 0:
-                    total_confidence += record['confidence']
-                    confidence_count += 1
-        
-        on_time_percent = int((on_time_count / total_present_count * 100)) if total_present_count > 0 else 0
-        avg_conf = int(total_confidence / confidence_count) if confidence_count > 0 else 0
+        hb_data = _read_heartbeat()
+        is_system_active = time.time() - hb_data.get("timestamp", 0) < 30
+        today = datetime.now().strftime("%Y-%m-%d")
+        etag = _etag(
+            "metrics", today, data_reader.change_cursor(), settings,
+            data_reader.registry.version(), is_system_active, unknown_tracker.count()
+        )
+        return _conditional(if_none_match, etag, lambda: _build_metrics(settings, is_system_active))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+
+def _build_metrics(settings: Dict, is_system_active: bool) -> Dict:
+    workers = data_reader.get_registered_workers()
+    today = datetime.now().strftime("%Y-%m-%d")
+    # One summary per worker from the presence index: no pass over the day's records
+    summaries = _presence_summaries(today, workers)
+    
+    # Count present workers today (a completed session OR currently active)
+    present_workers = {w for w, summary in summaries.items() if summary and summary['present']}
+    
+    # Calculate On-Time Percentage
+    on_time_count = 0
+    total_present_count = len(present_workers)
+    
+    # Start time from settings
+    start_time_limit = datetime.strptime(f"{today} {settings['work_start_time']}", "%Y-%m-%d %H:%M")
+
+    # Calculate Avg Confidence and On-Time Count (sessions started by the start time)
+    total_confidence = 0
+    confidence_count = 0
+    start_limit = start_time_limit.strftime("%H:%M:%S")
+
+    for worker_id in present_workers:
+        summary = summaries[worker_id]
+        on_time_count += bisect.bisect_right(summary['in_times'], start_limit)
+        total_confidence += summary['confidence_sum']
+        confidence_count += summary['confidence_count']
+    
+    on_time_percent = int((on_time_count / total_present_count * 100)) if total_present_count > 0 else 0
+    avg_conf = int(total_confidence / confidence_count) if confidence_count > 0 else 0
+
+    return {
+        "realtimeCount": len(present_workers) if is_system_active else 0, # Only show live count if system is running
+        "totalRegistered": len(workers),
+        "activePresent": len(present_workers) if is_system_active else 0,
+        "unknownDetections": unknown_tracker.count(),
+        "trend": "0",
+        "onTimePercentage": on_time_percent,
+        "avgConfidence": avg_conf
+    }
+
+
+@app.get("/api/metrics/prometheus")
+async def get_prometheus_metrics():
+    """Tracking-process stage timings and counters in Prometheus text format"""
+    return await run_blocking(_get_prometheus_metrics)
+
+
+def _get_prometheus_metrics():
+    metrics_file = BASE_DIR / "data" / "metrics.prom"
+    if not metrics_file.exists():
+        raise HTTPException(status_code=404, detail="No metrics written yet (is run_system.py running?)")
+    try:
+        return PlainTextResponse(
+            metrics_file.read_text(),
+            media_type="text/plain; version=0.0.4"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/occupancy")
+async def get_occupancy():
+    """Get the latest occupancy count with its freshness and sampling rate"""
+    return await run_blocking(_get_occupancy)
+
+
+def _get_occupancy():
+    try:
+        hb_data = _read_heartbeat()
+        occupancy = hb_data.get("occupancy") or {}
+        updated_at = occupancy.get("updated_at") or 0
+        age = round(time.time() - updated_at, 2) if updated_at else None
         return {
-            "realtimeCount": len(present_workers) if is_system_active else 0, # Only show live count if system is running
-            "totalRegistered": len(workers),
-            "activePresent": len(present_workers) if is_system_active else 0,
-            "unknownDetections": len(unknown_tracker.get_all()),
-            "trend": "0",
-            "onTimePercentage": on_time_percent,
-            "avgConfidence": avg_conf
+            "inside": occupancy.get("count", 0),
+            "inView": occupancy.get("in_view"),
+            "cameras": occupancy.get("cameras", {}),
+            "updatedAt": datetime.fromtimestamp(updated_at).isoformat() if updated_at else None,
+            "ageSeconds": age,
+            "fps": occupancy.get("fps", 0.0),
+            "latencyMs": occupancy.get("latency_ms", 0.0),
+            "stale": age is None or age > 30
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/workers")
-def get_workers(date: Optional[str] = None):
-    """Get all workers with their attendance status"""
+async def get_workers(request: Request, date: Optional[str] = None):
+    """Get all workers with their attendance status (ETag; 304 while nothing changed)"""
+    return await run_blocking(_get_workers, date=date, if_none_match=request.headers.get("if-none-match"))
+
+
+def _get_workers(date: Optional[str] = None, if_none_match: Optional[str] = None):
     try:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
-        
-        workers = data_reader.get_registered_workers()
-        worker_list = []
-        
-        # Color palette for avatars
-        colors = ["bg-cyan-500", "bg-emerald-500", "bg-amber-500", 
-                 "bg-rose-500", "bg-indigo-500", "bg-pink-500", 
-                 "bg-purple-500", "bg-blue-500", "bg-green-500"]
-        
-        for idx, worker_id in enumerate(workers):
-            stats = data_reader.get_worker_stats(worker_id, date)
-            
-            # Format worker data for dashboard
-            worker_data = {
-                "id": worker_id,
-                "name": worker_id.replace("_", " ").title(),  # "Worker_001" -> "Worker 001"
-                "department": "Production",  # Default - can be enhanced later
-                "status": stats['status'],
-                "presenceDuration": stats['total_duration_formatted'],
-                "presenceMinutes": stats['total_minutes'],
-                "firstSeen": stats['first_seen'] if stats['first_seen'] else "--",
-                "lastSeen": stats['last_seen'] if stats['last_seen'] else "--",
-                "avatarColor": colors[idx % len(colors)]
-            }
-            worker_list.append(worker_data)
-        
-        return worker_list
+        etag = _etag(
+            "workers", date, data_reader.change_cursor(),
+            data_reader.get_system_settings(), data_reader.registry.version()
+        )
+        return _conditional(if_none_match, etag, lambda: _build_workers(date))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _build_workers(date: str) -> List[Dict]:
+    workers = data_reader.get_registered_workers()
+    worker_list = []
+    
+    # Color palette for avatars
+    colors = ["bg-cyan-500", "bg-emerald-500", "bg-amber-500", 
+             "bg-rose-500", "bg-indigo-500", "bg-pink-500", 
+             "bg-purple-500", "bg-blue-500", "bg-green-500"]
+    
+    # One read of the day's records for every worker
+    all_stats = data_reader.get_all_worker_stats(workers, date, summaries=_presence_summaries(date, workers))
+
+    for idx, worker_id in enumerate(workers):
+        stats = all_stats[worker_id]
+        
+        # Format worker data for dashboard
+        worker_data = {
+            "id": worker_id,
+            "name": worker_id.replace("_", " ").title(),  # "Worker_001" -> "Worker 001"
+            "department": "Production",  # Default - can be enhanced later
+            "status": stats['status'],
+            "presenceDuration": stats['total_duration_formatted'],
+            "presenceMinutes": stats['total_minutes'],
+            "firstSeen": stats['first_seen'] if stats['first_seen'] else "--",
+            "lastSeen": stats['last_seen'] if stats['last_seen'] else "--",
+            "avatarColor": colors[idx % len(colors)]
+        }
+        worker_list.append(worker_data)
+    
+    return worker_list
+
+
 @app.get("/api/unknown")
 def get_unknown_detections():
-    """Get unknown person detections"""
+    """Get unknown people, one entry per stranger with a sighting count, most recent first"""
     try:
         detections = unknown_tracker.get_all()
         return detections
@@ -183,30 +359,74 @@ def get_unknown_detections():
 
 
 @app.get("/api/reports/hourly")
-def get_hourly_report(date: Optional[str] = None):
-    """Get hourly attendance report"""
+async def get_hourly_report(request: Request, date: Optional[str] = None):
+    """Get hourly attendance report (ETag; 304 while nothing changed)"""
+    return await run_blocking(_get_hourly_report, date=date, if_none_match=request.headers.get("if-none-match"))
+
+
+def _get_hourly_report(date: Optional[str] = None, if_none_match: Optional[str] = None):
     try:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         
-        report = data_reader.get_hourly_report(date)
-        return report
+        etag = _etag("hourly", date, data_reader.change_cursor(), data_reader.registry.version())
+        return _conditional(if_none_match, etag, lambda: data_reader.get_hourly_report(date))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/reports/daily")
-def get_daily_occupancy(days: int = 30):
-    """Get daily occupancy report for the last N days"""
+async def get_daily_occupancy(request: Request, days: int = 30):
+    """Get daily occupancy report for the last N days (ETag; 304 while nothing changed)"""
+    return await run_blocking(_get_daily_occupancy, days=days, if_none_match=request.headers.get("if-none-match"))
+
+
+def _get_daily_occupancy(days: int = 30, if_none_match: Optional[str] = None):
+    try:
+        etag = _etag(
+            "daily", days, datetime.now().strftime("%Y-%m-%d"),
+            data_reader.change_cursor(), data_reader.registry.version()
+        )
+        return _conditional(if_none_match, etag, lambda: data_reader.get_daily_occupancy(days))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/reports/range")
+async def get_range_report(start: str, end: str):
+    """
+    Per-worker minutes, late days and daily unique workers between two
+    dates (YYYY-MM-DD, inclusive), from the columnar export of closed sessions
+    """
+    return await run_blocking(_get_range_report, start=start, end=end)
+
+
+def _get_range_report(start: str, end: str):
     try:
-        return data_reader.get_daily_occupancy(days)
+        store = ColumnarAttendanceStore(COLUMNAR_DIR)
+        work_start = data_reader.get_system_settings()["work_start_time"]
+        return {
+            "start": start,
+            "end": end,
+            "workerMinutes": store.worker_minutes(start, end),
+            "lateCounts": store.late_counts(start, end, work_start),
+            "dailyUniques": store.daily_uniques(start, end)
+        }
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/workers/{worker_id}")
-def get_worker_detail(worker_id: str, date: Optional[str] = None):
+async def get_worker_detail(worker_id: str, date: Optional[str] = None):
     """Get detailed stats for a specific worker"""
+    return await run_blocking(_get_worker_detail, worker_id=worker_id, date=date)
+
+
+def _get_worker_detail(worker_id: str, date: Optional[str] = None):
     try:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
@@ -224,62 +444,158 @@ def get_worker_detail(worker_id: str, date: Optional[str] = None):
 
 
 @app.get("/api/attendance/raw")
-def get_raw_attendance(date: Optional[str] = None):
-    """Get raw attendance records (all history if date is None)"""
+async def get_raw_attendance(date: Optional[str] = None, format: str = "records",
+                             after_id: Optional[int] = None, limit: Optional[int] = None,
+                             ids: bool = False):
+    """
+    Get raw attendance records (all history if date is None).
+    format=rows returns {"columns": [...], "rows": [[...], ...], "cursor": n}
+    instead of one object per record, about half the bytes for long
+    histories; with ids=true each row leads with its id. cursor is the change
+    cursor from before the read: poll /api/attendance/changes from it.
+    format=ndjson / csv streams the records as they are read from the DB.
+    after_id / limit page through the live table by id instead:
+    {"records": [...], "nextAfterId": id or null}.
+    """
+    return await run_blocking(_get_raw_attendance, date=date, format=format, after_id=after_id, limit=limit, ids=ids)
+
+
+def _get_raw_attendance(date: Optional[str] = None, format: str = "records",
+                        after_id: Optional[int] = None, limit: Optional[int] = None,
+                        ids: bool = False):
     try:
-        if date is None:
-            # Return full history
-            records = data_reader.read_attendance_log()
-        else:
-            all_records = data_reader.read_attendance_log()
-            records = [r for r in all_records if r['date'] == date]
-        
-        return records
+        if after_id is not None or limit is not None:
+            page = data_reader.read_attendance_page(after_id or 0, min(limit or 1000, 10000), date, date)
+            return FastJSONResponse({"records": page["records"], "nextAfterId": page["next_after_id"]})
+
+        if format == "rows":
+            cursor = data_reader.change_cursor()
+            columns = ("id",) + RECORD_FIELDS if ids else RECORD_FIELDS
+            rows = data_reader.iter_attendance_rows(date, date, with_ids=ids)
+            return FastJSONResponse({"columns": columns, "rows": list(rows), "cursor": cursor})
+
+        rows = data_reader.iter_attendance_rows(date, date)
+
+        if format == "ndjson":
+            return StreamingResponse(ndjson_chunks(rows, RECORD_FIELDS), media_type="application/x-ndjson")
+        if format == "csv":
+            filename = f"attendance_{date or 'all'}.csv"
+            return StreamingResponse(
+                csv_chunks(rows, RECORD_FIELDS),
+                media_type="text/csv",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            )
+        return FastJSONResponse([dict(zip(RECORD_FIELDS, row)) for row in rows])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/attendance/changes")
+async def get_attendance_changes(since: int = 0, limit: int = 5000):
+    """
+    Sessions created or closed since change cursor `since` (0 = everything):
+    {"records": [...with id], "cursor": n, "hasMore": bool}. Clients keep
+    the records by id and poll again with the returned cursor.
+    """
+    return await run_blocking(_get_attendance_changes, since=since, limit=limit)
+
+
+def _get_attendance_changes(since: int = 0, limit: int = 5000):
+    try:
+        changes = data_reader.read_changes(since, min(max(limit, 1), 10000))
+        return FastJSONResponse({
+            "records": changes["records"],
+            "cursor": changes["cursor"],
+            "hasMore": changes["has_more"]
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Add endpoint for unknown person snapshot (to be called by tracking system)
 @app.post("/api/unknown/add")
-def add_unknown_detection(snapshot_path: str, confidence: float = 0.0):
-    """Add a new unknown person detection (called by tracking system)"""
+def add_unknown_detection(snapshot_path: str, confidence: float = 0.0,
+                          embedding: Optional[List[float]] = Body(None, embed=True)):
+    """
+    Add a new unknown person detection (called by tracking system).
+    With a face embedding in the body ({"embedding": [...]}) a repeat
+    sighting of a known stranger updates that entry instead of adding one.
+    """
     try:
-        detection = unknown_tracker.add_detection(snapshot_path, confidence)
+        detection = unknown_tracker.add_detection(snapshot_path, confidence, embedding)
         return detection
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/unknown/{detection_id}/image")
+def get_unknown_image(detection_id: str, full: bool = False):
+    """
+    Snapshot of an unknown person: the pre-encoded thumbnail written by the
+    tracking process, or the full face crop with full=true
+    """
+    detection = unknown_tracker.get(detection_id)
+    if detection is None:
+        raise HTTPException(status_code=404, detail="Detection not found")
+    if not detection['snapshot_path']:
+        raise HTTPException(status_code=404, detail="No snapshot for this detection")
+
+    path = Path(detection['snapshot_path']).resolve()
+    if not full:
+        path = thumbnail_path(path)
+    # Only files the snapshotter wrote; snapshot_path can come from /api/unknown/add
+    if SNAPSHOT_DIR not in path.parents or not path.exists():
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        os.utime(path)  # recently viewed snapshots are evicted last
+    except OSError:
+        pass
+    return FileResponse(str(path), media_type="image/jpeg")
+
+
 @app.delete("/api/unknown/{detection_id}")
 def dismiss_unknown(detection_id: str):
     """Dismiss an unknown person detection"""
     try:
-        # Remove from tracker
-        unknown_tracker.unknown_detections = [
-            d for d in unknown_tracker.unknown_detections 
-            if d['id'] != detection_id
-        ]
-        return {"status": "dismissed", "id": detection_id}
+        dismissed = unknown_tracker.dismiss(detection_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not dismissed:
+        raise HTTPException(status_code=404, detail="Detection not found")
+    return {"status": "dismissed", "id": detection_id}
 
 
-from fastapi.responses import FileResponse
-
 @app.get("/api/workers/{worker_id}/image")
-def get_worker_image(worker_id: str):
-    """Get the registered profile picture for a worker"""
+async def get_worker_image(worker_id: str, request: Request, full: bool = False):
+    """
+    Get the registered profile picture for a worker: a cached 128px
+    thumbnail with an ETag (304 when unchanged), or the original with full=true
+    """
+    return await run_blocking(
+        _get_worker_image, worker_id=worker_id,
+        if_none_match=request.headers.get("if-none-match"), full=full
+    )
+
+
+def _get_worker_image(worker_id: str, if_none_match: Optional[str] = None, full: bool = False):
     try:
-        worker_dir = BASE_DIR / "data" / "known_faces" / worker_id
-        if not worker_dir.exists():
+        info = data_reader.registry.get(worker_id)
+        if info is None:
             raise HTTPException(status_code=404, detail="Worker not found")
-        
-        # Find first image file
-        for file in worker_dir.iterdir():
-            if file.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                return FileResponse(str(file))
-        
-        raise HTTPException(status_code=404, detail="Image not found")
+
+        if full:
+            image_path = data_reader.registry.image_path(worker_id)
+            if image_path is None:
+                raise HTTPException(status_code=404, detail="Image not found")
+            return FileResponse(str(image_path))
+
+        if info.thumbnail is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+
+        headers = {"ETag": info.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, info.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=info.thumbnail, media_type="image/jpeg", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -294,8 +610,12 @@ class SettingsUpdate(BaseModel):
     value: str
 
 @app.get("/api/settings")
-def get_settings():
+async def get_settings():
     """Get all system settings"""
+    return await run_blocking(_get_settings)
+
+
+def _get_settings():
     try:
         return data_reader.get_system_settings()
     except Exception as e:
@@ -0,0 +1,38 @@
+"""
+Chunked encoders for streaming exports. Each yields one bytes chunk per
+`chunk_rows` rows, so a response starts after the first batch and memory
+stays flat however long the history is.
+"""
+import csv
+import io
+
+from api.fast_json import dumps
+
+
+def ndjson_chunks(rows, fields, chunk_rows=1000):
+    """One JSON object per line"""
+    buffer = []
+    for row in rows:
+        buffer.append(dumps(dict(zip(fields, row))))
+        if len(buffer) >= chunk_rows:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+
+def csv_chunks(rows, fields, chunk_rows=1000):
+    """Header line, then the rows"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_rows:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+            count = 0
+    yield out.getvalue().encode("utf-8")
@@ -1,18 +1,20 @@
-import time
 import logging
 from config import UNKNOWN_LABEL, PRESENCE_GRACE_SECONDS, MIN_SEEN_SECONDS
+from utils.clock import SYSTEM_CLOCK
 
 logger = logging.getLogger(__name__)
 
 class AttendanceManager:
-    def __init__(self):
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.active_person = None
         self.in_time = None
         self.last_seen = None
         self.present = False
 
-    def update(self, label: str, face_detected: bool):
-        now = time.time()
+    def update(self, label: str, face_detected: bool, now: float = None):
+        if now is None:
+            now = self.clock.now()
 
         if face_detected:
             self.last_seen = now
@@ -2,36 +2,73 @@ import csv
 import os
 from datetime import datetime
 
+from utils.metrics import metrics
+from database.retention import rolled_csv_path
+
+CSV_HEADER = ["Person ID", "Date", "In Time", "Out Time", "Duration (sec)"]
+
 class CSVAttendanceWriter:
-    def __init__(self, file_path="attendance_log.csv"):
+    def __init__(self, file_path="attendance_log.csv", session_factory=None, roll=None, events=None):
         self.file_path = file_path
-        self._ensure_file_exists()
+        # Defaults to database.models.SessionLocal (the live DB)
+        self.session_factory = session_factory
+        # Optional utils.event_bus.EventBus: check_in / check_out after each DB write
+        self.events = events
+        # None = single file, "day" / "month" = one file per period (attendance_log_2024-03.csv)
+        self.roll = roll
+        if not roll:
+            self._ensure_file_exists()
+
+    def _session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        from database.models import SessionLocal
+        return SessionLocal()
+
+    def _publish(self, event_type, **data):
+        if self.events is None:
+            return
+        try:
+            self.events.publish(event_type, **data)
+        except Exception as e:
+            print(f"Error publishing {event_type}: {e}")
 
-    def _ensure_file_exists(self):
+    def _ensure_file_exists(self, path=None):
         """Create file with header if it doesn't exist."""
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, mode='w', newline='') as file:
+        path = path or self.file_path
+        if not os.path.exists(path):
+            with open(path, mode='w', newline='') as file:
                 writer = csv.writer(file)
-                writer.writerow(["Person ID", "Date", "In Time", "Out Time", "Duration (sec)"])
+                writer.writerow(CSV_HEADER)
 
+    def _append_csv(self, person_id, in_time, out_time, duration):
+        """One row per closed session, in the file for the session's period"""
+        path = rolled_csv_path(self.file_path, in_time, self.roll)
+        if self.roll:
+            self._ensure_file_exists(path)
+        with open(path, mode='a', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow([
+                person_id,
+                in_time.strftime("%Y-%m-%d"),
+                in_time.strftime("%H:%M:%S"),
+                out_time.strftime("%H:%M:%S"),
+                f"{duration:.2f}"
+            ])
+
+    @metrics.timed("ffm_db_seconds", op="log_record")
     def log_record(self, person_id, in_time, out_time, duration):
         """Append a record to the CSV file and Database."""
-        date_str = in_time.strftime("%Y-%m-%d")
-        in_str = in_time.strftime("%H:%M:%S")
-        out_str = out_time.strftime("%H:%M:%S")
-
         # 1. Write to CSV
         try:
-            with open(self.file_path, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([person_id, date_str, in_str, out_str, f"{duration:.2f}"])
+            self._append_csv(person_id, in_time, out_time, duration)
         except Exception as e:
             print(f"Error writing to CSV: {e}")
 
         # 2. Write to Database
         try:
-            from database.models import SessionLocal, FaceAttendance
-            db = SessionLocal()
+            from database.models import FaceAttendance
+            db = self._session()
             db_record = FaceAttendance(
                 person_id=person_id,
                 date=in_time.date(),
@@ -41,17 +78,24 @@ class CSVAttendanceWriter:
                 confidence=100.0 # Default confidence for tracked session
             )
             db.add(db_record)
+            db.flush()
+            row_id = db_record.id
             db.commit()
             db.close()
             print(f"[LOGGED] Saved record for {person_id} to DB & CSV (Duration: {duration:.2f}s)")
+            self._publish(
+                "check_out", id=row_id, person_id=person_id, in_time=in_time.isoformat(),
+                out_time=out_time.isoformat(), duration=duration
+            )
         except Exception as e:
             print(f"Error writing to Database: {e}")
 
+    @metrics.timed("ffm_db_seconds", op="log_entry")
     def log_entry(self, person_id, in_time):
         """Log just the entry time to DB (Immediate Check-In)."""
         try:
-            from database.models import SessionLocal, FaceAttendance
-            db = SessionLocal()
+            from database.models import FaceAttendance
+            db = self._session()
             
             # Check if there is already an open session for this person today (out_time is None)
             existing = db.query(FaceAttendance).filter(
@@ -74,17 +118,21 @@ class CSVAttendanceWriter:
                 confidence=100.0
             )
             db.add(db_record)
+            db.flush()
+            row_id = db_record.id
             db.commit()
             db.close()
             print(f"✅ [CHECK-IN] {person_id} at {in_time.strftime('%H:%M:%S')}")
+            self._publish("check_in", id=row_id, person_id=person_id, in_time=in_time.isoformat(), confidence=100.0)
         except Exception as e:
             print(f"Error logging entry: {e}")
 
+    @metrics.timed("ffm_db_seconds", op="update_exit")
     def update_exit(self, person_id, out_time):
         """Update the existing open session with out_time and duration."""
         try:
-            from database.models import SessionLocal, FaceAttendance
-            db = SessionLocal()
+            from database.models import FaceAttendance
+            db = self._session()
             
             # Find the latest open session
             record = db.query(FaceAttendance).filter(
@@ -96,8 +144,13 @@ class CSVAttendanceWriter:
                 duration = (out_time - record.in_time).total_seconds()
                 record.out_time = out_time
                 record.duration_seconds = duration
+                row_id = record.id
                 db.commit()
                 print(f"❌ [CHECK-OUT] {person_id} at {out_time.strftime('%H:%M:%S')} (Duration: {duration:.1f}s)")
+                self._publish(
+                    "check_out", id=row_id, person_id=person_id, in_time=record.in_time.isoformat(),
+                    out_time=out_time.isoformat(), duration=duration
+                )
                 
                 # Also append to CSV for backup (full record)
                 self.log_record_csv_only(person_id, record.in_time, out_time, duration)
@@ -108,15 +161,77 @@ class CSVAttendanceWriter:
         except Exception as e:
             print(f"Error updating exit: {e}")
 
+    @metrics.timed("ffm_db_seconds", op="write_transitions")
+    def write_transitions(self, transitions):
+        """
+        Check-ins and check-outs of one frame (StateManager.process_frame)
+        in one DB session and one commit; same rules as log_entry / update_exit.
+        """
+        try:
+            from database.models import FaceAttendance
+            db = self._session()
+
+            # Open sessions of everyone involved, latest first
+            person_ids = {t.person_id for t in transitions}
+            open_sessions = {}
+            for record in db.query(FaceAttendance).filter(
+                FaceAttendance.person_id.in_(person_ids),
+                FaceAttendance.out_time == None
+            ).order_by(FaceAttendance.in_time.desc()):
+                open_sessions.setdefault(record.person_id, []).append(record)
+
+            checked_in, checked_out = [], []
+            for t in transitions:
+                sessions = open_sessions.setdefault(t.person_id, [])
+                if t.kind == "IN":
+                    if any(r.in_time.date() == t.in_time.date() for r in sessions):
+                        print(f"[INFO] Open session already exists for {t.person_id}. Skipping duplicate entry.")
+                        continue
+                    record = FaceAttendance(
+                        person_id=t.person_id,
+                        date=t.in_time.date(),
+                        in_time=t.in_time,
+                        out_time=None,
+                        duration_seconds=0,
+                        confidence=100.0
+                    )
+                    db.add(record)
+                    sessions.insert(0, record)
+                    checked_in.append((t, record))
+                elif sessions:
+                    record = sessions.pop(0)
+                    duration = (t.out_time - record.in_time).total_seconds()
+                    record.out_time = t.out_time
+                    record.duration_seconds = duration
+                    checked_out.append((record, t.person_id, record.in_time, t.out_time, duration))
+                else:
+                    print(f"[WARN] No open session found for {t.person_id} to close.")
+
+            # Row ids for the events, assigned before commit expires the objects
+            db.flush()
+            checked_in = [(t, record.id) for t, record in checked_in]
+            checked_out = [(record.id,) + tuple(rest) for record, *rest in checked_out]
+            db.commit()
+            db.close()
+        except Exception as e:
+            print(f"Error writing transitions: {e}")
+            return
+
+        for t, row_id in checked_in:
+            print(f"✅ [CHECK-IN] {t.person_id} at {t.in_time.strftime('%H:%M:%S')}")
+            self._publish("check_in", id=row_id, person_id=t.person_id, in_time=t.in_time.isoformat(), confidence=100.0)
+        for row_id, person_id, in_time, out_time, duration in checked_out:
+            print(f"❌ [CHECK-OUT] {person_id} at {out_time.strftime('%H:%M:%S')} (Duration: {duration:.1f}s)")
+            self._publish(
+                "check_out", id=row_id, person_id=person_id, in_time=in_time.isoformat(),
+                out_time=out_time.isoformat(), duration=duration
+            )
+            self.log_record_csv_only(person_id, in_time, out_time, duration)
+
     def log_record_csv_only(self, person_id, in_time, out_time, duration):
         """Helper to write to CSV only (used by update_exit)."""
-        date_str = in_time.strftime("%Y-%m-%d")
-        in_str = in_time.strftime("%H:%M:%S")
-        out_str = out_time.strftime("%H:%M:%S")
         try:
-            with open(self.file_path, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([person_id, date_str, in_str, out_str, f"{duration:.2f}"])
+            self._append_csv(person_id, in_time, out_time, duration)
         except Exception as e:
             print(f"Error writing to CSV: {e}")
 
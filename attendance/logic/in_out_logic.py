@@ -1,15 +1,18 @@
-import time
 import logging
 
+from utils.clock import SYSTEM_CLOCK
+
 logger = logging.getLogger(__name__)
 
 class InOutLogic:
-    def __init__(self, in_threshold=5, out_threshold=30):
+    def __init__(self, in_threshold=5, out_threshold=30, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.in_threshold = in_threshold
         self.out_threshold = out_threshold
 
-    def update(self, state, seen_now):
-        now = time.time()
+    def update(self, state, seen_now, now=None):
+        if now is None:
+            now = self.clock.now()
         if seen_now:
             state.last_seen = now
 
@@ -26,7 +26,7 @@ class OccupancyManager:
             if person.is_inside:
                 present.append({
                     "person_id": person.person_id,
-                    "name": person.name,
+                    "name": person.person_id.replace("_", " ").title(),
                     "since": person.in_time
                 })
 
@@ -1,44 +1,150 @@
+"""
+Attendance event log and its compaction into face_attendance sessions.
+
+`attendance_events` is append-only: one row per IN / OUT, in the order they
+happened. process_events() is incremental. It reads only events past the
+high-water mark (the last event rowid it compacted), pairs each OUT with the
+person's pending IN and writes the closed session. INs still waiting for their
+OUT are kept in `attendance_open_events` between runs.
+
+Each batch commits its sessions, the open INs and the new high-water mark in
+one transaction. A crash therefore replays at most the uncommitted batch. A
+session is keyed by (person_id, in_time), so a replay updates the existing
+row (closing it if the live writer left it open, filling in the date older
+runs of this script left empty) instead of adding a duplicate. Rows from
+those older runs hold in_time in the sqlite3 default text form ('2024-06-03
+08:00:00', no fraction for whole seconds) and are matched in that form too.
+"""
 import sqlite3
 from datetime import datetime
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    person_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attendance_compactor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_event_id INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO attendance_compactor (id, last_event_id) VALUES (1, 0);
+CREATE TABLE IF NOT EXISTS attendance_open_events (
+    person_id TEXT PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    in_time TEXT NOT NULL
+);
+"""
+
+# Row already stored for a session (?1 person_id, ?2 in_time, ?5 date,
+# ?6 in_time as older runs stored it)
+_STORED_SESSION = """
+    SELECT id FROM face_attendance WHERE date = ?5 AND person_id = ?1 AND in_time IN (?2, ?6)
+    UNION ALL
+    SELECT id FROM face_attendance WHERE date IS NULL AND person_id = ?1 AND in_time IN (?2, ?6)
+"""
+
+# Same text format SQLAlchemy stores DateTime columns in
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
 
 class SessionManager:
-    def __init__(self, db_path="database/face_attendance.db"):
+    def __init__(self, db_path="database/face_attendance.db", batch_size=5000):
         self.db_path = db_path
+        self.batch_size = batch_size
 
-    def process_events(self):
+    def _connect(self):
         conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-
-        c.execute("""
-            SELECT person_id, event, timestamp
-            FROM attendance_events
-            ORDER BY person_id, timestamp
-        """)
+        conn.executescript(_SCHEMA)
+        return conn
 
-        rows = c.fetchall()
+    def append_event(self, person_id, event, timestamp=None):
+        """Append one IN / OUT to the log; returns its event id"""
+        if event not in ("IN", "OUT"):
+            raise ValueError(f"Unknown attendance event: {event}")
+        timestamp = timestamp or datetime.now()
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO attendance_events (person_id, event, timestamp) VALUES (?, ?, ?)",
+                    (person_id, event, timestamp.isoformat())
+                )
+            return cursor.lastrowid
+        finally:
+            conn.close()
 
-        sessions = {}
-        records = []
-
-        for person_id, event, ts in rows:
-            ts = datetime.fromisoformat(ts)
+    def process_events(self):
+        """Compact events appended since the last run; returns the number of sessions written"""
+        conn = self._connect()
+        written = 0
+        try:
+            last_id = conn.execute("SELECT last_event_id FROM attendance_compactor WHERE id = 1").fetchone()[0]
+            open_ins = {
+                person_id: datetime.fromisoformat(in_time)
+                for person_id, in_time in conn.execute("SELECT person_id, in_time FROM attendance_open_events")
+            }
 
-            if event == "IN":
-                sessions[person_id] = ts
+            while True:
+                rows = conn.execute("""
+                    SELECT rowid, person_id, event, timestamp
+                    FROM attendance_events
+                    WHERE rowid > ?
+                    ORDER BY rowid
+                    LIMIT ?
+                """, (last_id, self.batch_size)).fetchall()
+                if not rows:
+                    break
 
-            elif event == "OUT" and person_id in sessions:
-                in_time = sessions.pop(person_id)
-                duration = (ts - in_time).total_seconds()
+                sessions = []
+                touched = {}     # person_id -> event id of their latest IN / OUT in this batch
+                for event_id, person_id, event, ts in rows:
+                    ts = datetime.fromisoformat(ts)
+                    if event == "IN":
+                        open_ins[person_id] = ts
+                        touched[person_id] = event_id
+                    elif event == "OUT" and person_id in open_ins:
+                        in_time = open_ins.pop(person_id)
+                        sessions.append((person_id, in_time, ts, (ts - in_time).total_seconds()))
+                        touched[person_id] = event_id
+                last_id = rows[-1][0]
 
-                records.append((person_id, in_time, ts, duration))
+                with conn:
+                    self._upsert_sessions(conn, sessions)
+                    for person_id, event_id in touched.items():
+                        if person_id in open_ins:
+                            conn.execute(
+                                "INSERT OR REPLACE INTO attendance_open_events (person_id, event_id, in_time) VALUES (?, ?, ?)",
+                                (person_id, event_id, open_ins[person_id].isoformat())
+                            )
+                        else:
+                            conn.execute("DELETE FROM attendance_open_events WHERE person_id = ?", (person_id,))
+                    conn.execute("UPDATE attendance_compactor SET last_event_id = ? WHERE id = 1", (last_id,))
+                written += len(sessions)
+        finally:
+            conn.close()
+        return written
 
-        for person_id, in_time, out_time, duration in records:
-            c.execute("""
-                INSERT INTO face_attendance
-                (person_id, in_time, out_time, duration_seconds)
-                VALUES (?, ?, ?, ?)
-            """, (person_id, in_time, out_time, duration))
+    @staticmethod
+    def _upsert_sessions(conn, sessions):
+        """Insert closed sessions, or close / correct the row already stored for (person_id, in_time)"""
+        params = []
+        for person_id, in_time, out_time, duration in sessions:
+            day = in_time.strftime("%Y-%m-%d 00:00:00.000000")
+            params.append((
+                person_id, in_time.strftime(_TS_FORMAT), out_time.strftime(_TS_FORMAT), duration, day,
+                str(in_time)  # sqlite3's default datetime adapter
+            ))
 
-        conn.commit()
-        conn.close()
+        # Both lookups are (date, person_id) index searches; an OR would fall back to person_id alone
+        conn.executemany(f"""
+            UPDATE face_attendance SET in_time = ?2, out_time = ?3, duration_seconds = ?4, date = ?5
+            WHERE id IN ({_STORED_SESSION})
+              AND (date IS NULL OR in_time != ?2 OR out_time IS NULL OR out_time != ?3 OR duration_seconds != ?4)
+        """, params)
+        conn.executemany(f"""
+            INSERT INTO face_attendance (person_id, in_time, out_time, duration_seconds, date, confidence)
+            SELECT ?1, ?2, ?3, ?4, ?5, 100.0
+            WHERE NOT EXISTS ({_STORED_SESSION})
+        """, params)
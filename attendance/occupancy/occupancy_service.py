@@ -1,5 +1,18 @@
 class OccupancyService:
-    def get_current_count(self, persons):
+    """
+    Building occupancy.
+
+    When an OccupancyEngine is attached the count comes from its running
+    line-crossing total (O(1)); otherwise it falls back to counting tracked
+    persons that the StateManager has marked as inside.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+
+    def get_current_count(self, persons=None):
+        if self.engine is not None:
+            return self.engine.inside_count
         return sum(1 for p in persons.values() if p.is_inside)
 
     def get_present_people(self, persons):
@@ -1,77 +1,205 @@
-import time
+import heapq
+import itertools
+from collections import namedtuple
 from datetime import datetime
 
+import numpy as np
+
+from utils.clock import SYSTEM_CLOCK
+
+# One check-in / check-out decided by StateManager.process_frame
+# kind: "IN" | "OUT"; out_time / duration are None for "IN"
+Transition = namedtuple("Transition", ["kind", "person_id", "in_time", "out_time", "duration"])
+
+
+class CheckoutScheduler:
+    """
+    Min-heap of check-out deadlines, one armed deadline per person.
+    Re-arming or cancelling leaves the old entry in the heap; it is skipped
+    when it comes up, so every operation is O(log n) and nothing is scanned.
+    """
+
+    def __init__(self):
+        self._heap = []          # (deadline, seq, person_id)
+        self._armed = {}         # person_id -> seq of the live entry
+        self._seq = itertools.count()
+
+    def arm(self, person_id, deadline):
+        seq = next(self._seq)
+        self._armed[person_id] = seq
+        heapq.heappush(self._heap, (deadline, seq, person_id))
+
+    def cancel(self, person_id):
+        self._armed.pop(person_id, None)
+
+    def pop_due(self, now):
+        """[person_id] whose deadline is <= now (each disarmed)"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, person_id = heapq.heappop(self._heap)
+            if self._armed.get(person_id) == seq:
+                del self._armed[person_id]
+                due.append(person_id)
+        return due
+
+    def __len__(self):
+        return len(self._armed)
+
+
 class StateManager:
-    def __init__(self, in_threshold=10, out_threshold=20):
+    """
+    IN/OUT state machine per known person.
+
+    A person is checked IN once their track has been actively visible for
+    in_threshold, and OUT once they have not been seen for out_threshold.
+    Check-outs are driven by a CheckoutScheduler. It is armed at
+    last_seen + out_threshold on check-in. When a deadline comes up while
+    the person was seen since, it is pushed back to the new last_seen +
+    out_threshold. The manager keeps the track of everyone inside, so a
+    check-out still fires after PersonTracker has dropped the track, whatever
+    its disappear_time.
+    """
+
+    def __init__(self, in_threshold=10, out_threshold=20, clock=None, array_min_tracks=64):
+        self.clock = clock or SYSTEM_CLOCK
         self.in_threshold = in_threshold
         self.out_threshold = out_threshold
+        self.array_min_tracks = array_min_tracks
         self.states = {}
+        self.checkouts = CheckoutScheduler()
+        self._tracks = {}        # person id in state IN -> their (latest) TrackedPerson
 
-    def process(self, person, writer):
+    def process(self, person, writer, now=None):
         """
         person: TrackedPerson object
         writer: CSVAttendanceWriter
+        now: frame timestamp (epoch seconds); read from the clock if None
         """
-        current_time = time.time()
-        person_id = person.person_id
+        self.dispatch(self.process_frame([person], now), writer)
+
+    def process_frame(self, tracks, now=None):
+        """
+        Run the IN/OUT state machine for one frame.
+
+        tracks: TrackedPerson objects (PersonTracker.tracked_people.values())
+        now: frame timestamp (epoch seconds); read from the clock if None
+        returns: [Transition] for the writer (see dispatch), usually empty
+
+        Check-outs that are due fire first, whether or not their track is in
+        `tracks`. From array_min_tracks tracks up, the check-in threshold is
+        tested on an array of active_duration. Below that, a plain loop is
+        cheaper. Tracks of people already inside cost one attribute read each.
+        """
+        current_time = now if now is not None else self.clock.now()
+        transitions = self._expire(current_time)
 
         # Skip UNKNOWN for attendance
-        if person_id.startswith("UNKNOWN"):
-            return
+        people = [p for p in tracks if not p.person_id.startswith("UNKNOWN")]
+        if len(people) < self.array_min_tracks:
+            for person in people:
+                transition = self._step(person, current_time)
+                if transition is not None:
+                    transitions.append(transition)
+            return transitions
+
+        count = len(people)
+        bound = np.fromiter((p.is_inside for p in people), dtype=bool, count=count)
+        active = np.fromiter((p.active_duration for p in people), dtype=np.float64, count=count)
+
+        # Only tracks not bound to an IN person need a look: those past the
+        # threshold, plus, while anyone is IN, any that may be theirs re-found
+        waiting = ~bound
+        if not self._tracks:
+            waiting &= active >= self.in_threshold
+        for idx in np.flatnonzero(waiting):
+            transition = self._step(people[idx], current_time)
+            if transition is not None:
+                transitions.append(transition)
+        return transitions
+
+    def _step(self, person, current_time):
+        """Check-in logic for one track (check-outs come from the scheduler)"""
+        if person.is_inside:
+            return None
+        person_id = person.person_id
+        if person_id in self._tracks:
+            # Already IN under an older track (dropped by the tracker, then re-found)
+            self._rebind(person)
+            return None
+        # ENTRY: active/seen for threshold duration (only counted while visible)
+        if person.active_duration >= self.in_threshold:
+            return self._enter(person, current_time)
+        return None
+
+    def _expire(self, current_time):
+        transitions = []
+        for person_id in self.checkouts.pop_due(current_time):
+            person = self._tracks[person_id]
+            deadline = person.last_seen + self.out_threshold
+            if deadline > current_time:
+                # Seen since the deadline was set: push it back
+                self.checkouts.arm(person_id, deadline)
+            else:
+                # EXIT: gone for > out_threshold
+                transitions.append(self._leave(person, current_time))
+        return transitions
 
-        # Initialize state if not exists
-        if person_id not in self.states:
-            self.states[person_id] = {
-                "state": "SEARCHING", # SEARCHING (Not seen yet), IN (Present)
-                "in_time": None
-            }
-
-        data = self.states[person_id]
-        state = data["state"]
-
-        # Only count duration if person is actively visible in this frame
-        active_time = person.active_duration
-        is_gone = (current_time - person.last_seen) > 2.0
-
-        # --- LOGIC STATE MACHINE ---
-
-        # 1. ENTRY LOGIC
-        if state == "SEARCHING":
-            # If they have been active/seen for threshold duration
-            if active_time >= self.in_threshold:
-                in_dt = datetime.now()
-                self.states[person_id] = {
-                    "state": "IN",
-                    "in_time": in_dt
-                }
-                print(f"✅ [IN] {person_id} detected! (Present for {active_time:.1f}s)")
-                
+    def _enter(self, person, current_time):
+        person_id = person.person_id
+        in_dt = datetime.fromtimestamp(current_time)
+        self.states[person_id] = {
+            "state": "IN", # SEARCHING (Not seen yet), IN (Present)
+            "in_time": in_dt
+        }
+        self._tracks[person_id] = person
+        self.checkouts.arm(person_id, person.last_seen + self.out_threshold)
+        person.is_inside = True
+        person.in_time = in_dt
+        print(f"✅ [IN] {person_id} detected! (Present for {person.active_duration:.1f}s)")
+        return Transition("IN", person_id, in_dt, None, None)
+
+    def _rebind(self, person):
+        # The armed deadline is re-checked against this track's last_seen when it comes up
+        previous = self._tracks[person.person_id]
+        self._tracks[person.person_id] = person
+        person.is_inside = True
+        person.in_time = previous.in_time
+        previous.is_inside = False
+
+    def _leave(self, person, current_time):
+        person_id = person.person_id
+        out_dt = datetime.fromtimestamp(current_time)
+        in_dt = self.states[person_id]["in_time"]
+
+        # Reset state
+        self.states[person_id] = {
+            "state": "SEARCHING",
+            "in_time": None
+        }
+        del self._tracks[person_id]
+        self.checkouts.cancel(person_id)
+        # Reset tracker duration so they can "Re-Enter" fresh logic
+        person.active_duration = 0
+        person.is_inside = False
+        person.in_time = None
+        # Calculate total session duration
+        return Transition("OUT", person_id, in_dt, out_dt, (out_dt - in_dt).total_seconds())
+
+    @staticmethod
+    def dispatch(transitions, writer):
+        """Hand a frame's transitions to the writer: one batch if it supports it, else call by call"""
+        if not transitions:
+            return
+        if hasattr(writer, 'write_transitions'):
+            writer.write_transitions(transitions)
+            return
+        for t in transitions:
+            if t.kind == "IN":
                 # Check-In Immediately
                 if hasattr(writer, 'log_entry'):
-                    writer.log_entry(person_id, in_dt)
-
-        # 2. EXIT LOGIC
-        elif state == "IN":
-            # If they are gone for > out_threshold
-            time_gone = current_time - person.last_seen
-            
-            if time_gone >= self.out_threshold:
-                out_dt = datetime.now()
-                in_dt = data["in_time"]
-                
-                # Calculate total session duration
-                session_duration = (out_dt - in_dt).total_seconds()
-                
-                # Update existing record with Check-Out time
-                if hasattr(writer, 'update_exit'):
-                    writer.update_exit(person_id, out_dt)
-                elif hasattr(writer, 'log_record'):
-                    writer.log_record(person_id, in_dt, out_dt, session_duration)
-                
-                # Reset state
-                self.states[person_id] = {
-                    "state": "SEARCHING",
-                    "in_time": None
-                }
-                # Reset tracker duration so they can "Re-Enter" fresh logic
-                person.active_duration = 0 
+                    writer.log_entry(t.person_id, t.in_time)
+            # Update existing record with Check-Out time
+            elif hasattr(writer, 'update_exit'):
+                writer.update_exit(t.person_id, t.out_time)
+            elif hasattr(writer, 'log_record'):
+                writer.log_record(t.person_id, t.in_time, t.out_time, t.duration)
@@ -0,0 +1,57 @@
+import cv2
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def iter_frames(path, every=1, max_frames=None):
+    """
+    Yield (frame_index, BGR frame, source_fps) from a recorded clip: a video
+    file, or a directory of images read in name order. Only every `every`-th
+    frame is decoded; the rest are skipped with grab().
+    """
+    path = Path(path)
+    yielded = 0
+
+    if path.is_dir():
+        images = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        for idx, image_path in enumerate(images):
+            if idx % every:
+                continue
+            frame = cv2.imread(str(image_path))
+            if frame is None:
+                logger.warning(f"Could not read {image_path}")
+                continue
+            yield idx, frame, None
+            yielded += 1
+            if max_frames and yielded >= max_frames:
+                return
+        return
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or None
+    idx = 0
+    try:
+        while True:
+            if idx % every:
+                if not cap.grab():
+                    break
+                idx += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield idx, frame, fps
+            idx += 1
+            yielded += 1
+            if max_frames and yielded >= max_frames:
+                break
+    finally:
+        cap.release()
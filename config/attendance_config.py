@@ -4,3 +4,77 @@ REPORT_WINDOW_MIN = 60
 
 UNKNOWN_PREFIX = "UNKNOWN"
 DRY_RUN = False
+
+# Occupancy (MobileNet-SSD) runs on its own thread at this rate
+OCCUPANCY_SAMPLE_FPS = 2.0
+
+# Entry boundary per camera for line-crossing occupancy.
+# "line": ((x1, y1), (x2, y2)) plus an "inside_point" on the inside of it,
+# or "polygon": [(x, y), ...] covering the inside area. Pixel coordinates.
+OCCUPANCY_ZONES = {
+    0: {"line": ((0, 300), (640, 300)), "inside_point": (320, 479), "margin": 10},
+}
+
+# Where detectors look, per camera. "rois": list of (x, y, w, h) gate
+# regions (None = full frame). "tile_size": run on square tiles of this
+# many native pixels instead of downscaling the whole frame (None = off).
+DETECTION_REGIONS = {
+    0: {"rois": None, "tile_size": None, "tile_overlap": 0.25},
+}
+
+# Face detector backend for run_system.py: "retinaface", "yunet", "haar"
+# or "cascade" (cheap proposer on a downscaled pyramid, confirmer on crops).
+FACE_DETECTOR = {
+    "backend": "retinaface",
+    # "backend": "cascade", "proposer": "haar", "confirmer": "retinaface",
+    # "proposal_scales": [0.5],
+}
+
+# Per-stage timing histograms and counters, written in Prometheus text
+# format to data/metrics.prom (served by the API at /api/metrics/prometheus)
+METRICS_ENABLED = True
+METRICS_WRITE_INTERVAL_SEC = 5.0
+
+# On-demand stack sampling of the camera loop. Create data/profile.request
+# (optionally {"duration": 20, "rate": 200}) or send SIGUSR1 on POSIX; the
+# collapsed stacks land in data/profiles/ for speedscope / flamegraph.pl.
+# Off by default: turn on where profiling is wanted.
+PROFILER_ENABLED = False
+PROFILER_RATE_HZ = 100
+PROFILER_DURATION_SEC = 30
+
+# Retention: attendance_log.csv rolls per "month" or "day" (None = one file);
+# scripts/archive_attendance.py moves sessions older than RETENTION_HOT_DAYS
+# from SQLite into data/archive/face_attendance_YYYY-MM.csv.gz
+CSV_ROLL = "month"
+RETENTION_HOT_DAYS = 90
+
+# API server: blocking DB / filesystem reads run on a dedicated pool of this
+# many threads (database.models.engine is sized to match)
+API_DB_WORKERS = 8
+# Responses smaller than this are sent uncompressed (gzip / brotli middleware)
+API_COMPRESS_MIN_BYTES = 1024
+
+# Unknown faces (/api/unknown): detections whose embedding is at least this
+# cosine-similar to a recent stranger count as the same person. The newest
+# UNKNOWN_RING_SIZE strangers are held in memory; the unknown_detections
+# table keeps at most UNKNOWN_MAX_STORED (oldest dropped first).
+UNKNOWN_CLUSTER_SIMILARITY = 0.6
+UNKNOWN_RING_SIZE = 500
+UNKNOWN_MAX_STORED = 10000
+
+# Unknown-face snapshots from run_system.py: best crop per UNKNOWN track once
+# it has been seen for UNKNOWN_SNAPSHOT_SETTLE_SEC, written (with a thumbnail)
+# under UNKNOWN_SNAPSHOT_DIR, which is capped at UNKNOWN_SNAPSHOT_MAX_MB
+UNKNOWN_SNAPSHOT_DIR = "data/unknown_snapshots"
+UNKNOWN_SNAPSHOT_MAX_MB = 200
+UNKNOWN_SNAPSHOT_SETTLE_SEC = 2.0
+
+# Event bus: run_system.py publishes check-in/out, unknown, occupancy and
+# health events on 127.0.0.1:EVENT_BUS_PORT; the API follows them to keep
+# live state in memory. The last EVENT_BUS_RING_SIZE events are replayed to
+# a reconnecting API.
+EVENT_BUS_ENABLED = True
+EVENT_BUS_PORT = 8765
+EVENT_BUS_RING_SIZE = 10000
+EVENT_BUS_HEALTH_INTERVAL_SEC = 1.0
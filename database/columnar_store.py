@@ -0,0 +1,209 @@
+"""
+Columnar (Parquet) copy of closed attendance sessions for long-range reports.
+
+The exporter compacts closed face_attendance rows into hive-partitioned
+files (<root>/date=YYYY-MM-DD/part-<highest id in the file>.parquet) and
+remembers the highest id it has looked at plus the ids below it that were
+still open, so each run only appends new sessions and the ones closed since. Range
+aggregates are then answered with Arrow scans over the matching date
+partitions, without touching the live SQLite DB.
+
+pyarrow is optional; it is imported on first use.
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+STATE_FILE = "_export_state.json"
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("The columnar store needs pyarrow: pip install pyarrow")
+    return pa, pc, ds, pq
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class ColumnarAttendanceStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    # ---------------- EXPORT ----------------
+
+    def _load_state(self):
+        path = self.root / STATE_FILE
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {"last_id": 0, "open_ids": []}
+
+    def _save_state(self, state):
+        tmp_path = self.root / f"{STATE_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        tmp_path.replace(self.root / STATE_FILE)
+
+    def archive_limits(self):
+        """
+        (max_id, keep_ids) for database.retention.archive_sessions: rows past
+        the last export and closed rows still pending here must stay in SQLite
+        """
+        state = self._load_state()
+        return state["last_id"], state.get("open_ids", [])
+
+    def export(self, db_path, today=None):
+        """
+        Append sessions closed since the last export. Rows still open are
+        remembered (open_ids in the state file) and exported in the run after
+        they close, whatever day they started on: the writer closes a
+        person's latest open session, overnight ones included. Ids that are
+        gone from the DB (archived) are dropped. Returns the number of rows
+        written. `today` is unused and kept for callers.
+        """
+        pa, _, _, pq = _arrow()
+        self.root.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+        open_ids = set(state.get("open_ids", []))
+
+        columns_sql = (
+            "SELECT id, person_id, in_time, out_time, duration_seconds, confidence, "
+            "substr(date, 1, 10) FROM face_attendance"
+        )
+        conn = sqlite3.connect(str(db_path))
+        try:
+            (max_id,) = conn.execute("SELECT MAX(id) FROM face_attendance").fetchone()
+            limit = max(max_id or 0, state["last_id"])
+
+            candidates = conn.execute(
+                columns_sql + " WHERE id > ? AND id <= ? ORDER BY id", (state["last_id"], limit)
+            ).fetchall()
+            if open_ids:
+                # Left open by earlier runs (a few rows: people inside at the time)
+                marks = ",".join("?" * len(open_ids))
+                candidates = conn.execute(
+                    columns_sql + f" WHERE id IN ({marks}) ORDER BY id", sorted(open_ids)
+                ).fetchall() + candidates
+        finally:
+            conn.close()
+
+        rows = [row for row in candidates if row[3] is not None]
+        still_open = {row[0] for row in candidates if row[3] is None}
+        if not rows and limit == state["last_id"] and still_open == open_ids:
+            return 0
+
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[6], []).append(row)
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("person_id", pa.string()),
+            ("in_time", pa.timestamp("us")),
+            ("out_time", pa.timestamp("us")),
+            ("duration_seconds", pa.float64()),
+            ("confidence", pa.float64()),
+        ])
+
+        for day, day_rows in by_day.items():
+            columns = list(zip(*day_rows))
+            table = pa.table([
+                pa.array(columns[0], pa.int64()),
+                pa.array(columns[1], pa.string()),
+                # SQLite DateTime text ("YYYY-MM-DD HH:MM:SS.ffffff") parses in one cast
+                pa.array(columns[2], pa.string()).cast(pa.timestamp("us")),
+                pa.array(columns[3], pa.string()).cast(pa.timestamp("us")),
+                pa.array(columns[4], pa.float64()),
+                pa.array(columns[5], pa.float64()),
+            ], schema=schema)
+
+            # Each row is exported once, so its highest id names the file uniquely
+            # (a run replayed after a crash overwrites its own files)
+            partition = self.root / f"date={day}"
+            partition.mkdir(exist_ok=True)
+            pq.write_table(table, partition / f"part-{day_rows[-1][0]:012d}.parquet", compression="zstd")
+
+        self._save_state({
+            "last_id": limit, "open_ids": sorted(still_open),
+            "exported_at": datetime.now().isoformat(timespec="seconds")
+        })
+        return len(rows)
+
+    # ---------------- QUERIES ----------------
+
+    def scan(self, start_date, end_date, columns=None):
+        """Arrow table of sessions with start_date <= date <= end_date"""
+        pa, pc, ds, _ = _arrow()
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        if not self.root.exists():
+            return None
+
+        dataset = ds.dataset(
+            str(self.root),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive"),
+            exclude_invalid_files=True,
+            ignore_prefixes=["_", "."]
+        )
+        date_field = ds.field("date")
+        return dataset.to_table(
+            columns=columns,
+            filter=(date_field >= start_date) & (date_field <= end_date)
+        )
+
+    def worker_minutes(self, start_date, end_date):
+        """{person_id: minutes on site} over the range"""
+        table = self.scan(start_date, end_date, ["person_id", "duration_seconds"])
+        if table is None or table.num_rows == 0:
+            return {}
+        totals = table.group_by("person_id").aggregate([("duration_seconds", "sum")])
+        return {
+            person_id: round(seconds / 60, 1)
+            for person_id, seconds in zip(
+                totals["person_id"].to_pylist(), totals["duration_seconds_sum"].to_pylist()
+            )
+        }
+
+    def late_counts(self, start_date, end_date, work_start="09:00"):
+        """{person_id: days whose first check-in was after work_start}"""
+        _, pc, _, _ = _arrow()
+        table = self.scan(start_date, end_date, ["person_id", "date", "in_time"])
+        if table is None or table.num_rows == 0:
+            return {}
+
+        first_in = table.group_by(["person_id", "date"]).aggregate([("in_time", "min")])
+        ts = first_in["in_time_min"]
+        seconds = pc.add(
+            pc.add(pc.multiply(pc.hour(ts), 3600), pc.multiply(pc.minute(ts), 60)),
+            pc.second(ts)
+        )
+        hours, minutes = map(int, work_start.split(":"))
+        late = first_in.filter(pc.greater(seconds, hours * 3600 + minutes * 60))
+
+        counts = late.group_by("person_id").aggregate([("date", "count")])
+        return dict(zip(counts["person_id"].to_pylist(), counts["date_count"].to_pylist()))
+
+    def daily_uniques(self, start_date, end_date):
+        """{YYYY-MM-DD: distinct workers seen} over the range"""
+        table = self.scan(start_date, end_date, ["person_id", "date"])
+        if table is None or table.num_rows == 0:
+            return {}
+        per_day = table.group_by("date").aggregate([("person_id", "count_distinct")])
+        return {
+            day.strftime("%Y-%m-%d"): count
+            for day, count in sorted(zip(
+                per_day["date"].to_pylist(), per_day["person_id_count_distinct"].to_pylist()
+            ))
+        }
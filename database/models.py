@@ -1,18 +1,35 @@
 from sqlalchemy import (
-    create_engine, Column, Integer, String,
-    Float, DateTime
+    create_engine, event, Column, Integer, String,
+    Float, DateTime, LargeBinary, Index
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import datetime
 
-DATABASE_URL = "sqlite:///database/face_attendance.db"
+from config.attendance_config import API_DB_WORKERS
 
+DATABASE_PATH = "database/face_attendance.db"
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+# One pooled engine per process, shared by every session; sized for the
+# API's DB executor threads (config API_DB_WORKERS)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    pool_size=API_DB_WORKERS,
+    max_overflow=4,
+    pool_pre_ping=True
 )
 
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _):
+    # WAL: API readers no longer wait on the tracking process's writes
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
@@ -28,6 +45,9 @@ class FaceAttendance(Base):
     date = Column(DateTime, default=datetime.date.today)
     confidence = Column(Float, nullable=True)
 
+    # Covering index for per-day distinct-worker counts (GROUP BY date)
+    __table_args__ = (Index("ix_face_attendance_date_person", "date", "person_id"),)
+
 
 class SystemSettings(Base):
     __tablename__ = "system_settings"
@@ -37,5 +57,97 @@ class SystemSettings(Base):
     value = Column(String)
 
 
+class Worker(Base):
+    """Registered workers, synced from data/known_faces by WorkerRegistry"""
+    __tablename__ = "workers"
+
+    worker_id = Column(String, primary_key=True)
+    name = Column(String)
+    image_name = Column(String, nullable=True)       # profile image inside known_faces/<worker_id>/
+    thumbnail = Column(LargeBinary, nullable=True)   # JPEG
+    thumbnail_etag = Column(String, nullable=True)
+    images_mtime = Column(Integer, default=0)        # WorkerRegistry._signature() of the folder at last sync
+    updated_at = Column(DateTime, default=datetime.datetime.now)
+
+
+class UnknownDetection(Base):
+    """One row per unknown face: repeated detections fold in (see database.unknown_store)"""
+    __tablename__ = "unknown_detections"
+
+    id = Column(Integer, primary_key=True)
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime, index=True)
+    count = Column(Integer, default=1)
+    snapshot_path = Column(String, nullable=True)
+    confidence = Column(Float, nullable=True)
+    location = Column(String, nullable=True)
+    embedding = Column(LargeBinary, nullable=True)   # L2-normalised float32 centroid
+
+
+# Monotonic change sequence over face_attendance: every insert or update
+# bumps change_counter and stamps the row with the new value, so readers can
+# ask for "everything changed since cursor N". Triggers live in the DB, so
+# every writer (tracker, scripts, replays) is covered without app changes.
+# change_seq is deliberately not mapped on FaceAttendance so ORM code keeps
+# working against DBs that haven't been migrated yet. Deletes (retention
+# archiving) are not tracked.
+_CHANGE_TRACKING_DDL = (
+    "CREATE TABLE IF NOT EXISTS change_counter ("
+    "id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO change_counter (id, seq) VALUES (1, 0)",
+    "CREATE TRIGGER IF NOT EXISTS face_attendance_change_insert "
+    "AFTER INSERT ON face_attendance BEGIN "
+    "UPDATE change_counter SET seq = seq + 1 WHERE id = 1; "
+    "UPDATE face_attendance SET change_seq = (SELECT seq FROM change_counter WHERE id = 1) "
+    "WHERE id = NEW.id; END",
+    "CREATE TRIGGER IF NOT EXISTS face_attendance_change_update "
+    "AFTER UPDATE OF person_id, date, in_time, out_time, duration_seconds, confidence "
+    "ON face_attendance BEGIN "
+    "UPDATE change_counter SET seq = seq + 1 WHERE id = 1; "
+    "UPDATE face_attendance SET change_seq = (SELECT seq FROM change_counter WHERE id = 1) "
+    "WHERE id = NEW.id; END",
+)
+
+
+def upgrade_schema(bind):
+    """
+    Bring an existing DB up to the current face_attendance schema: missing
+    indexes, change_seq + counter + triggers (idempotent)
+    """
+    with bind.begin() as conn:
+        FaceAttendance.__table__.create(bind=conn, checkfirst=True)
+        for index in FaceAttendance.__table__.indexes:
+            index.create(bind=conn, checkfirst=True)
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(face_attendance)")}
+        if "change_seq" not in columns:
+            conn.exec_driver_sql("ALTER TABLE face_attendance ADD COLUMN change_seq INTEGER")
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_face_attendance_change_seq ON face_attendance (change_seq)"
+        )
+        for statement in _CHANGE_TRACKING_DDL:
+            conn.exec_driver_sql(statement)
+        # Rows written before tracking existed: number them in id order, below any new change
+        if conn.exec_driver_sql("SELECT 1 FROM face_attendance WHERE change_seq IS NULL LIMIT 1").first():
+            conn.exec_driver_sql(
+                "UPDATE face_attendance SET change_seq = id + (SELECT seq FROM change_counter WHERE id = 1) "
+                "WHERE change_seq IS NULL"
+            )
+            conn.exec_driver_sql(
+                "UPDATE change_counter SET seq = (SELECT MAX(change_seq) FROM face_attendance) WHERE id = 1"
+            )
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+
+def create_session_factory(db_path):
+    """Session factory for a separate SQLite file (e.g. a scratch DB for replays)"""
+    scratch_engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=scratch_engine)
+    upgrade_schema(scratch_engine)
+    return sessionmaker(bind=scratch_engine)
@@ -0,0 +1,150 @@
+"""
+Retention for face_attendance: sessions older than the hot window move out
+of SQLite into gzip'd CSV files per month, so the live table and its scans
+stay small. Each run adds its own part file per month
+(face_attendance_YYYY-MM.<first id>.csv.gz) instead of rewriting the month;
+older archives may hold a single face_attendance_YYYY-MM.csv.gz. Archived
+rows keep their ids and the DB's text timestamps; read_archived() streams
+them back for any date range so readers can merge them with the hot table.
+
+Sessions not yet copied to the columnar store (database.columnar_store)
+must not be archived: pass its archive_limits() as max_id / keep_ids
+(scripts/archive_attendance.py does).
+"""
+import csv
+import gzip
+import os
+import sqlite3
+from datetime import date as dt_date, timedelta
+from pathlib import Path
+
+ARCHIVE_COLUMNS = ("id", "person_id", "date", "in_time", "out_time", "duration_seconds", "confidence")
+
+
+def archive_path(archive_dir, month, first_id=None):
+    """The month's file written by one archive run (first_id None: the single-file layout)"""
+    part = f".{first_id:012d}" if first_id is not None else ""
+    return Path(archive_dir) / f"face_attendance_{month}{part}.csv.gz"
+
+
+def month_files(archive_dir, month):
+    """The month's archive files, single-file layout first, then parts in id order"""
+    return sorted(
+        Path(archive_dir).glob(f"face_attendance_{month}*.csv.gz"),
+        key=lambda p: (p.name != archive_path(archive_dir, month).name, p.name)
+    )
+
+
+def archived_months(archive_dir):
+    """Sorted YYYY-MM months present in the archive"""
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+    return sorted({
+        p.name[len("face_attendance_"):][:7]
+        for p in archive_dir.glob("face_attendance_*.csv.gz")
+    })
+
+
+def _read_month(path):
+    with gzip.open(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            yield row
+
+
+def _write_month(path, rows):
+    """Write one archive file atomically"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ARCHIVE_COLUMNS)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def archive_sessions(db_path, archive_dir, keep_days=90, today=None, vacuum=True,
+                     max_id=None, keep_ids=()):
+    """
+    Move sessions dated more than `keep_days` ago into the monthly archive.
+    Only ids <= max_id are moved (None = no limit), and closed sessions in
+    keep_ids stay: both for rows the columnar export has not copied yet.
+    Part files are written (and fsync'd) before the rows are deleted; a
+    crash in between leaves duplicates that readers drop by id, never a gap.
+    Returns {month: rows archived}.
+    """
+    today = today or dt_date.today()
+    cutoff = (today - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    keep_ids = set(keep_ids)
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        where, params = "date < ?", [cutoff]
+        if max_id is not None:
+            where, params = where + " AND id <= ?", params + [max_id]
+        rows = [
+            row for row in conn.execute(
+                f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM face_attendance WHERE {where} ORDER BY id", params
+            )
+            if not (row[0] in keep_ids and row[4] is not None)
+        ]
+        if not rows:
+            return {}
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row[2][:7], []).append(row)
+
+        # A new part per month: nothing already archived is read or rewritten
+        for month, month_rows in by_month.items():
+            _write_month(archive_path(archive_dir, month, month_rows[0][0]), month_rows)
+
+        conn.executemany("DELETE FROM face_attendance WHERE id = ?", [(row[0],) for row in rows])
+        conn.commit()
+        if vacuum:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    return {month: len(month_rows) for month, month_rows in by_month.items()}
+
+
+def read_archived(archive_dir, start_date=None, end_date=None):
+    """
+    Yield archived rows as dicts of ARCHIVE_COLUMNS (DB text formats) with
+    start_date <= date <= end_date (YYYY-MM-DD strings, None = unbounded).
+    Only month files overlapping the range are opened.
+    """
+    for month in archived_months(archive_dir):
+        if start_date and month < start_date[:7]:
+            continue
+        if end_date and month > end_date[:7]:
+            continue
+        seen = set()   # a crash-replayed run can repeat rows in a second part
+        for row in (row for path in month_files(archive_dir, month) for row in _read_month(path)):
+            record = dict(zip(ARCHIVE_COLUMNS, row))
+            if record["id"] in seen:
+                continue
+            seen.add(record["id"])
+            day = record["date"][:10]
+            if (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+            record["id"] = int(record["id"])
+            record["out_time"] = record["out_time"] or None
+            record["duration_seconds"] = float(record["duration_seconds"]) if record["duration_seconds"] else None
+            record["confidence"] = float(record["confidence"]) if record["confidence"] else None
+            yield record
+
+
+def rolled_csv_path(file_path, when, roll):
+    """attendance_log.csv -> attendance_log_2024-03.csv (roll="month") / _2024-03-04 ("day")"""
+    if not roll:
+        return str(file_path)
+    stamp = when.strftime("%Y-%m" if roll == "month" else "%Y-%m-%d")
+    root, ext = os.path.splitext(str(file_path))
+    return f"{root}_{stamp}{ext}"
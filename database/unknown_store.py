@@ -0,0 +1,273 @@
+"""
+Unknown-face detections backed by the `unknown_detections` table.
+
+Each row is one stranger, not one sighting: a detection whose embedding is
+at least `similarity` (cosine) to a recent stranger's centroid bumps that
+row's count / last_seen instead of adding a new one. The newest `capacity`
+strangers are kept in memory (a ring ordered by last_seen) and serve reads
+and matching; the table survives restarts and is trimmed to `max_rows`.
+At most every `check_interval` seconds the table is checked for writes from
+other processes and the ring reloaded if it changed.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+ID_PREFIX = "UNK-"
+
+
+def _normalise(embedding):
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
+
+
+class UnknownDetectionStore:
+    def __init__(self, session_factory=None, capacity=500, similarity=0.6,
+                 max_rows=10000, check_interval=5.0):
+        # Defaults to database.models.SessionLocal (the live DB)
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.similarity = similarity
+        self.max_rows = max_rows
+        self.check_interval = check_interval
+
+        self._lock = threading.RLock()
+        self._ring = None        # row id -> entry dict, oldest last_seen first
+        self._matrix = None      # (row ids, stacked centroids) for matching
+        self._signature = None   # (rows, max id, max last_seen) at last load
+        self._checked_at = 0.0
+
+    def _session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        from database.models import SessionLocal
+        return SessionLocal()
+
+    @staticmethod
+    def format_id(row_id):
+        return f"{ID_PREFIX}{row_id:03d}"
+
+    @staticmethod
+    def parse_id(detection_id):
+        """Row id for "UNK-042" (None if it isn't one of ours)"""
+        if not detection_id.startswith(ID_PREFIX):
+            return None
+        try:
+            return int(detection_id[len(ID_PREFIX):])
+        except ValueError:
+            return None
+
+    # ---------------- LOAD ----------------
+
+    def _read_signature(self, db):
+        from sqlalchemy import func
+        from database.models import UnknownDetection
+        return tuple(db.query(
+            func.count(UnknownDetection.id), func.max(UnknownDetection.id), func.max(UnknownDetection.last_seen)
+        ).one())
+
+    def _entry(self, row):
+        return {
+            'row_id': row.id,
+            'first_seen': row.first_seen,
+            'last_seen': row.last_seen,
+            'count': row.count,
+            'snapshot_path': row.snapshot_path,
+            'confidence': row.confidence,
+            'location': row.location,
+            'embedding': np.frombuffer(row.embedding, dtype=np.float32) if row.embedding else None
+        }
+
+    def _load(self):
+        from database.models import UnknownDetection
+
+        db = self._session()
+        try:
+            UnknownDetection.__table__.create(bind=db.get_bind(), checkfirst=True)
+            rows = db.query(UnknownDetection).order_by(
+                UnknownDetection.last_seen.desc(), UnknownDetection.id.desc()
+            ).limit(self.capacity).all()
+            self._signature = self._read_signature(db)
+        finally:
+            db.close()
+
+        self._ring = OrderedDict((row.id, self._entry(row)) for row in reversed(rows))
+        self._matrix = None
+        self._checked_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self._ring is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if self._ring is None:
+            self._load()
+            return
+        db = self._session()
+        try:
+            signature = self._read_signature(db)
+        finally:
+            db.close()
+        if signature != self._signature:
+            self._load()
+        else:
+            self._checked_at = time.monotonic()
+
+    # ---------------- WRITE ----------------
+
+    def _match(self, vector):
+        """Row id of the most similar stranger in the ring, if similar enough"""
+        if self._matrix is None:
+            ids = [row_id for row_id, entry in self._ring.items() if entry['embedding'] is not None]
+            self._matrix = (ids, np.stack([self._ring[i]['embedding'] for i in ids]) if ids else None)
+        ids, centroids = self._matrix
+        if centroids is None:
+            return None
+        scores = centroids @ vector
+        best = int(np.argmax(scores))
+        return ids[best] if scores[best] >= self.similarity else None
+
+    def add_detection(self, snapshot_path=None, confidence=0.0, embedding=None,
+                      location="Camera Feed", now=None):
+        """
+        Record one sighting of an unknown face. With an embedding it folds
+        into the matching stranger if there is one; returns that stranger.
+        """
+        from database.models import UnknownDetection
+
+        now = now or datetime.now()
+        vector = _normalise(embedding) if embedding is not None else None
+        confidence = int(confidence * 100) if confidence > 0 else 85
+
+        with self._lock:
+            self._ensure_fresh()
+            match_id = self._match(vector) if vector is not None else None
+
+            db = self._session()
+            try:
+                row = db.get(UnknownDetection, match_id) if match_id is not None else None
+                if row is not None:
+                    # Running mean of the sightings, re-normalised
+                    centroid = _normalise(np.frombuffer(row.embedding, dtype=np.float32) * row.count + vector)
+                    row.count += 1
+                    row.last_seen = now
+                    row.embedding = centroid.tobytes()
+                    if snapshot_path and confidence >= (row.confidence or 0):
+                        row.snapshot_path = snapshot_path
+                        row.confidence = confidence
+                else:
+                    row = UnknownDetection(
+                        first_seen=now, last_seen=now, count=1, snapshot_path=snapshot_path,
+                        confidence=confidence, location=location,
+                        embedding=vector.tobytes() if vector is not None else None
+                    )
+                    db.add(row)
+                db.commit()
+                self._trim(db)
+
+                entry = self._entry(row)
+                self._signature = self._read_signature(db)
+            finally:
+                db.close()
+
+            self._ring.pop(entry['row_id'], None)
+            self._ring[entry['row_id']] = entry
+            while len(self._ring) > self.capacity:
+                self._ring.popitem(last=False)
+            self._matrix = None
+            return self._public(entry)
+
+    def _trim(self, db):
+        from database.models import UnknownDetection
+
+        excess = db.query(UnknownDetection).count() - self.max_rows
+        if excess > 0:
+            oldest = [
+                row_id for (row_id,) in db.query(UnknownDetection.id)
+                .order_by(UnknownDetection.last_seen, UnknownDetection.id).limit(excess)
+            ]
+            db.query(UnknownDetection).filter(UnknownDetection.id.in_(oldest)).delete(synchronize_session=False)
+            db.commit()
+            for row_id in oldest:
+                self._ring.pop(row_id, None)
+
+    def dismiss(self, detection_id):
+        """Delete one stranger by id; False if there is no such entry"""
+        from database.models import UnknownDetection
+
+        row_id = self.parse_id(detection_id)
+        if row_id is None:
+            return False
+        with self._lock:
+            self._ensure_fresh()
+            db = self._session()
+            try:
+                deleted = db.query(UnknownDetection).filter(UnknownDetection.id == row_id).delete()
+                db.commit()
+                self._signature = self._read_signature(db)
+            finally:
+                db.close()
+            if self._ring.pop(row_id, None) is not None:
+                self._matrix = None
+            return deleted > 0
+
+    def clear(self):
+        """Delete all unknown detections"""
+        from database.models import UnknownDetection
+
+        with self._lock:
+            db = self._session()
+            try:
+                UnknownDetection.__table__.create(bind=db.get_bind(), checkfirst=True)
+                db.query(UnknownDetection).delete()
+                db.commit()
+            finally:
+                db.close()
+            self._ring = None
+
+    # ---------------- READ ----------------
+
+    def _public(self, entry):
+        return {
+            'id': self.format_id(entry['row_id']),
+            'timestamp': entry['last_seen'].strftime("%I:%M %p"),
+            'firstSeen': entry['first_seen'].isoformat(),
+            'lastSeen': entry['last_seen'].isoformat(),
+            'count': entry['count'],
+            'snapshot_path': entry['snapshot_path'],
+            'confidence': entry['confidence'],
+            'location': entry['location']
+        }
+
+    def get_all(self):
+        """Recent strangers, most recently seen first"""
+        with self._lock:
+            self._ensure_fresh()
+            return [self._public(entry) for entry in reversed(self._ring.values())]
+
+    def get(self, detection_id):
+        """One stranger by id (None if unknown)"""
+        from database.models import UnknownDetection
+
+        row_id = self.parse_id(detection_id)
+        if row_id is None:
+            return None
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._ring.get(row_id)
+            if entry is None:
+                db = self._session()
+                try:
+                    row = db.get(UnknownDetection, row_id)
+                    entry = self._entry(row) if row is not None else None
+                finally:
+                    db.close()
+            return self._public(entry) if entry is not None else None
+
+    def count(self):
+        """Number of strangers in the in-memory window"""
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._ring)
@@ -0,0 +1,172 @@
+"""
+Registered-worker registry backed by the `workers` table.
+
+data/known_faces/<worker_id>/ stays the source of truth for enrollment;
+sync() reconciles the table with it (only folders whose signature changed
+are re-read) and stores a small JPEG thumbnail per worker. A folder's
+signature covers its mtime and the profile image's mtime and size, since
+overwriting that image in place leaves the folder mtime alone. Readers are
+served from an in-memory copy; at most every `check_interval` seconds the
+signatures are compared with the last sync and sync() runs if any changed,
+so the worker list and avatars don't touch the filesystem per request.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+THUMBNAIL_SIZE = 128
+
+WorkerInfo = namedtuple("WorkerInfo", "worker_id name image_name thumbnail etag")
+
+
+def display_name(worker_id):
+    return worker_id.replace("_", " ").title()  # "Worker_001" -> "Worker 001"
+
+
+def make_thumbnail(image_path, size=THUMBNAIL_SIZE):
+    """Centre-cropped square JPEG bytes (the original file if OpenCV is unavailable)"""
+    try:
+        import cv2
+    except ImportError:
+        return Path(image_path).read_bytes()
+
+    img = cv2.imread(str(image_path))
+    if img is None:
+        return None
+    h, w = img.shape[:2]
+    side = min(h, w)
+    y0, x0 = (h - side) // 2, (w - side) // 2
+    img = cv2.resize(img[y0:y0 + side, x0:x0 + side], (size, size), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buf.tobytes() if ok else None
+
+
+class WorkerRegistry:
+    def __init__(self, known_faces_path, session_factory=None, check_interval=5.0):
+        self.known_faces_path = Path(known_faces_path)
+        # Defaults to database.models.SessionLocal (the live DB)
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._workers = None     # worker_id -> WorkerInfo
+        self._ids = []
+        self._mtimes = None      # worker folder -> _signature() at last sync
+        self._checked_at = 0.0
+        self._version = 0        # bumped on every sync, for response ETags
+
+    def _session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        from database.models import SessionLocal
+        return SessionLocal()
+
+    def _scan_mtimes(self):
+        if not self.known_faces_path.exists():
+            return {}
+        return {
+            entry.name: self._signature(entry)
+            for entry in os.scandir(self.known_faces_path) if entry.is_dir()
+        }
+
+    @staticmethod
+    def _signature(folder):
+        """Folder mtime + profile image (first image by name) mtime and size, as one 63-bit int"""
+        parts = [folder.stat().st_mtime_ns]
+        images = sorted(
+            (e for e in os.scandir(folder.path) if Path(e.name).suffix.lower() in IMAGE_SUFFIXES),
+            key=lambda e: e.name
+        )
+        if images:
+            stat = images[0].stat()
+            parts += [images[0].name, stat.st_mtime_ns, stat.st_size]
+        return int.from_bytes(hashlib.sha1(repr(parts).encode()).digest()[:8], "big") >> 1
+
+    # ---------------- SYNC ----------------
+
+    def sync(self):
+        """Reconcile the workers table with known_faces/ and reload the cache"""
+        from database.models import Worker
+
+        with self._lock:
+            on_disk = self._scan_mtimes()
+
+            db = self._session()
+            try:
+                Worker.__table__.create(bind=db.get_bind(), checkfirst=True)
+                rows = {row.worker_id: row for row in db.query(Worker).all()}
+
+                for worker_id, mtime in on_disk.items():
+                    row = rows.get(worker_id)
+                    if row is not None and row.images_mtime == mtime:
+                        continue
+                    if row is None:
+                        row = Worker(worker_id=worker_id)
+                        db.add(row)
+                        rows[worker_id] = row
+                    self._refresh_row(row, mtime)
+
+                for worker_id in set(rows) - set(on_disk):
+                    db.delete(rows.pop(worker_id))
+
+                db.commit()
+                self._workers = {
+                    worker_id: WorkerInfo(worker_id, row.name, row.image_name, row.thumbnail, row.thumbnail_etag)
+                    for worker_id, row in rows.items()
+                }
+            finally:
+                db.close()
+
+            self._ids = sorted(self._workers)
+            self._version += 1
+            self._mtimes = on_disk
+            self._checked_at = time.monotonic()
+
+    def _refresh_row(self, row, mtime):
+        folder = self.known_faces_path / row.worker_id
+        images = sorted(p.name for p in folder.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+
+        row.name = display_name(row.worker_id)
+        row.image_name = images[0] if images else None
+        row.thumbnail = make_thumbnail(folder / images[0]) if images else None
+        row.thumbnail_etag = f'"{hashlib.sha1(row.thumbnail).hexdigest()[:16]}"' if row.thumbnail else None
+        row.images_mtime = mtime
+        row.updated_at = datetime.now()
+        logger.info(f"[REGISTRY] Synced {row.worker_id} ({len(images)} image(s))")
+
+    def _ensure_fresh(self):
+        if self._workers is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if self._workers is None or self._scan_mtimes() != self._mtimes:
+            self.sync()
+        else:
+            self._checked_at = time.monotonic()
+
+    # ---------------- READ ----------------
+
+    def worker_ids(self):
+        self._ensure_fresh()
+        return list(self._ids)
+
+    def version(self):
+        """Changes whenever the set of workers or their images changes"""
+        self._ensure_fresh()
+        return self._version
+
+    def get(self, worker_id):
+        self._ensure_fresh()
+        return self._workers.get(worker_id)
+
+    def image_path(self, worker_id):
+        info = self.get(worker_id)
+        if info is None or info.image_name is None:
+            return None
+        return self.known_faces_path / worker_id / info.image_name
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { motion } from "framer-motion"
 import { AttendanceTable } from "@/components/history/attendance-table"
 import type { AttendanceEvent } from "@/lib/mock-data"
@@ -9,78 +9,118 @@ import { Loader2 } from "lucide-react"
 export default function HistoryPage() {
   const [events, setEvents] = useState<AttendanceEvent[]>([])
   const [loading, setLoading] = useState(true)
+  // Sessions by id plus the last change cursor: seeded once from the full
+  // (archive-aware) history, then each poll only fetches what changed since
+  const recordsRef = useRef(new Map<number, any>())
+  const cursorRef = useRef<number | null>(null)
+  // Day the statuses were last computed for: Active / Incomplete change at midnight
+  const renderedDayRef = useRef("")
 
   useEffect(() => {
+    const localDay = (d: Date) =>
+      `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`
+
+    const fetchSeed = async () => {
+      const res = await fetch("http://127.0.0.1:8000/api/attendance/raw?format=rows&ids=true")
+      if (!res.ok) return false
+      const page = await res.json()
+      page.rows.forEach((row: any[]) => {
+        const record = Object.fromEntries(page.columns.map((column: string, i: number) => [column, row[i]]))
+        recordsRef.current.set(record.id, record)
+      })
+      cursorRef.current = page.cursor
+      return true
+    }
+
+    const fetchChanges = async () => {
+      let changed = false
+      let hasMore = true
+      while (hasMore) {
+        const res = await fetch(`http://127.0.0.1:8000/api/attendance/changes?since=${cursorRef.current}`)
+        if (!res.ok) break
+        const page = await res.json()
+        page.records.forEach((record: any) => recordsRef.current.set(record.id, record))
+        changed = changed || page.records.length > 0
+        cursorRef.current = page.cursor
+        hasMore = page.hasMore
+      }
+      return changed
+    }
+
+    const render = (todayStr: string) => {
+      const data = Array.from(recordsRef.current.values()).sort((a, b) => a.id - b.id)
+
+      // Identify currently active workers (those with at least one active session TODAY)
+      const activeWorkerIds = new Set<string>()
+
+      data.forEach((record: any) => {
+        if (!record.out_time && record.person_id && record.date === todayStr) {
+          activeWorkerIds.add(record.person_id)
+        }
+      })
+
+      // Map API data to UI format
+      const mappedEvents: AttendanceEvent[] = data.map((record: any) => {
+        // Helper to clean date string
+        const safeDate = (dateStr: string, timeStr: string) => {
+          if (!dateStr || !timeStr) return null
+          // backend might send date as "YYYY-MM-DD" and time as "HH:MM:SS"
+          return `${dateStr}T${timeStr}`
+        }
+
+        const inTimeStr = safeDate(record.date, record.in_time) || new Date().toISOString()
+        const outTimeStr = safeDate(record.date, record.out_time)
+        const workerId = record.person_id || "Unknown"
+
+        const isToday = record.date === todayStr
+        const isStale = !record.out_time && !isToday
+
+        let duration = "Ongoing"
+        let status = "Active"
+
+        if (record.out_time) {
+          duration = record.duration_sec ? `${(record.duration_sec / 60).toFixed(1)} min` : "0 min"
+          status = "Completed"
+        } else if (isStale) {
+          duration = "Did not checkout"
+          status = "Incomplete"
+        }
+
+        return {
+          id: `evt-${record.id}`,
+          workerId: workerId,
+          workerName: workerId.replace(/_/g, " "),
+          timestamp: inTimeStr, // For sorting
+          event: "IN",
+          confidence: record.confidence || 98,
+          inTime: inTimeStr,
+          outTime: outTimeStr,
+          duration: duration,
+          status: status,
+          currentStatus: activeWorkerIds.has(workerId) ? "Active" : "Inactive",
+          profileUrl: `http://127.0.0.1:8000/api/workers/${workerId}/image`, // New Profile URL
+          snapshotUrl: "", // We can keep empty or use actual snapshot if available/needed
+          workerAvatar: "" // logic handled in table or redundant
+        }
+      })
+      // Sort by date desc
+      setEvents(mappedEvents.reverse())
+      renderedDayRef.current = todayStr
+    }
+
     const fetchHistory = async () => {
+      let changed = false
       try {
-        const res = await fetch("http://127.0.0.1:8000/api/attendance/raw")
-        if (res.ok) {
-          const data = await res.json()
-
-          // Identify currently active workers (those with at least one active session TODAY)
-          const activeWorkerIds = new Set<string>()
-          const todayStr = new Date().toDateString()
-
-          data.forEach((record: any) => {
-            const recordDate = new Date(record.date).toDateString()
-            if (!record.out_time && record.person_id && recordDate === todayStr) {
-              activeWorkerIds.add(record.person_id)
-            }
-          })
-
-          // Map API data to UI format
-          const mappedEvents: AttendanceEvent[] = data.map((record: any, index: number) => {
-            // Helper to clean date string
-            const safeDate = (dateStr: string, timeStr: string) => {
-              if (!dateStr || !timeStr) return null
-              // backend might send date as "YYYY-MM-DD" and time as "HH:MM:SS"
-              return `${dateStr}T${timeStr}`
-            }
-
-            const inTimeStr = safeDate(record.date, record.in_time) || new Date().toISOString()
-            const outTimeStr = safeDate(record.date, record.out_time)
-            const workerId = record.person_id || "Unknown"
-
-            const recordDate = new Date(record.date).toDateString()
-            const isToday = recordDate === todayStr
-            const isStale = !record.out_time && !isToday
-
-            let duration = "Ongoing"
-            let status = "Active"
-
-            if (record.out_time) {
-              duration = record.duration_sec ? `${(record.duration_sec / 60).toFixed(1)} min` : "0 min"
-              status = "Completed"
-            } else if (isStale) {
-              duration = "Did not checkout"
-              status = "Incomplete"
-            }
-
-            return {
-              id: `evt-${index}`,
-              workerId: workerId,
-              workerName: workerId.replace(/_/g, " "),
-              timestamp: inTimeStr, // For sorting
-              event: "IN",
-              confidence: record.confidence || 98,
-              inTime: inTimeStr,
-              outTime: outTimeStr,
-              duration: duration,
-              status: status,
-              currentStatus: activeWorkerIds.has(workerId) ? "Active" : "Inactive",
-              profileUrl: `http://127.0.0.1:8000/api/workers/${workerId}/image`, // New Profile URL
-              snapshotUrl: "", // We can keep empty or use actual snapshot if available/needed
-              workerAvatar: "" // logic handled in table or redundant
-            }
-          })
-          // Sort by date desc
-          setEvents(mappedEvents.reverse())
-        }
+        changed = cursorRef.current === null ? await fetchSeed() : await fetchChanges()
       } catch (error) {
         console.error("Failed to fetch history:", error)
-      } finally {
-        setLoading(false)
       }
+      // Statuses depend on the date too: recompute after midnight even if nothing changed
+      const todayStr = localDay(new Date())
+      if (changed || todayStr !== renderedDayRef.current) {
+        render(todayStr)
+      }
+      setLoading(false)
     }
 
     fetchHistory()
@@ -0,0 +1,188 @@
+"""
+Face detector backends.
+
+Every backend exposes detect(image) -> [(bbox, score, face), ...] where
+`image` is an RGB frame (or window of one), bbox is (x, y, w, h) in that
+image and `face` is the crop handed to DeepFace.represent: RGB float32
+in [0, 1], the same format DeepFace.extract_faces produces. That contract
+matches tracking/detection_regions.RegionDetector, so any backend can be
+combined with ROIs and tiling.
+"""
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from tracking.detection_regions import merge_detections
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+YUNET_MODEL_PATH = BASE_DIR / "models" / "face_detection_yunet_2023mar.onnx"
+
+
+def crop_face(image, bbox):
+    x, y, w, h = bbox
+    crop = image[max(0, y):y + h, max(0, x):x + w]
+    return crop.astype(np.float32) / 255.0
+
+
+class RetinaFaceDetector:
+    """DeepFace RetinaFace. Accurate, slow on CPU."""
+
+    name = "retinaface"
+
+    def __init__(self, min_confidence=0.0):
+        from deepface import DeepFace  # heavy import, only when this backend is used
+        self._deepface = DeepFace
+        self.min_confidence = min_confidence
+
+    def detect(self, image):
+        img_h, img_w = image.shape[:2]
+        results = []
+        for face in self._deepface.extract_faces(
+            img_path=image,
+            detector_backend="retinaface",
+            enforce_detection=False,
+            align=False
+        ):
+            area = face["facial_area"]
+            # enforce_detection=False returns the whole window when nothing is found
+            if area["w"] > img_w * 0.9 and area["h"] > img_h * 0.9:
+                continue
+            score = face.get("confidence", 0.0)
+            if score < self.min_confidence:
+                continue
+            bbox = (area["x"], area["y"], area["w"], area["h"])
+            results.append((bbox, score, face["face"]))
+        return results
+
+
+class YuNetDetector:
+    """OpenCV DNN YuNet (cv2.FaceDetectorYN). Fast CNN, needs the ONNX model in models/."""
+
+    name = "yunet"
+
+    def __init__(self, model_path=None, score_threshold=0.7, nms_threshold=0.3):
+        model_path = str(model_path or YUNET_MODEL_PATH)
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"YuNet model not found: {model_path}")
+        self.net = cv2.FaceDetectorYN.create(
+            model_path, "", (320, 320), score_threshold, nms_threshold
+        )
+        self._input_size = (320, 320)
+
+    def detect(self, image):
+        img_h, img_w = image.shape[:2]
+        if self._input_size != (img_w, img_h):
+            self.net.setInputSize((img_w, img_h))
+            self._input_size = (img_w, img_h)
+
+        _, faces = self.net.detect(cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+        if faces is None:
+            return []
+
+        results = []
+        for row in faces:
+            bbox = tuple(int(v) for v in row[:4])
+            results.append((bbox, float(row[14]), crop_face(image, bbox)))
+        return results
+
+
+class HaarDetector:
+    """OpenCV Haar cascade (as tried in scripts/test_face_tracking.py). Cheapest, least accurate."""
+
+    name = "haar"
+
+    def __init__(self, scale_factor=1.2, min_neighbors=5, min_size=(30, 30)):
+        self.cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size
+        )
+        return [
+            ((int(x), int(y), int(w), int(h)), 1.0, crop_face(image, (int(x), int(y), int(w), int(h))))
+            for (x, y, w, h) in faces
+        ]
+
+
+class CascadeDetector:
+    """
+    Two-stage detection: a cheap `proposer` runs on a downscaled copy of the
+    image (one pass per pyramid scale) and the expensive `confirmer` only
+    looks at padded crops around the proposals. Frames with nobody at the
+    gate never reach the confirmer.
+    """
+
+    name = "cascade"
+
+    def __init__(self, proposer, confirmer, proposal_scales=(0.5,), padding=0.5):
+        self.proposer = proposer
+        self.confirmer = confirmer
+        self.proposal_scales = proposal_scales
+        self.padding = padding
+
+    def propose(self, image):
+        img_h, img_w = image.shape[:2]
+        proposals = []
+        for scale in self.proposal_scales:
+            small = image if scale == 1.0 else cv2.resize(
+                image, (max(1, int(img_w * scale)), max(1, int(img_h * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+            for (x, y, w, h), score, _ in self.proposer.detect(small):
+                bbox = (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+                proposals.append((bbox, score, None))
+
+        # Pyramid levels usually fire on the same face
+        return [bbox for bbox, _, _ in merge_detections(proposals)]
+
+    def detect(self, image):
+        img_h, img_w = image.shape[:2]
+        results = []
+        for (x, y, w, h) in self.propose(image):
+            pad_w, pad_h = int(w * self.padding), int(h * self.padding)
+            x1, y1 = max(0, x - pad_w), max(0, y - pad_h)
+            x2, y2 = min(img_w, x + w + pad_w), min(img_h, y + h + pad_h)
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            crop = np.ascontiguousarray(image[y1:y2, x1:x2])
+            for (bx, by, bw, bh), score, face in self.confirmer.detect(crop):
+                results.append(((bx + x1, by + y1, bw, bh), score, face))
+
+        return merge_detections(results)
+
+
+BACKENDS = {
+    "retinaface": RetinaFaceDetector,
+    "yunet": YuNetDetector,
+    "haar": HaarDetector,
+}
+
+
+def create_detector(backend="retinaface", **options):
+    """
+    Build a detector by name. For "cascade", `proposer` and `confirmer` name
+    the two stages (default haar -> retinaface) and `proposal_scales` sets
+    the pyramid the proposer runs on.
+    """
+    if backend == "cascade":
+        return CascadeDetector(
+            proposer=create_detector(options.get("proposer", "haar")),
+            confirmer=create_detector(options.get("confirmer", "retinaface")),
+            proposal_scales=tuple(options.get("proposal_scales", (0.5,))),
+            padding=options.get("padding", 0.5)
+        )
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown face detector backend: {backend}")
+    return BACKENDS[backend](**options)
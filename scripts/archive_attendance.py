@@ -0,0 +1,55 @@
+"""
+Move old face_attendance sessions out of the live SQLite DB into monthly
+compressed archives (see database/retention.py). The API keeps serving
+archived dates by reading the archive on demand.
+
+When the columnar store (scripts/export_columnar.py) is in use, only sessions
+it has already exported are archived; the rest wait for its next run.
+
+    python scripts/archive_attendance.py
+    python scripts/archive_attendance.py --keep-days 30 --no-vacuum
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from database.retention import archive_sessions
+from database.columnar_store import ColumnarAttendanceStore
+from database.models import DATABASE_PATH
+from config.attendance_config import RETENTION_HOT_DAYS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Archive old attendance sessions")
+    parser.add_argument("--db", default=str(BASE_DIR / DATABASE_PATH), help="SQLite attendance DB")
+    parser.add_argument("--archive", default=str(BASE_DIR / "data" / "archive"), help="Archive directory")
+    parser.add_argument("--columnar", default=str(BASE_DIR / "data" / "columnar"), help="Columnar store root")
+    parser.add_argument("--keep-days", type=int, default=RETENTION_HOT_DAYS, help="Days kept in SQLite")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after deleting")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    max_id, keep_ids = None, ()
+    if Path(args.columnar).exists():
+        max_id, keep_ids = ColumnarAttendanceStore(args.columnar).archive_limits()
+    archived = archive_sessions(
+        args.db, args.archive, keep_days=args.keep_days, vacuum=not args.no_vacuum,
+        max_id=max_id, keep_ids=keep_ids
+    )
+
+    if not archived:
+        print(f"Nothing older than {args.keep_days} days to archive.")
+        return
+    for month, count in sorted(archived.items()):
+        print(f"  {month}: {count} session(s)")
+    print(f"Archived {sum(archived.values())} session(s) -> {args.archive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare face detector backends on recorded clips.
+
+Runs every backend over the same frames and reports ms/frame and recall
+against a reference backend (RetinaFace by default), counting a reference
+face as found when a backend box overlaps it with IOU >= --iou.
+
+    python scripts/benchmark_face_detectors.py clips/gate_morning.mp4 clips/frames_dir \
+        --backends haar yunet cascade --every 5 --max-frames 200
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+# Add parent directory to Python path
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from camera.frame_source import iter_frames
+from recognition.face_detector import create_detector
+from tracking.face_tracker import compute_iou
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark face detector backends")
+    parser.add_argument("clips", nargs="+", help="Video files or image directories")
+    parser.add_argument("--backends", nargs="+", default=["haar", "yunet", "cascade"],
+                        help="Backends to compare (retinaface, yunet, haar, cascade)")
+    parser.add_argument("--reference", default="retinaface", help="Backend used as ground truth")
+    parser.add_argument("--every", type=int, default=5, help="Use every Nth frame")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frames per clip")
+    parser.add_argument("--min-size", type=int, default=60, help="Ignore faces smaller than this (px)")
+    parser.add_argument("--iou", type=float, default=0.4, help="IOU for a match")
+    parser.add_argument("--json", help="Write results to this file")
+    return parser.parse_args()
+
+
+def timed_detect(detector, rgb):
+    started = time.perf_counter()
+    faces = detector.detect(rgb)
+    return faces, (time.perf_counter() - started) * 1000
+
+
+def count_matches(reference, candidates, iou_threshold):
+    matched = 0
+    used = set()
+    for ref in reference:
+        for i, cand in enumerate(candidates):
+            if i not in used and compute_iou(ref, cand) >= iou_threshold:
+                used.add(i)
+                matched += 1
+                break
+    return matched
+
+
+def main():
+    args = parse_args()
+
+    names = [args.reference] + [b for b in args.backends if b != args.reference]
+    detectors = {}
+    for name in names:
+        try:
+            detectors[name] = create_detector(name)
+        except Exception as e:
+            print(f"[SKIP] {name}: {e}")
+
+    if args.reference not in detectors:
+        print(f"[ERROR] Reference backend '{args.reference}' unavailable")
+        sys.exit(1)
+
+    stats = {name: {"ms": [], "detections": 0, "matched": 0} for name in detectors}
+    reference_faces = 0
+    frames = 0
+
+    for clip in args.clips:
+        print(f"Processing {clip}...")
+        for _, frame, _ in iter_frames(clip, every=args.every, max_frames=args.max_frames):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frames += 1
+
+            reference = None
+            for name, detector in detectors.items():
+                faces, ms = timed_detect(detector, rgb)
+                boxes = [b for b, _, _ in faces if b[2] >= args.min_size and b[3] >= args.min_size]
+                stats[name]["ms"].append(ms)
+                stats[name]["detections"] += len(boxes)
+
+                if reference is None:
+                    reference = boxes
+                    reference_faces += len(boxes)
+                stats[name]["matched"] += count_matches(reference, boxes, args.iou)
+
+    if frames == 0:
+        print("[ERROR] No frames read")
+        sys.exit(1)
+
+    results = []
+    for name, s in stats.items():
+        ms = sorted(s["ms"])
+        results.append({
+            "backend": name,
+            "frames": frames,
+            "ms_per_frame": round(sum(ms) / len(ms), 2),
+            "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 2),
+            "detections": s["detections"],
+            "recall": round(s["matched"] / reference_faces, 3) if reference_faces else None
+        })
+
+    print()
+    print(f"{'BACKEND':<12}{'MS/FRAME':>10}{'P95 MS':>10}{'FACES':>8}{'RECALL':>9}")
+    print("-" * 49)
+    for r in results:
+        recall = f"{r['recall']:.3f}" if r["recall"] is not None else "--"
+        print(f"{r['backend']:<12}{r['ms_per_frame']:>10}{r['p95_ms']:>10}{r['detections']:>8}{recall:>9}")
+    print(f"\n{frames} frames, {reference_faces} reference faces ({args.reference})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"reference": args.reference, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compact closed attendance sessions into the Parquet store used for
+long-range reports (see database/columnar_store.py).
+
+    python scripts/export_columnar.py                   # one incremental export
+    python scripts/export_columnar.py --interval 3600   # keep exporting hourly
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from database.columnar_store import ColumnarAttendanceStore
+from database.models import DATABASE_PATH
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export closed sessions to date-partitioned Parquet")
+    parser.add_argument("--db", default=str(BASE_DIR / DATABASE_PATH), help="SQLite attendance DB")
+    parser.add_argument("--out", default=str(BASE_DIR / "data" / "columnar"), help="Store root directory")
+    parser.add_argument("--interval", type=float, help="Repeat every N seconds instead of exiting")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = ColumnarAttendanceStore(args.out)
+
+    while True:
+        started = time.perf_counter()
+        rows = store.export(args.db)
+        print(f"[EXPORT] {rows} session(s) -> {args.out} in {time.perf_counter() - started:.2f}s")
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Concurrent load test for the dashboard API.
+
+Each of --clients coroutines issues requests back-to-back (round-robin over
+--paths) for --duration seconds; the report gives requests/sec, p50/p99
+latency and error count per path.
+
+    python scripts/run_api.py                                  # in another shell
+    python scripts/load_test_api.py --clients 100 --duration 20
+    python scripts/load_test_api.py --paths /api/workers --json load.json
+
+Needs httpx, which the API itself does not: pip install httpx
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("The load test needs httpx: pip install httpx")
+
+DEFAULT_PATHS = ["/api/metrics", "/api/workers"]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def client_loop(client, paths, offset, deadline, latencies, errors):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[path] += 1
+                continue
+        except httpx.HTTPError:
+            errors[path] += 1
+            continue
+        latencies[path].append(time.perf_counter() - t0)
+
+
+async def run(base_url, paths, clients, duration, warmup):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        for path in paths:
+            await client.get(path)  # warm caches / connection
+
+        latencies = {path: [] for path in paths}
+        errors = {path: 0 for path in paths}
+        if warmup:
+            await asyncio.gather(*(
+                client_loop(client, paths, c, time.perf_counter() + warmup,
+                            {p: [] for p in paths}, {p: 0 for p in paths})
+                for c in range(clients)
+            ))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, paths, c, started + duration, latencies, errors)
+            for c in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    report = {}
+    for path in paths:
+        values = sorted(latencies[path])
+        report[path] = {
+            "requests": len(values),
+            "errors": errors[path],
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the dashboard API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds first")
+    parser.add_argument("--json", help="Also write the report to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"{args.clients} clients x {args.duration:.0f}s against {args.url}")
+    report = asyncio.run(run(args.url, args.paths, args.clients, args.duration, args.warmup))
+
+    print(f"\n{'PATH':<28}{'REQS':>8}{'ERR':>6}{'RPS':>9}{'P50 MS':>9}{'P99 MS':>9}")
+    for path, r in report.items():
+        print(f"{path:<28}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
+"""
+Compact new attendance events into face_attendance sessions (incremental;
+safe to re-run, see attendance/logic/session_manager.py).
+
+    python scripts/process_sessions.py
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
 from attendance.logic.session_manager import SessionManager
+from database.models import DATABASE_PATH
 
-sm = SessionManager()
-sm.process_events()
+sm = SessionManager(str(BASE_DIR / DATABASE_PATH))
+written = sm.process_events()
 
-print("Attendance sessions processed.")
+print(f"Attendance sessions processed: {written} written.")
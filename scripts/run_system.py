@@ -16,6 +16,23 @@ from identity.identity_resolver import IdentityResolver
 from attendance.state.state_manager import StateManager
 from attendance.logic.csv_writer import CSVAttendanceWriter
 from tracking.occupancy_counter import OccupancyCounter
+from tracking.occupancy_engine import OccupancyEngine
+from tracking.detection_regions import RegionDetector
+from recognition.face_detector import create_detector
+from tracking.frame_pipeline import FramePipeline
+from tracking.unknown_snapshots import UnknownSnapshotter
+from database.unknown_store import UnknownDetectionStore
+from utils.metrics import metrics
+from utils.sampling_profiler import SamplingProfiler
+from utils.event_bus import EventBus
+from config.attendance_config import (
+    OCCUPANCY_SAMPLE_FPS, OCCUPANCY_ZONES, DETECTION_REGIONS, FACE_DETECTOR,
+    METRICS_ENABLED, METRICS_WRITE_INTERVAL_SEC,
+    PROFILER_ENABLED, PROFILER_RATE_HZ, PROFILER_DURATION_SEC, CSV_ROLL,
+    UNKNOWN_CLUSTER_SIMILARITY, UNKNOWN_RING_SIZE, UNKNOWN_MAX_STORED,
+    UNKNOWN_SNAPSHOT_DIR, UNKNOWN_SNAPSHOT_MAX_MB, UNKNOWN_SNAPSHOT_SETTLE_SEC,
+    EVENT_BUS_ENABLED, EVENT_BUS_PORT, EVENT_BUS_RING_SIZE, EVENT_BUS_HEALTH_INTERVAL_SEC
+)
 
 # ... (logging setup remains same) ...
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +40,14 @@ logging.basicConfig(level=logging.INFO)
 print("Available GPUs:", tf.config.list_physical_devices('GPU'))
 
 # ---------------- INITIALIZATION ----------------
+metrics.enabled = METRICS_ENABLED
+
+# Live events for the API (check-in/out, unknowns, occupancy, health)
+event_bus = EventBus(port=EVENT_BUS_PORT, ring_size=EVENT_BUS_RING_SIZE).start() if EVENT_BUS_ENABLED else None
+
 tracker = PersonTracker(similarity_threshold=0.6, iou_threshold=0.3, disappear_time=30) 
 resolver = IdentityResolver(threshold=0.60)
-writer = CSVAttendanceWriter(file_path="attendance_log.csv")  # Initialize CSV Writer
+writer = CSVAttendanceWriter(file_path="attendance_log.csv", roll=CSV_ROLL, events=event_bus)  # Initialize CSV Writer
 state_manager = StateManager(in_threshold=10, out_threshold=20)
 
 # ---------------- MOBILE SSD SETUP ----------------
@@ -33,14 +55,59 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATH = str(BASE_DIR / "models" / "MobileNetSSD_deploy.caffemodel")
 CONFIG_PATH = str(BASE_DIR / "models" / "MobileNetSSD_deploy.prototxt")
 
+CAMERA_ID = 0
+occupancy_engine = OccupancyEngine(OCCUPANCY_ZONES)
+
 occupancy_counter = OccupancyCounter(
     model_path=MODEL_PATH,
     config_path=CONFIG_PATH,
-    process_interval=0.0
+    process_interval=1.0 / OCCUPANCY_SAMPLE_FPS,
+    engine=occupancy_engine,
+    camera_id=CAMERA_ID,
+    regions=DETECTION_REGIONS.get(CAMERA_ID)
+)
+occupancy_counter.start()  # SSD samples frames on its own thread
+
+# ---------------- FACE DETECTION ----------------
+detector_options = dict(FACE_DETECTOR)
+face_backend = create_detector(detector_options.pop("backend", "retinaface"), **detector_options)
+face_detector = RegionDetector.from_config(face_backend.detect, DETECTION_REGIONS.get(CAMERA_ID))
+
+# ---------------- UNKNOWN SNAPSHOTS ----------------
+unknown_store = UnknownDetectionStore(
+    capacity=UNKNOWN_RING_SIZE,
+    similarity=UNKNOWN_CLUSTER_SIMILARITY,
+    max_rows=UNKNOWN_MAX_STORED
+)
+
+def record_unknown(snapshot_path, confidence, embedding):
+    """Snapshot worker thread: store the sighting, then tell the API"""
+    detection = unknown_store.add_detection(snapshot_path, confidence, embedding)
+    if event_bus is not None:
+        event_bus.publish("unknown", **detection)
+
+snapshotter = UnknownSnapshotter(
+    BASE_DIR / UNKNOWN_SNAPSHOT_DIR,
+    sink=record_unknown,  # shows up in the API's /api/unknown
+    max_bytes=UNKNOWN_SNAPSHOT_MAX_MB * 1024 * 1024,
+    settle_sec=UNKNOWN_SNAPSHOT_SETTLE_SEC
 )
 
+pipeline = FramePipeline(face_detector, resolver, tracker, state_manager, writer, snapshotter=snapshotter)
+
+# ---------------- PROFILER ----------------
+if PROFILER_ENABLED:
+    # Samples this (main) thread from the side; the camera loop never pauses
+    profiler = SamplingProfiler(
+        BASE_DIR / "data" / "profiles",
+        rate_hz=PROFILER_RATE_HZ,
+        duration=PROFILER_DURATION_SEC
+    )
+    profiler.watch(BASE_DIR / "data" / "profile.request")
+    profiler.install_signal_handler()
+
 # ---------------- CAMERA ----------------
-cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+cap = cv2.VideoCapture(CAMERA_ID, cv2.CAP_DSHOW)
 
 if not cap.isOpened():
     raise RuntimeError("Camera not opening")
@@ -54,22 +121,64 @@ HEARTBEAT_FILE = BASE_DIR / "data" / "system_heartbeat.json"
 
 def update_heartbeat():
     try:
-        data = {"timestamp": time.time(), "status": "running"}
+        data = {
+            "timestamp": time.time(),
+            "status": "running",
+            "occupancy": occupancy_counter.stats()
+        }
         with open(HEARTBEAT_FILE, "w") as f:
             json.dump(data, f)
     except Exception as e:
         print(f"Heartbeat error: {e}")
 
+last_health_event = 0.0
+last_occupancy = None
+
+def publish_status():
+    """occupancy event when the count changes, health event every EVENT_BUS_HEALTH_INTERVAL_SEC"""
+    global last_health_event, last_occupancy
+    if event_bus is None:
+        return
+    stats = occupancy_counter.stats()
+    if (stats.get("count"), stats.get("in_view")) != last_occupancy:
+        last_occupancy = (stats.get("count"), stats.get("in_view"))
+        event_bus.publish("occupancy", **stats)
+    now = time.time()
+    if now - last_health_event >= EVENT_BUS_HEALTH_INTERVAL_SEC:
+        last_health_event = now
+        event_bus.publish("health", status="running", occupancy=stats)
+
+METRICS_FILE = BASE_DIR / "data" / "metrics.prom"
+last_metrics_write = 0.0
+
+def write_metrics():
+    global last_metrics_write
+    now = time.time()
+    if not metrics.enabled or now - last_metrics_write < METRICS_WRITE_INTERVAL_SEC:
+        return
+    last_metrics_write = now
+    try:
+        metrics.write_textfile(METRICS_FILE)
+    except Exception as e:
+        print(f"Metrics write error: {e}")
+
 # ---------------- MAIN LOOP ----------------
 while True:
     update_heartbeat() # Update heartbeat every frame
+    publish_status()
+    write_metrics()
     for _ in range(5):
         cap.grab()
-        
+    # Stale buffered frames skipped to stay near real time
+    metrics.counter("ffm_frames_dropped_total", reason="skipped").inc(5)
+
     ret, frame = cap.read()
     if not ret:
+        metrics.counter("ffm_frames_dropped_total", reason="read_failed").inc()
         continue
 
+    occupancy_counter.submit_frame(frame)
+
     # Debug Info
     cv2.putText(frame, f"Time: {datetime.now().strftime('%H:%M:%S')}", (10, 20), 
                 cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
@@ -77,66 +186,23 @@ while True:
     try:
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        # -------- FACE DETECTION --------
-        detections = DeepFace.extract_faces(
-            img_path=rgb_frame,
-            detector_backend="retinaface",
-            enforce_detection=False,
-            align=False
-        )
-
-        people = []
-
-        for face in detections:
-            area = face["facial_area"]
-            x, y, w, h = area["x"], area["y"], area["w"], area["h"]
-
-            frame_h, frame_w, _ = frame.shape
-            if w < 60 or h < 60 or (w > frame_w * 0.9 and h > frame_h * 0.9):
-                continue
-
-            face_img = face["face"]
-
-            if isinstance(face_img, tuple):
-                face_img = face_img[0]
-
-            if face_img is None:
-                continue
-
-            # -------- EMBEDDING --------
-            emb = DeepFace.represent(
-                img_path=face_img,
-                model_name="Facenet512",
-                detector_backend="skip",
-                enforce_detection=False,
-                align=False
-            )[0]["embedding"]
-
-            if w < 50 or h < 50:
-                continue
-
-            emb = np.array(emb, dtype=np.float32)
-
-            person_id, _ = resolver.resolve(emb)
-            people.append((person_id, emb, (x, y, w, h)))
+        # -------- DETECTION -> EMBEDDING -> RESOLVER -> TRACKER -> STATE --------
+        people, tracked = pipeline.process(rgb_frame)
 
+        for person_id, _, (x, y, w, h) in people:
             color = (0, 255, 0) if person_id != "UNKNOWN" else (0, 0, 255)
 
             cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
             cv2.putText(frame, person_id, (x, y - 10),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
 
-
-        tracked = tracker.update(people)
         print("Tracked keys:", list(tracked.keys()))
 
-
         for person in tracked.values():
             if not person.person_id.startswith("UNKNOWN"):
                  print(f"{person.person_id} Active: {round(person.active_duration, 1)}s")
-            state_manager.process(person, writer)
 
-        inside_count = occupancy_counter.count_people(frame)
+        inside_count = occupancy_counter.current_count
 
         cv2.putText(frame, f"Inside: {inside_count}",
                     (20, 40),
@@ -147,11 +213,16 @@ while True:
 
     except Exception as e:
         logging.error(f"Frame processing error: {e}")
+        metrics.counter("ffm_frames_dropped_total", reason="error").inc()
 
     cv2.imshow("Factory Attendance System", frame)
 
     if cv2.waitKey(1) & 0xFF == ord("q"):
         break
 
+occupancy_counter.stop()
+snapshotter.close()
+if event_bus is not None:
+    event_bus.stop()
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,320 @@
+"""
+End-to-end pipeline benchmarks on synthetic workloads.
+
+Drives IdentityResolver, PersonTracker, FaceTracker, StateManager,
+CSVAttendanceWriter and the AttendanceDataReader endpoints across gallery
+sizes, faces per frame and attendance table sizes, and records ops/sec,
+p50/p99 latency and peak memory (tracemalloc) per case to JSON.
+
+    python tests/benchmarks/run_benchmarks.py --profile quick
+    python tests/benchmarks/run_benchmarks.py --out tests/benchmarks/baseline.json
+    python tests/benchmarks/run_benchmarks.py --compare tests/benchmarks/baseline.json
+
+With --compare the run exits non-zero when any case's p50 is slower than
+the baseline by more than --tolerance.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic
+from database.models import create_session_factory
+from identity.identity_resolver import IdentityResolver
+from tracking.person_tracker import PersonTracker
+from tracking.face_tracker import FaceTracker
+from attendance.state.state_manager import StateManager
+from attendance.logic.csv_writer import CSVAttendanceWriter
+from api.data_reader import AttendanceDataReader
+from utils.clock import SimulatedClock
+
+PROFILES = {
+    "quick": {
+        "gallery": [10, 1000],
+        "faces": [1, 10],
+        "rows": [1000, 10000],
+    },
+    "full": {
+        "gallery": [10, 100, 1000, 10000, 50000],
+        "faces": [1, 5, 10, 25, 50],
+        "rows": [1000, 10000, 100000, 1000000, 10000000],
+    },
+}
+
+REGISTERED_WORKERS = 50
+
+# Simulated seconds between frames (10 fps camera)
+FRAME_PERIOD = 0.1
+
+
+class NullWriter:
+    """Writer stand-in so StateManager cases measure the state machine only"""
+
+    def log_entry(self, person_id, in_time):
+        pass
+
+    def update_exit(self, person_id, out_time):
+        pass
+
+
+def quiet():
+    """Silence the progress prints of components during setup"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def measure(fn, time_budget=2.0, max_iters=10000, min_iters=1):
+    """Call fn() repeatedly within the budget; one extra traced call for peak memory"""
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_iters:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) >= min_iters and time.perf_counter() - started >= time_budget:
+            break
+    total = sum(latencies)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": len(latencies),
+        "ops_per_sec": round(len(latencies) / total, 2) if total > 0 else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "peak_mem_mb": round(peak / (1024 * 1024), 3),
+    }
+
+
+class Suite:
+    def __init__(self, workdir, budget, only=None):
+        self.workdir = Path(workdir)
+        self.budget = budget
+        self.only = only
+        self.results = {}
+
+    def run(self, name, fn, **kwargs):
+        if self.only and self.only not in name:
+            return
+        result = measure(fn, time_budget=self.budget, **kwargs)
+        self.results[name] = result
+        print(f"{name:<52}{result['ops_per_sec'] or 0:>12.1f}{result['p50_ms']:>11.3f}"
+              f"{result['p99_ms']:>11.3f}{result['peak_mem_mb']:>10.2f}")
+
+    def wants(self, name):
+        return not self.only or self.only in name
+
+    # ---------------- CASES ----------------
+
+    def bench_resolver(self, sizes):
+        queries = synthetic.random_embeddings(64, seed=99)
+        for size in sizes:
+            name = f"resolver.resolve[gallery={size}]"
+            if not self.wants(name):
+                continue
+            path = self.workdir / f"gallery_{size}.pkl"
+            synthetic.write_gallery(path, size)
+            with quiet():
+                resolver = IdentityResolver(db_path=str(path))
+            counter = iter(range(10 ** 9))
+            self.run(name, lambda: resolver.resolve(queries[next(counter) % len(queries)]))
+
+    def bench_trackers(self, sizes):
+        for faces in sizes:
+            name = f"person_tracker.update[faces={faces}]"
+            if self.wants(name):
+                crowd = synthetic.CrowdSimulator(faces)
+                clock = SimulatedClock(1000.0)
+                tracker = PersonTracker(similarity_threshold=0.6, iou_threshold=0.3, disappear_time=30, clock=clock)
+                self.run(name, lambda: tracker.update(crowd.frame(), now=clock.advance(FRAME_PERIOD)))
+
+            name = f"face_tracker.update[faces={faces}]"
+            if self.wants(name):
+                crowd = synthetic.CrowdSimulator(faces)
+                clock = SimulatedClock(1000.0)
+                face_tracker = FaceTracker(clock=clock)
+                self.run(name, lambda: face_tracker.update(crowd.boxes(), clock.advance(FRAME_PERIOD)))
+
+            name = f"state_manager.process[faces={faces}]"
+            if self.wants(name):
+                crowd = synthetic.CrowdSimulator(faces, known_ratio=1.0)
+                clock = SimulatedClock(1000.0)
+                tracker = PersonTracker(similarity_threshold=0.6, iou_threshold=0.3, disappear_time=30, clock=clock)
+                state_manager = StateManager(in_threshold=10, out_threshold=20, clock=clock)
+                writer = NullWriter()
+
+                def step():
+                    now = clock.advance(FRAME_PERIOD)
+                    for person in tracker.update(crowd.frame(), now=now).values():
+                        state_manager.process(person, writer, now=now)
+
+                # Warm up past in_threshold so steady-state IN tracks are measured
+                with quiet():
+                    for _ in range(120):
+                        step()
+                self.run(name, step)
+
+            name = f"state_manager.process_frame[faces={faces}]"
+            if self.wants(name):
+                crowd = synthetic.CrowdSimulator(faces, known_ratio=1.0)
+                clock = SimulatedClock(1000.0)
+                tracker = PersonTracker(similarity_threshold=0.6, iou_threshold=0.3, disappear_time=30, clock=clock)
+                state_manager = StateManager(in_threshold=10, out_threshold=20, clock=clock)
+                writer = NullWriter()
+
+                def step_frame():
+                    now = clock.advance(FRAME_PERIOD)
+                    tracked = tracker.update(crowd.frame(), now=now)
+                    state_manager.dispatch(state_manager.process_frame(tracked.values(), now=now), writer)
+
+                with quiet():
+                    for _ in range(120):
+                        step_frame()
+                self.run(name, step_frame)
+
+    def bench_writer(self):
+        name = "csv_writer.check_in_out"
+        if not self.wants(name):
+            return
+        db_path = self.workdir / "writer.db"
+        writer = CSVAttendanceWriter(
+            file_path=str(self.workdir / "writer.csv"),
+            session_factory=create_session_factory(db_path)
+        )
+        counter = iter(range(10 ** 9))
+
+        def check_in_out():
+            person_id = f"Worker_{next(counter) % 500:05d}"
+            now = datetime.now()
+            with quiet():
+                writer.log_entry(person_id, now)
+                writer.update_exit(person_id, now)
+
+        self.run(name, check_in_out, max_iters=2000)
+
+    def bench_reader(self, sizes):
+        workers = synthetic.worker_ids(REGISTERED_WORKERS)
+        base = self.workdir / "reader_base"
+        synthetic.make_known_faces(base, workers)
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        for rows in sizes:
+            cases = [
+                ("read_attendance_log", lambda r: r.read_attendance_log()),
+                ("get_today_records", lambda r: r.get_today_records()),
+                ("get_worker_stats", lambda r: r.get_worker_stats(workers[0], today)),
+                ("get_hourly_report", lambda r: r.get_hourly_report(today)),
+                ("get_daily_occupancy_365", lambda r: r.get_daily_occupancy(365)),
+            ]
+            names = [f"reader.{case}[rows={rows}]" for case, _ in cases]
+            if not any(self.wants(n) for n in names):
+                continue
+
+            db_path = self.workdir / f"attendance_{rows}.db"
+            print(f"  (populating {rows} rows...)")
+            session_factory = create_session_factory(db_path)
+            synthetic.populate_attendance(db_path, rows, workers + ["UNKNOWN_abc123"])
+            reader = AttendanceDataReader(base_path=str(base), session_factory=session_factory)
+
+            for (case, fn), name in zip(cases, names):
+                self.run(name, lambda fn=fn: fn(reader))
+
+            session_factory.kw["bind"].dispose()
+            db_path.unlink()
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if not current or not base.get("p50_ms"):
+            continue
+        ratio = current["p50_ms"] / base["p50_ms"]
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, base["p50_ms"], current["p50_ms"], ratio))
+
+    if regressions:
+        print(f"\n[REGRESSION] {len(regressions)} case(s) slower than baseline by > {tolerance:.0%}:")
+        for name, before, after, ratio in regressions:
+            print(f"  {name}: p50 {before:.3f}ms -> {after:.3f}ms ({ratio:.2f}x)")
+    else:
+        print(f"\n[OK] No case slower than baseline by > {tolerance:.0%}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run pipeline benchmarks on synthetic workloads")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="full")
+    parser.add_argument("--only", help="Run only cases whose name contains this string")
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds per case")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    profile = PROFILES[args.profile]
+
+    print(f"{'CASE':<52}{'OPS/SEC':>12}{'P50 MS':>11}{'P99 MS':>11}{'PEAK MB':>10}")
+    print("-" * 96)
+
+    with tempfile.TemporaryDirectory(prefix="ffm_bench_") as workdir:
+        suite = Suite(workdir, args.budget, args.only)
+        suite.bench_resolver(profile["gallery"])
+        suite.bench_trackers(profile["faces"])
+        suite.bench_writer()
+        suite.bench_reader(profile["rows"])
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "profile": args.profile,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "budget_sec": args.budget,
+        },
+        "results": suite.results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        if compare(suite.results, args.compare, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Synthetic workloads for the benchmark suite: face galleries, crowded
+frames and attendance tables of arbitrary size.
+"""
+import pickle
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDING_DIM = 512
+
+# SQLAlchemy's SQLite DateTime storage format
+DB_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def worker_ids(count):
+    return [f"Worker_{i:05d}" for i in range(1, count + 1)]
+
+
+def random_embeddings(count, seed=0):
+    rng = np.random.default_rng(seed)
+    emb = rng.standard_normal((count, EMBEDDING_DIM)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def write_gallery(path, identities, per_identity=3, seed=0):
+    """embeddings.pkl in the format scripts/build_face_db.PY writes"""
+    emb = random_embeddings(identities * per_identity, seed)
+    database = {}
+    for i, person in enumerate(worker_ids(identities)):
+        database[person] = [e.tolist() for e in emb[i * per_identity:(i + 1) * per_identity]]
+    with open(path, "wb") as f:
+        pickle.dump(database, f)
+    return database
+
+
+def make_known_faces(base_path, workers):
+    """data/known_faces/<worker>/ directories as AttendanceDataReader expects"""
+    root = Path(base_path) / "data" / "known_faces"
+    for worker in workers:
+        (root / worker).mkdir(parents=True, exist_ok=True)
+    return root
+
+
+class CrowdSimulator:
+    """
+    `faces` people drifting slowly across a 1920x1080 frame, each with a
+    stable identity and a slightly noisy embedding per frame.
+    """
+
+    def __init__(self, faces, known_ratio=0.8, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.base = random_embeddings(faces, seed + 1)
+        known = int(faces * known_ratio)
+        self.ids = worker_ids(known) + ["UNKNOWN"] * (faces - known)
+        cols = max(1, int(np.ceil(np.sqrt(faces))))
+        self.positions = [
+            [100 + (i % cols) * (1700 // cols), 100 + (i // cols) * (900 // cols)]
+            for i in range(faces)
+        ]
+
+    def frame(self):
+        detections = []
+        for i, person_id in enumerate(self.ids):
+            self.positions[i][0] += int(self.rng.integers(-3, 4))
+            self.positions[i][1] += int(self.rng.integers(-3, 4))
+            x, y = self.positions[i]
+            emb = self.base[i] + self.rng.standard_normal(EMBEDDING_DIM).astype(np.float32) * 0.02
+            detections.append((person_id, emb, (x, y, 80, 80)))
+        return detections
+
+    def boxes(self):
+        return [bbox for _, _, bbox in self.frame()]
+
+
+def populate_attendance(db_path, rows, workers, days=365, end_date=None, seed=0, batch=100000):
+    """
+    Insert `rows` face_attendance sessions spread over the last `days` days.
+    Uses raw sqlite3 so 10M rows take seconds, not hours. Rows dated today
+    include some open sessions (out_time NULL).
+    """
+    rnd = random.Random(seed)
+    end_date = end_date or datetime.now().date()
+    start = datetime.combine(end_date - timedelta(days=days - 1), datetime.min.time())
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def generate(count):
+        for _ in range(count):
+            day = start + timedelta(days=rnd.randrange(days))
+            in_time = day + timedelta(hours=rnd.uniform(7, 12))
+            duration = rnd.uniform(600, 9 * 3600)
+            is_open = day.date() == end_date and rnd.random() < 0.3
+            out_time = None if is_open else in_time + timedelta(seconds=duration)
+            yield (
+                rnd.choice(workers),
+                in_time.strftime(DB_DATETIME),
+                out_time.strftime(DB_DATETIME) if out_time else None,
+                0 if is_open else duration,
+                day.strftime(DB_DATETIME),
+                100.0
+            )
+
+    remaining = rows
+    while remaining > 0:
+        n = min(batch, remaining)
+        conn.executemany(
+            "INSERT INTO face_attendance (person_id, in_time, out_time, duration_seconds, date, confidence) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            generate(n)
+        )
+        conn.commit()
+        remaining -= n
+
+    conn.close()
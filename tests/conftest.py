@@ -0,0 +1,49 @@
+import sys
+import os
+from datetime import datetime
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import create_session_factory, FaceAttendance
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "attendance.db"
+
+
+@pytest.fixture
+def session_factory(db_path):
+    """Sessions on a fresh attendance DB in tmp_path"""
+    return create_session_factory(db_path)
+
+
+@pytest.fixture
+def writer(tmp_path, session_factory):
+    from attendance.logic.csv_writer import CSVAttendanceWriter
+    return CSVAttendanceWriter(str(tmp_path / "log.csv"), session_factory=session_factory)
+
+
+@pytest.fixture
+def reader(tmp_path, session_factory):
+    from api.data_reader import AttendanceDataReader
+    return AttendanceDataReader(base_path=str(tmp_path), session_factory=session_factory)
+
+
+@pytest.fixture
+def add_session(session_factory):
+    """add_session(person_id, day, in_hm, out_hm): insert one face_attendance row (out_hm None = still open)"""
+    def add(person_id, day, in_hm="09:00", out_hm="10:00"):
+        in_time = datetime.combine(day, datetime.strptime(in_hm, "%H:%M").time())
+        out_time = datetime.combine(day, datetime.strptime(out_hm, "%H:%M").time()) if out_hm else None
+        db = session_factory()
+        db.add(FaceAttendance(
+            person_id=person_id, date=day, in_time=in_time, out_time=out_time,
+            duration_seconds=(out_time - in_time).total_seconds() if out_time else 0
+        ))
+        db.commit()
+        db.close()
+    return add
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import database.models
+import api.main
+
+
+def test_etag_revalidation_and_compression(monkeypatch, session_factory, writer, reader):
+    monkeypatch.setattr(api.main, "data_reader", reader)
+    monkeypatch.setattr(database.models, "SessionLocal", session_factory)  # POST /api/settings
+    client = TestClient(api.main.app)
+    writer.log_entry("Worker_A", datetime(2024, 6, 3, 8, 0))
+
+    first = client.get("/api/workers", params={"date": "2024-06-03"})
+    etag = first.headers["etag"]
+
+    # Same tag, also inside a list or as a weak tag: 304, empty body
+    for if_none_match in (etag, f'"stale", {etag}', f"W/{etag}", "*"):
+        cached = client.get("/api/workers", params={"date": "2024-06-03"}, headers={"If-None-Match": if_none_match})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    # A write, then a settings change, each give a new tag
+    writer.update_exit("Worker_A", datetime(2024, 6, 3, 9, 0))
+    after_write = client.get("/api/workers", params={"date": "2024-06-03"}, headers={"If-None-Match": etag})
+    assert after_write.status_code == 200 and after_write.headers["etag"] != etag
+
+    client.post("/api/settings", json={"key": "work_start_time", "value": "07:30"})
+    after_settings = client.get("/api/workers", params={"date": "2024-06-03"},
+                                headers={"If-None-Match": after_write.headers["etag"]})
+    assert after_settings.status_code == 200
+    assert after_settings.headers["etag"] not in (etag, after_write.headers["etag"])
+
+    # Large bodies go out gzip-compressed
+    for minute in range(60):
+        writer.log_record(f"Worker_{minute:02d}", datetime(2024, 6, 3, 10, minute), datetime(2024, 6, 3, 11, 0), 60.0)
+    raw = client.get("/api/attendance/raw", params={"format": "rows"}, headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert len(raw.json()["rows"]) == 61
+    assert int(raw.headers["content-length"]) < len(raw.content)
@@ -0,0 +1,22 @@
+import threading
+from datetime import datetime
+
+
+def test_row_stream_survives_thread_hops(writer, reader):
+    for i in range(7):
+        writer.log_entry(f"Worker_{i}", datetime(2024, 6, 3, 9, i))
+
+    # Like a StreamingResponse: each chunk may be produced on a different threadpool thread
+    rows = reader.iter_attendance_rows("2024-06-03", "2024-06-03", batch_size=2)
+    received = []
+
+    def take():
+        for _ in range(3):
+            received.append(next(rows, None))
+
+    for _ in range(3):
+        worker = threading.Thread(target=take)
+        worker.start()
+        worker.join()
+
+    assert [r[0] for r in received if r is not None] == [f"Worker_{i}" for i in range(7)]
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+
+def test_changes_since_cursor(writer, reader):
+    writer.log_entry("Worker_A", datetime(2024, 6, 3, 9, 0))
+    writer.log_entry("Worker_B", datetime(2024, 6, 3, 9, 5))
+    first = reader.read_changes(0)
+    assert [r['person_id'] for r in first['records']] == ["Worker_A", "Worker_B"]
+
+    # Nothing new -> empty delta, same cursor
+    assert reader.read_changes(first['cursor']) == {'records': [], 'cursor': first['cursor'], 'has_more': False}
+
+    # Closing a session re-emits it under a newer cursor
+    writer.update_exit("Worker_A", datetime(2024, 6, 3, 12, 0))
+    delta = reader.read_changes(first['cursor'])
+    assert len(delta['records']) == 1
+    assert delta['records'][0]['person_id'] == "Worker_A"
+    assert delta['records'][0]['out_time'] == "12:00:00"
+    assert delta['cursor'] > first['cursor']
+
+    page = reader.read_changes(0, limit=1)
+    assert page['has_more'] and len(page['records']) == 1
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import numpy as np
+
+from utils.clock import SimulatedClock
+from tracking.person_tracker import PersonTracker
+from attendance.state.state_manager import StateManager
+from attendance.logic.in_out_logic import InOutLogic
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.events = []
+
+    def log_entry(self, person_id, in_time):
+        self.events.append(("IN", person_id, in_time))
+
+    def update_exit(self, person_id, out_time):
+        self.events.append(("OUT", person_id, out_time))
+
+
+def test_simulated_session_has_exact_times():
+    start = datetime(2024, 3, 4, 8, 0, 0).timestamp()
+    clock = SimulatedClock(start)
+    tracker = PersonTracker(disappear_time=30, clock=clock)
+    state_manager = StateManager(in_threshold=10, out_threshold=20, clock=clock)
+    writer = RecordingWriter()
+    emb = np.ones(8, dtype=np.float32)
+
+    # 15s in view at 10 fps, then 25s empty; runs in milliseconds
+    for frame in range(400):
+        clock.advance(0.1)
+        detections = [("Worker_1", emb, (100, 100, 80, 80))] if frame < 150 else []
+        for person in list(tracker.update(detections).values()):
+            state_manager.process(person, writer)
+
+    (_, _, in_time), (_, _, out_time) = writer.events
+    assert [e[0] for e in writer.events] == ["IN", "OUT"]
+    assert abs((in_time - datetime.fromtimestamp(start)).total_seconds() - 10.1) < 0.15
+    assert abs((out_time - datetime.fromtimestamp(start)).total_seconds() - 35.0) < 0.15
+
+
+def test_in_out_logic_uses_injected_clock():
+    class State:
+        is_in = False
+        first_seen = None
+        last_seen = None
+        in_time = None
+        out_time = None
+
+    clock = SimulatedClock(100.0)
+    logic = InOutLogic(in_threshold=5, out_threshold=30, clock=clock)
+    state = State()
+
+    assert logic.update(state, True) is None
+    clock.advance(5)
+    assert logic.update(state, True) == "IN"
+    assert state.in_time == 105.0
+    assert logic.update(state, False, now=134.0) is None
+    assert logic.update(state, False, now=135.0) == "OUT"
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from database.columnar_store import ColumnarAttendanceStore
+
+
+def test_export_and_range_aggregates(tmp_path, db_path, add_session):
+    d1, d2 = date(2024, 3, 4), date(2024, 3, 5)
+
+    add_session("Worker_A", d1, "08:50", "12:00")
+    add_session("Worker_A", d1, "13:00", "17:00")
+    add_session("Worker_B", d1, "09:20", "17:00")
+    add_session("Worker_A", d2, "09:05", "10:05")
+    add_session("Worker_B", d2, "08:00", None)   # still inside
+
+    store = ColumnarAttendanceStore(tmp_path / "columnar")
+    assert store.export(db_path, today=d2) == 4
+    assert store.export(db_path, today=d2) == 0
+
+    assert store.worker_minutes(d1, d2) == {"Worker_A": 490.0, "Worker_B": 460.0}
+    assert store.worker_minutes(d2, d2) == {"Worker_A": 60.0}
+    assert store.late_counts(d1, d2, "09:00") == {"Worker_A": 1, "Worker_B": 1}
+    assert store.daily_uniques("2024-03-01", "2024-03-31") == {"2024-03-04": 2, "2024-03-05": 1}
+
+
+def test_overnight_session_exported_once_closed(tmp_path, db_path, writer):
+    store = ColumnarAttendanceStore(tmp_path / "columnar")
+
+    writer.log_entry("Worker_A", datetime(2024, 3, 4, 23, 0))
+    writer.log_record("Worker_B", datetime(2024, 3, 5, 1, 0), datetime(2024, 3, 5, 2, 0), 3600)
+    assert store.export(db_path, today=date(2024, 3, 5)) == 1
+
+    # Closed on the next day by the live writer, after the export moved past its id
+    writer.update_exit("Worker_A", datetime(2024, 3, 5, 6, 0))
+    assert store.export(db_path, today=date(2024, 3, 5)) == 1
+    assert store.export(db_path, today=date(2024, 3, 5)) == 0
+    assert store.worker_minutes("2024-03-04", "2024-03-05") == {"Worker_A": 420.0, "Worker_B": 60.0}
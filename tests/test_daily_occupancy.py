@@ -0,0 +1,23 @@
+import os
+from datetime import datetime, timedelta
+
+
+def test_daily_counts_follow_changes_to_closed_days(tmp_path, reader, add_session):
+    for worker_id in ("Worker_A", "Worker_B"):
+        os.makedirs(tmp_path / "data" / "known_faces" / worker_id)
+
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    add_session("Worker_A", yesterday)
+    add_session("Worker_A", yesterday)
+    add_session("Visitor", yesterday)   # not registered
+    add_session("Worker_B", today)
+
+    report = reader.get_daily_occupancy(7)
+    assert len(report) == 8
+    assert report[-2] == {"date": yesterday.strftime("%Y-%m-%d"), "count": 1}
+    assert report[-1] == {"date": today.strftime("%Y-%m-%d"), "count": 1}
+
+    # A late write to a cached closed day invalidates just that day
+    add_session("Worker_B", yesterday)
+    assert reader.get_daily_occupancy(7)[-2]["count"] == 2
@@ -0,0 +1,49 @@
+import numpy as np
+
+from tracking.detection_regions import RegionDetector, detection_windows
+
+
+def fake_detector(face_boxes):
+    """Detector that 'finds' any of the given frame-space boxes fully inside the window"""
+    def detect(image):
+        # Windows are marked with their origin in the first pixel
+        ox, oy = int(image[0, 0, 0]) * 10, int(image[0, 0, 1]) * 10
+        h, w = image.shape[:2]
+        found = []
+        for (x, y, bw, bh) in face_boxes:
+            if x >= ox and y >= oy and x + bw <= ox + w and y + bh <= oy + h:
+                found.append(((x - ox, y - oy, bw, bh), 0.9, None))
+        return found
+    return detect
+
+
+def marked_frame(width, height):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for y in range(0, height, 10):
+        for x in range(0, width, 10):
+            frame[y, x, 0] = x // 10
+            frame[y, x, 1] = y // 10
+    return frame
+
+
+def test_tiles_cover_frame_at_native_size():
+    windows = detection_windows((1080, 1920, 3), tile_size=640, overlap=0.25)
+    assert all(w == 640 and h == 640 for (_, _, w, h) in windows)
+    assert max(x + w for (x, _, w, _) in windows) == 1920
+    assert max(y + h for (_, y, _, h) in windows) == 1080
+
+
+def test_roi_detections_are_stitched_to_frame_coordinates():
+    faces = [(400, 200, 80, 80), (50, 50, 80, 80)]
+    detector = RegionDetector(fake_detector(faces), rois=[(300, 100, 300, 300)])
+
+    boxes = [bbox for bbox, _, _ in detector.detect(marked_frame(800, 600))]
+    assert boxes == [(400, 200, 80, 80)]
+
+
+def test_tiled_detections_are_deduplicated():
+    faces = [(300, 300, 60, 60)]
+    detector = RegionDetector(fake_detector(faces), tile_size=400, tile_overlap=0.5)
+
+    boxes = [bbox for bbox, _, _ in detector.detect(marked_frame(800, 800))]
+    assert boxes == [(300, 300, 60, 60)]
@@ -0,0 +1,81 @@
+import json
+import socket
+import threading
+import time
+
+from utils.event_bus import EventBus, EventSubscriber, _Connection
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_subscriber_replays_missed_events_after_reconnect():
+    bus = EventBus(port=0, ring_size=5).start()
+    received, resyncs = [], []
+    try:
+        bus.publish("check_in", person_id="Worker_A")
+        subscriber = EventSubscriber(received.append, port=bus.port,
+                                     on_resync=lambda: resyncs.append(True), reconnect_delay=0.05)
+        subscriber.start()
+        assert wait_for(lambda: subscriber.connected and len(received) == 1)   # replayed from the ring
+
+        bus.publish("check_out", person_id="Worker_A")                         # live
+        assert wait_for(lambda: len(received) == 2)
+
+        # Drop the connection; events published meanwhile are replayed once, in order
+        subscriber.stop()
+        bus.publish("occupancy", count=3)
+        bus.publish("health", status="running")
+        subscriber.start()
+        assert wait_for(lambda: len(received) == 4)
+        assert [e["seq"] for e in received] == [1, 2, 3, 4]
+        assert [e["type"] for e in received] == ["check_in", "check_out", "occupancy", "health"]
+        assert not resyncs
+
+        # More missed events than the ring holds -> gap reported
+        subscriber.stop()
+        for i in range(10):
+            bus.publish("occupancy", count=i)
+        subscriber.start()
+        assert wait_for(lambda: received[-1]["seq"] == 14)
+        assert resyncs == [True]
+        subscriber.stop()
+    finally:
+        bus.stop()
+
+
+def test_publish_never_blocks_on_a_subscriber_that_stops_reading():
+    bus = EventBus(port=0, ring_size=5, queue_size=10).start()
+    stalled = socket.create_connection(("127.0.0.1", bus.port))
+    try:
+        stalled.sendall((json.dumps({"since": 0, "epoch": None}) + "\n").encode())
+        assert wait_for(lambda: len(bus._connections) == 1)
+
+        def publish_many():
+            # Large enough to fill the socket buffers and then the send queue
+            for _ in range(500):
+                bus.publish("health", status="running", padding="x" * 65536)
+
+        publisher = threading.Thread(target=publish_many, daemon=True)
+        publisher.start()
+        publisher.join(timeout=10.0)
+        assert not publisher.is_alive()
+        assert wait_for(lambda: bus.publish("health") and not bus._connections)  # slow subscriber dropped
+    finally:
+        stalled.close()
+        bus.stop()
+
+    # The same with the sender already gone: dropping a full connection must not block
+    ours, theirs = socket.socketpair()
+    connection = _Connection(ours, queue_size=1)
+    offers = threading.Thread(target=lambda: [connection.offer(b"x\n") for _ in range(3)], daemon=True)
+    offers.start()
+    offers.join(timeout=2.0)
+    assert not offers.is_alive() and connection.closed
+    theirs.close()
@@ -0,0 +1,58 @@
+from tracking.occupancy_engine import EntryZone, OccupancyEngine
+
+# Horizontal gate line at y=300, inside is below it (towards y=479)
+ZONES = {0: {"line": ((0, 300), (640, 300)), "inside_point": (320, 479), "margin": 10}}
+
+
+def walk(engine, start_y, end_y, x=300, steps=10, t0=1000.0, camera_id=0):
+    """Feed one person box whose feet move from start_y to end_y"""
+    t = t0
+    for i in range(steps + 1):
+        feet_y = start_y + (end_y - start_y) * i / steps
+        engine.update(camera_id, [(x, int(feet_y) - 120, 60, 120)], t)
+        t += 0.2
+    return t
+
+
+def test_entry_and_exit_counts():
+    engine = OccupancyEngine(ZONES, reset_daily=False)
+
+    t = walk(engine, 200, 420)
+    assert engine.inside_count == 1
+
+    # Track times out, then the same person walks back out
+    engine.update(0, [], t + 5)
+    walk(engine, 420, 200, t0=t + 10)
+    assert engine.inside_count == 0
+
+    stats = engine.camera_stats()["0"]
+    assert stats["entries"] == 1
+    assert stats["exits"] == 1
+
+
+def test_loitering_on_line_is_not_counted():
+    engine = OccupancyEngine(ZONES, reset_daily=False)
+
+    # Feet jitter within the margin around the line
+    t = 1000.0
+    for y in (296, 304, 295, 305, 298, 302):
+        engine.update(0, [(300, y - 120, 60, 120)], t)
+        t += 0.2
+
+    assert engine.inside_count == 0
+
+
+def test_count_never_negative_and_unknown_camera_ignored():
+    engine = OccupancyEngine(ZONES, reset_daily=False)
+
+    walk(engine, 420, 200)
+    assert engine.inside_count == 0
+
+    engine.update(7, [(300, 100, 60, 120)], 2000.0)
+    assert engine.inside_count == 0
+
+
+def test_polygon_zone():
+    zone = EntryZone(polygon=[(0, 0), (100, 0), (100, 100), (0, 100)])
+    assert zone.side((50, 50)) is True
+    assert zone.side((150, 50)) is False
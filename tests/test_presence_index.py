@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime
+
+from api.live_state import LiveState
+
+
+class Events:
+    """Stands in for the EventBus: hands each event straight to the API's LiveState"""
+
+    def __init__(self, live):
+        self.live = live
+        self.seq = 0
+
+    def publish(self, event_type, **data):
+        self.seq += 1
+        self.live.apply(dict(data, seq=self.seq, type=event_type, ts=0))
+
+
+def test_presence_follows_events_and_the_change_cursor(db_path, writer, reader):
+    live = LiveState()
+    presence = live.presence
+    writer.events = Events(live)
+
+    writer.log_record("Worker_A", datetime(2024, 6, 3, 8, 0), datetime(2024, 6, 3, 10, 0), 7200)
+    presence.sync(reader, "2024-06-03")
+    assert presence.state("Worker_A")['state'] == 'OUT'
+
+    # Events update the index as they happen
+    writer.log_entry("Worker_B", datetime(2024, 6, 3, 9, 0))
+    assert presence.present() == ["Worker_B"]
+    version = presence.version
+    writer.update_exit("Worker_B", datetime(2024, 6, 3, 9, 30))
+    assert presence.version == version + 1
+    state = presence.state("Worker_B")
+    assert (state['state'], state['last_seen'], state['total_sec']) == ('OUT', '09:30:00', 1800.0)
+
+    # A write that never went through the bus shows up on the next sync
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO face_attendance (person_id, date, in_time, duration_seconds, confidence) "
+            "VALUES ('Worker_C', '2024-06-03 00:00:00.000000', '2024-06-03 11:00:00.000000', 0, 90.0)"
+        )
+        conn.execute("UPDATE face_attendance SET duration_seconds = 3600 WHERE person_id = 'Worker_B'")
+    conn.close()
+    presence.sync(reader, "2024-06-03")
+    assert presence.present() == ["Worker_C"]
+    assert presence.state("Worker_B")['total_sec'] == 3600.0
+    assert presence.cursor == reader.change_cursor()
+
+    # A late check-in event for a closed session doesn't reopen it
+    live.apply({"seq": 99, "type": "check_in", "ts": 0, "id": 2, "person_id": "Worker_B",
+                "in_time": "2024-06-03T09:00:00", "confidence": 100.0})
+    assert presence.state("Worker_B")['state'] == 'OUT'
+
+    # Events for another day are ignored; a new day starts from the DB
+    writer.log_entry("Worker_D", datetime(2024, 6, 4, 7, 0))
+    assert presence.state("Worker_D") is None
+    presence.sync(reader, "2024-06-04")
+    assert presence.present() == ["Worker_D"] and len(presence.records()) == 1
+
+    stats = reader.get_all_worker_stats(["Worker_D", "Worker_A"], "2024-06-04", summaries=presence.summaries(["Worker_D", "Worker_A"]))
+    assert stats == reader.get_all_worker_stats(["Worker_D", "Worker_A"], "2024-06-04")
@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models import FaceAttendance
+from database.retention import archive_path, archive_sessions, archived_months, month_files, read_archived, rolled_csv_path
+from database.columnar_store import ColumnarAttendanceStore
+
+
+def test_archived_sessions_stay_readable(tmp_path, db_path, session_factory, reader, add_session):
+    today = date(2024, 6, 15)
+    for days_ago in (200, 120, 100, 10, 0):
+        add_session(f"Worker_{days_ago}", today - timedelta(days=days_ago), "09:00", "17:00")
+
+    archived = archive_sessions(db_path, tmp_path / "data" / "archive", keep_days=90, today=today)
+    assert sum(archived.values()) == 3
+    assert archived_months(tmp_path / "data" / "archive") == ["2023-11", "2024-02", "2024-03"]
+
+    db = session_factory()
+    assert db.query(FaceAttendance).count() == 2
+    db.close()
+
+    assert len(reader.read_attendance_log()) == 5
+
+    old_day = (today - timedelta(days=120)).strftime("%Y-%m-%d")
+    records = reader.read_attendance_log(old_day, old_day)
+    assert [(r["person_id"], r["in_time"], r["out_time"]) for r in records] == [("Worker_120", "09:00:00", "17:00:00")]
+
+    hot_day = (today - timedelta(days=10)).strftime("%Y-%m-%d")
+    assert [r["person_id"] for r in reader.read_attendance_log(hot_day, hot_day)] == ["Worker_10"]
+
+    # Interrupted archive run: the row is in the month file and still in the hot table
+    row = next(read_archived(tmp_path / "data" / "archive", old_day, old_day))
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO face_attendance (id, person_id, date, in_time, out_time, duration_seconds) VALUES (?, ?, ?, ?, ?, ?)",
+            (row["id"], row["person_id"], row["date"], row["in_time"], row["out_time"], row["duration_seconds"])
+        )
+    conn.close()
+    assert [r["person_id"] for r in reader.read_attendance_log(old_day, old_day)] == ["Worker_120"]
+    assert len(reader.read_attendance_log()) == 5
+
+
+def test_rolled_csv_path():
+    when = datetime(2024, 3, 4, 9, 0)
+    assert rolled_csv_path("attendance_log.csv", when, None) == "attendance_log.csv"
+    assert rolled_csv_path("attendance_log.csv", when, "month") == "attendance_log_2024-03.csv"
+    assert rolled_csv_path("logs/attendance_log.csv", when, "day") == "logs/attendance_log_2024-03-04.csv"
+
+
+def test_archive_runs_add_parts_and_respect_columnar_export(tmp_path, db_path, add_session):
+    pytest.importorskip("pyarrow")
+    archive_dir = tmp_path / "data" / "archive"
+    store = ColumnarAttendanceStore(tmp_path / "columnar")
+
+    add_session("Worker_A", date(2024, 3, 1))
+    store.export(db_path)
+    add_session("Worker_A", date(2024, 3, 2))   # not exported yet
+    assert archive_sessions(db_path, archive_dir, keep_days=30, today=date(2024, 6, 1),
+                            max_id=store.archive_limits()[0]) == {"2024-03": 1}
+    first_part = archive_path(archive_dir, "2024-03", 1)
+    written = first_part.read_bytes()
+
+    store.export(db_path)
+    assert archive_sessions(db_path, archive_dir, keep_days=30, today=date(2024, 6, 1),
+                            max_id=store.archive_limits()[0]) == {"2024-03": 1}
+    assert first_part.read_bytes() == written   # earlier part left alone
+    assert [p.name for p in month_files(archive_dir, "2024-03")] == [
+        "face_attendance_2024-03.000000000001.csv.gz", "face_attendance_2024-03.000000000002.csv.gz"
+    ]
+    assert [r["id"] for r in read_archived(archive_dir)] == [1, 2]
+    assert store.worker_minutes("2024-03-01", "2024-03-31") == {"Worker_A": 120.0}
@@ -0,0 +1,61 @@
+import sqlite3
+from datetime import datetime
+
+from attendance.logic.session_manager import SessionManager
+
+
+def test_incremental_compaction_is_idempotent(db_path, reader):
+    sm = SessionManager(str(db_path), batch_size=2)
+
+    sm.append_event("Worker_A", "IN", datetime(2024, 6, 3, 8, 0))
+    sm.append_event("Worker_B", "IN", datetime(2024, 6, 3, 8, 30))
+    sm.append_event("Worker_A", "OUT", datetime(2024, 6, 3, 12, 0))
+    assert sm.process_events() == 1
+    assert sm.process_events() == 0   # nothing new, nothing re-inserted
+
+    # Worker_B's IN was held open across runs
+    sm.append_event("Worker_B", "OUT", datetime(2024, 6, 3, 9, 0))
+    assert sm.process_events() == 1
+
+    records = sorted(reader.read_attendance_log("2024-06-03", "2024-06-03"), key=lambda r: r['person_id'])
+    assert [(r['person_id'], r['in_time'], r['out_time'], r['duration_sec']) for r in records] == [
+        ("Worker_A", "08:00:00", "12:00:00", 14400.0),
+        ("Worker_B", "08:30:00", "09:00:00", 1800.0),
+    ]
+
+
+def test_compaction_closes_session_left_open_by_live_writer(db_path, writer, reader):
+    sm = SessionManager(str(db_path))
+
+    writer.log_entry("Worker_A", datetime(2024, 6, 3, 8, 0))
+    sm.append_event("Worker_A", "IN", datetime(2024, 6, 3, 8, 0))
+    sm.append_event("Worker_A", "OUT", datetime(2024, 6, 3, 10, 0))
+    sm.process_events()
+
+    records = reader.read_attendance_log("2024-06-03", "2024-06-03")
+    assert len(records) == 1
+    assert records[0]['out_time'] == "10:00:00" and not records[0]['is_active']
+
+
+def test_compaction_matches_rows_written_by_the_old_script(db_path, reader):
+    sm = SessionManager(str(db_path))
+    sm.append_event("Worker_A", "IN", datetime(2024, 6, 3, 8, 0))
+    sm.append_event("Worker_A", "OUT", datetime(2024, 6, 3, 12, 0))
+
+    # What the old process_events left behind: default sqlite3 adapter text, no date
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO face_attendance (person_id, in_time, out_time, duration_seconds) VALUES (?, ?, ?, ?)",
+            ("Worker_A", datetime(2024, 6, 3, 8, 0), datetime(2024, 6, 3, 12, 0), 14400.0)
+        )
+    assert conn.execute("SELECT in_time, date FROM face_attendance").fetchall() == [("2024-06-03 08:00:00", None)]
+    conn.close()
+
+    sm.process_events()
+    # The legacy row was corrected in place, not duplicated
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM face_attendance").fetchone()[0] == 1
+    conn.close()
+    records = reader.read_attendance_log("2024-06-03", "2024-06-03")
+    assert [(r['person_id'], r['in_time'], r['out_time']) for r in records] == [("Worker_A", "08:00:00", "12:00:00")]
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import numpy as np
+
+from utils.clock import SimulatedClock
+from tracking.person_tracker import TrackedPerson, PersonTracker
+from attendance.state.state_manager import StateManager, CheckoutScheduler
+
+
+def crowd(count, start):
+    people = [TrackedPerson(f"Worker_{i:03d}", np.ones(8), now=start) for i in range(count)]
+    people.append(TrackedPerson("UNKNOWN_000001", np.ones(8), now=start))
+    return people
+
+
+def test_array_and_loop_paths_agree():
+    start = datetime(2024, 6, 3, 8, 0).timestamp()
+    results = []
+    for array_min_tracks in (1, 10 ** 6):
+        state_manager = StateManager(in_threshold=10, out_threshold=20, array_min_tracks=array_min_tracks)
+        people = crowd(100, start)
+        for i, person in enumerate(people):
+            person.active_duration = 15 if i % 2 else 5
+        entered = state_manager.process_frame(people, now=start + 15)
+        assert state_manager.process_frame(people, now=start + 16) == []   # nobody changed
+
+        for i, person in enumerate(people):
+            person.last_seen = start + 15 if i < 50 else start + 39   # first half gone for 25s
+        left = state_manager.process_frame(people, now=start + 40)
+        results.append((entered, left))
+
+    assert results[0] == results[1]
+    entered, left = results[0]
+    assert len(entered) == 50 and all(t.kind == "IN" for t in entered)
+    assert [t.person_id for t in left] == [f"Worker_{i:03d}" for i in range(1, 50, 2)]
+    assert all(t.duration == 25.0 for t in left)
+
+
+def test_frame_transitions_written_in_one_batch(writer, reader):
+    state_manager = StateManager(in_threshold=10, out_threshold=20)
+
+    start = datetime(2024, 6, 3, 8, 0).timestamp()
+    people = crowd(3, start)
+    for person in people:
+        person.active_duration = 12
+    state_manager.dispatch(state_manager.process_frame(people, now=start + 12), writer)
+    assert sum(r['is_active'] for r in reader.read_attendance_log("2024-06-03", "2024-06-03")) == 3
+
+    state_manager.dispatch(state_manager.process_frame(people, now=start + 60), writer)
+    records = reader.read_attendance_log("2024-06-03", "2024-06-03")
+    assert [(r['in_time'], r['out_time'], r['is_active']) for r in records] == [("08:00:12", "08:01:00", False)] * 3
+
+
+def test_checkout_fires_after_tracker_dropped_the_track():
+    start = datetime(2024, 6, 3, 8, 0).timestamp()
+    clock = SimulatedClock(start)
+    # Tracks vanish after 5s, long before the 20s check-out threshold
+    tracker = PersonTracker(disappear_time=5, clock=clock)
+    state_manager = StateManager(in_threshold=10, out_threshold=20, clock=clock)
+    emb = np.ones(8, dtype=np.float32)
+
+    transitions = []
+    # In view 0-15s, away 15-25s, back 25-30s, then gone
+    for frame in range(600):
+        now = clock.advance(0.1)
+        visible = frame < 150 or 250 <= frame < 300
+        detections = [("Worker_1", emb, (100, 100, 80, 80))] if visible else []
+        transitions += state_manager.process_frame(tracker.update(detections).values())
+
+    assert [t.kind for t in transitions] == ["IN", "OUT"]
+    # Re-found under a new track at 25s: the session runs from 10.1s until 20s after the last sighting
+    assert abs((transitions[1].out_time - datetime.fromtimestamp(start)).total_seconds() - 50.0) < 0.15
+    assert len(state_manager.checkouts) == 0
+
+
+def test_checkout_scheduler_rearm_and_cancel():
+    scheduler = CheckoutScheduler()
+    scheduler.arm("A", 10.0)
+    scheduler.arm("B", 12.0)
+    scheduler.arm("A", 15.0)    # re-armed: the 10.0 entry is dead
+    scheduler.arm("C", 11.0)
+    scheduler.cancel("C")
+    assert scheduler.pop_due(12.0) == ["B"]
+    assert scheduler.pop_due(14.9) == []
+    assert scheduler.pop_due(15.0) == ["A"]
+    assert len(scheduler) == 0
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from tracking.person_tracker import TrackedPerson
+from tracking.unknown_snapshots import UnknownSnapshotter, thumbnail_path
+
+
+def frame_with_face(sharp):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    face = np.random.default_rng(0).integers(0, 255, (80, 80, 3), dtype=np.uint8)
+    if not sharp:
+        face = cv2.GaussianBlur(face, (15, 15), 5)
+    frame[80:160, 120:200] = face
+    return frame
+
+
+def test_best_crop_per_unknown_track_is_written_once(tmp_path):
+    sightings = []
+    snapshotter = UnknownSnapshotter(
+        tmp_path / "snaps", sink=lambda path, conf, emb: sightings.append(path),
+        settle_sec=1.0, min_sightings=3
+    )
+    unknown = TrackedPerson("UNKNOWN_ab12cd", np.ones(8), (120, 80, 80, 80), now=0.0)
+    known = TrackedPerson("Worker_A", np.ones(8), (0, 0, 80, 80), now=0.0)
+    tracked = {"UNKNOWN_ab12cd": unknown, "Worker_A": known}
+
+    for i, sharp in enumerate((False, True, False, False, False)):
+        snapshotter.observe(tracked, frame_with_face(sharp), now=i * 0.5)
+    snapshotter.close()
+
+    assert len(sightings) == 1
+    path = sightings[0]
+    assert os.path.exists(path) and thumbnail_path(path).exists()
+    assert cv2.imread(str(thumbnail_path(path))).shape == (128, 128, 3)
+    # The sharp frame won: far more high-frequency detail than the blurred ones
+    saved = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    assert cv2.Laplacian(saved, cv2.CV_32F).var() > 1000
+
+
+def test_snapshot_dir_stays_under_budget(tmp_path):
+    snapshotter = UnknownSnapshotter(tmp_path / "snaps", max_bytes=60_000, settle_sec=0, min_sightings=1)
+    for i in range(20):
+        person = TrackedPerson(f"UNKNOWN_{i:06d}", np.ones(8), (120, 80, 80, 80), now=float(i))
+        snapshotter.observe({person.person_id: person}, frame_with_face(True), now=float(i))
+    snapshotter.close()
+
+    total = sum(p.stat().st_size for p in (tmp_path / "snaps").iterdir())
+    assert 0 < total <= 60_000
+    names = {p.name for p in (tmp_path / "snaps").iterdir()}
+    # Pairs are evicted together
+    assert all(n.replace(".thumb.jpg", ".jpg") in names for n in names)
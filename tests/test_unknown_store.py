@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from database.unknown_store import UnknownDetectionStore
+
+
+def face(seed, noise=0.0):
+    rnd = np.random.default_rng(seed)
+    return rnd.normal(size=128) + noise * np.random.default_rng(seed + 1000).normal(size=128)
+
+
+def test_repeat_sightings_fold_into_one_stranger(session_factory):
+    store = UnknownDetectionStore(session_factory, capacity=2, check_interval=0)
+    start = datetime(2024, 6, 3, 9, 0)
+
+    for i in range(50):
+        store.add_detection(f"snap_a_{i}.jpg", 0.9, face(1, noise=0.2), now=start + timedelta(seconds=i))
+    store.add_detection("snap_b.jpg", 0.8, face(2), now=start + timedelta(minutes=5))
+    store.add_detection("snap_c.jpg", 0.7, face(3), now=start + timedelta(minutes=6))
+
+    # Ring holds the two most recent strangers; all three persist
+    entries = store.get_all()
+    assert [e['snapshot_path'] for e in entries] == ["snap_c.jpg", "snap_b.jpg"]
+
+    reloaded = UnknownDetectionStore(session_factory, capacity=10)
+    entries = reloaded.get_all()
+    assert [e['count'] for e in entries] == [1, 1, 50]
+
+    stranger_a = entries[-1]['id']
+    assert reloaded.dismiss(stranger_a)
+    assert not reloaded.dismiss(stranger_a)
+    assert not reloaded.dismiss("not-an-id")
+    assert reloaded.count() == 2
+
+    # Without an embedding every sighting is its own entry
+    reloaded.add_detection("snap_d.jpg", 0.5)
+    reloaded.add_detection("snap_d.jpg", 0.5)
+    assert reloaded.count() == 4
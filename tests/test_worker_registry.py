@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from database.models import Worker
+from database import worker_registry
+from database.worker_registry import WorkerRegistry
+
+
+def enroll(root, worker_id, color):
+    folder = root / worker_id
+    folder.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(folder / f"{worker_id}_{color}.jpg"), np.full((200, 300, 3), color, dtype=np.uint8))
+
+
+def test_registry_syncs_and_invalidates(tmp_path, monkeypatch, session_factory):
+    root = tmp_path / "known_faces"
+    enroll(root, "Worker_B", 10)
+    enroll(root, "Worker_A", 200)
+
+    registry = WorkerRegistry(root, session_factory, check_interval=0)
+    assert registry.worker_ids() == ["Worker_A", "Worker_B"]
+
+    info = registry.get("Worker_A")
+    assert info.name == "Worker A"
+    assert cv2.imdecode(np.frombuffer(info.thumbnail, np.uint8), cv2.IMREAD_COLOR).shape == (128, 128, 3)
+    assert info.etag.startswith('"')
+
+    # Persisted: a fresh registry reads the table without regenerating thumbnails
+    db = session_factory()
+    assert db.query(Worker).count() == 2
+    db.close()
+    monkeypatch.setattr(worker_registry, "make_thumbnail", lambda image_path: pytest.fail("thumbnail regenerated"))
+    fresh = WorkerRegistry(root, session_factory, check_interval=0)
+    assert fresh.get("Worker_A").etag == info.etag
+    monkeypatch.undo()
+
+    # Profile image overwritten in place (folder mtime unchanged) is picked up
+    time.sleep(0.01)
+    cv2.imwrite(str(root / "Worker_A" / "Worker_A_200.jpg"), np.full((200, 300, 3), 30, dtype=np.uint8))
+    overwritten = registry.get("Worker_A").etag
+    assert overwritten != info.etag
+
+    # New photo in an existing folder and a new worker are both picked up
+    time.sleep(0.01)
+    (root / "Worker_A" / "Worker_A_200.jpg").unlink()
+    enroll(root, "Worker_A", 90)
+    enroll(root, "Worker_C", 50)
+    assert registry.worker_ids() == ["Worker_A", "Worker_B", "Worker_C"]
+    assert registry.get("Worker_A").etag not in (info.etag, overwritten)
+
+    # Cached between checks
+    slow = WorkerRegistry(root, session_factory, check_interval=60)
+    assert len(slow.worker_ids()) == 3
+    enroll(root, "Worker_D", 70)
+    assert len(slow.worker_ids()) == 3
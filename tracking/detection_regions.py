@@ -0,0 +1,137 @@
+import numpy as np
+
+
+def tile_windows(x0, y0, width, height, tile_size, overlap=0.25):
+    """
+    Split the area (x0, y0, width, height) into square tiles of `tile_size`
+    pixels overlapping by `overlap` (fraction of a tile). Edge tiles are
+    shifted inwards rather than shrunk, so every tile has the same size.
+    returns: list of (x, y, w, h)
+    """
+    if tile_size >= width and tile_size >= height:
+        return [(x0, y0, width, height)]
+
+    step = max(1, int(tile_size * (1.0 - overlap)))
+
+    def starts(length):
+        if tile_size >= length:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        positions.append(length - tile_size)
+        return positions
+
+    tile_w = min(tile_size, width)
+    tile_h = min(tile_size, height)
+    return [
+        (x0 + x, y0 + y, tile_w, tile_h)
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def detection_windows(frame_shape, rois=None, tile_size=None, overlap=0.25):
+    """
+    Windows a detector should run on for one frame: the configured ROIs
+    (or the full frame), each optionally split into native-resolution tiles.
+    ROIs are clipped to the frame.
+    """
+    frame_h, frame_w = frame_shape[:2]
+    areas = rois if rois else [(0, 0, frame_w, frame_h)]
+
+    windows = []
+    for (x, y, w, h) in areas:
+        x1, y1 = max(0, int(x)), max(0, int(y))
+        x2, y2 = min(frame_w, int(x + w)), min(frame_h, int(y + h))
+        if x2 <= x1 or y2 <= y1:
+            continue
+        if tile_size:
+            windows.extend(tile_windows(x1, y1, x2 - x1, y2 - y1, tile_size, overlap))
+        else:
+            windows.append((x1, y1, x2 - x1, y2 - y1))
+    return windows
+
+
+def overlap_ratio(boxA, boxB):
+    """
+    Intersection over the SMALLER box. Unlike IOU this is close to 1 when
+    a tile edge cut a face in half and the half-box lies inside the full one.
+    """
+    xA = max(boxA[0], boxB[0])
+    yA = max(boxA[1], boxB[1])
+    xB = min(boxA[0] + boxA[2], boxB[0] + boxB[2])
+    yB = min(boxA[1] + boxA[3], boxB[1] + boxB[3])
+
+    interArea = max(0, xB - xA) * max(0, yB - yA)
+    minArea = min(boxA[2] * boxA[3], boxB[2] * boxB[3])
+
+    if minArea == 0:
+        return 0.0
+
+    return interArea / minArea
+
+
+def merge_detections(detections, threshold=0.5):
+    """
+    Greedy suppression of duplicates found in overlapping windows.
+    detections: list of (bbox, score, payload)
+    Larger, higher scoring boxes win.
+    """
+    ordered = sorted(
+        detections,
+        key=lambda d: (d[1], d[0][2] * d[0][3]),
+        reverse=True
+    )
+
+    kept = []
+    for det in ordered:
+        if all(overlap_ratio(det[0], k[0]) < threshold for k in kept):
+            kept.append(det)
+    return kept
+
+
+class RegionDetector:
+    """
+    Runs a detector only on configured regions of interest and/or on tiles
+    at native resolution, then stitches the results back into full-frame
+    coordinates.
+
+    detect_fn(image) -> list of (bbox, score, payload) with bbox (x, y, w, h)
+    relative to the image it was given. Payloads are passed through untouched.
+    """
+
+    def __init__(self, detect_fn, rois=None, tile_size=None, tile_overlap=0.25, merge_threshold=0.5):
+        self.detect_fn = detect_fn
+        self.rois = rois
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.merge_threshold = merge_threshold
+
+    @classmethod
+    def from_config(cls, detect_fn, cfg):
+        cfg = cfg or {}
+        return cls(
+            detect_fn,
+            rois=cfg.get("rois"),
+            tile_size=cfg.get("tile_size"),
+            tile_overlap=cfg.get("tile_overlap", 0.25)
+        )
+
+    @property
+    def is_full_frame(self):
+        return not self.rois and not self.tile_size
+
+    def detect(self, frame):
+        if self.is_full_frame:
+            return self.detect_fn(frame)
+
+        windows = detection_windows(frame.shape, self.rois, self.tile_size, self.tile_overlap)
+
+        results = []
+        for (x, y, w, h) in windows:
+            crop = np.ascontiguousarray(frame[y:y + h, x:x + w])
+            for (bx, by, bw, bh), score, payload in self.detect_fn(crop):
+                results.append(((bx + x, by + y, bw, bh), score, payload))
+
+        if len(windows) > 1:
+            results = merge_detections(results, self.merge_threshold)
+        return results
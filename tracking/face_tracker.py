@@ -1,7 +1,8 @@
-import time
 import math
 import uuid
 
+from utils.clock import SYSTEM_CLOCK
+
 
 def compute_iou(boxA, boxB):
     """
@@ -41,8 +42,10 @@ class FaceTracker:
         self,
         iou_threshold=0.3,
         centroid_threshold=60,
-        track_timeout=2.0
+        track_timeout=2.0,
+        clock=None
     ):
+        self.clock = clock or SYSTEM_CLOCK
         self.iou_threshold = iou_threshold
         self.centroid_threshold = centroid_threshold
         self.track_timeout = track_timeout
@@ -60,7 +63,7 @@ class FaceTracker:
         returns: list of tracked faces
         """
         if timestamp is None:
-            timestamp = time.time()
+            timestamp = self.clock.now()
 
         updated_tracks = {}
         used_detections = set()
@@ -0,0 +1,142 @@
+import time
+import numpy as np
+
+from utils.clock import SYSTEM_CLOCK
+from utils.metrics import metrics, COUNT_BUCKETS
+
+STAGES = ("detect", "embed", "resolve", "track", "state")
+
+
+def deepface_embed(face_img):
+    from deepface import DeepFace  # heavy import, only when embeddings are needed
+    return DeepFace.represent(
+        img_path=face_img,
+        model_name="Facenet512",
+        detector_backend="skip",
+        enforce_detection=False,
+        align=False
+    )[0]["embedding"]
+
+
+class FramePipeline:
+    """
+    The per-frame chain shared by the live camera loop and offline replay:
+    face detection -> embedding -> IdentityResolver -> PersonTracker ->
+    StateManager. Keeps cumulative per-stage timings.
+
+    One timestamp is taken from `clock` per frame and handed to every
+    stage, so a SimulatedClock gives replayed runs exact durations.
+    An optional UnknownSnapshotter sees the tracks after every frame.
+    """
+
+    def __init__(self, face_detector, resolver, tracker, state_manager, writer,
+                 embed_fn=deepface_embed, min_face_size=60, clock=None, snapshotter=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.face_detector = face_detector
+        self.resolver = resolver
+        self.tracker = tracker
+        self.state_manager = state_manager
+        self.writer = writer
+        self.embed_fn = embed_fn
+        self.min_face_size = min_face_size
+        self.snapshotter = snapshotter
+
+        self.frames = 0
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+
+    def process(self, rgb_frame, now=None):
+        """
+        rgb_frame: RGB image
+        now: frame timestamp (epoch seconds); read from the clock if None
+        returns: (people, tracked) where people is [(person_id, embedding, bbox)]
+        """
+        if now is None:
+            now = self.clock.now()
+
+        timings = dict.fromkeys(STAGES, 0.0)
+        frame_h, frame_w = rgb_frame.shape[:2]
+
+        t0 = time.perf_counter()
+        # Runs on configured gate ROIs / tiles, boxes in frame coordinates
+        detections = self.face_detector.detect(rgb_frame)
+        t1 = time.perf_counter()
+        timings["detect"] += t1 - t0
+
+        people = []
+
+        for (x, y, w, h), _, face_img in detections:
+            if w < self.min_face_size or h < self.min_face_size or (w > frame_w * 0.9 and h > frame_h * 0.9):
+                continue
+
+            if isinstance(face_img, tuple):
+                face_img = face_img[0]
+
+            if face_img is None:
+                continue
+
+            t0 = time.perf_counter()
+            emb = np.array(self.embed_fn(face_img), dtype=np.float32)
+            t1 = time.perf_counter()
+            timings["embed"] += t1 - t0
+
+            person_id, _ = self.resolver.resolve(emb)
+            timings["resolve"] += time.perf_counter() - t1
+
+            people.append((person_id, emb, (x, y, w, h)))
+
+        t0 = time.perf_counter()
+        # PersonTracker marks matched detections in place; hand it a copy
+        tracked = self.tracker.update(list(people), now=now)
+        t1 = time.perf_counter()
+        timings["track"] += t1 - t0
+
+        # All tracks at once; the frame's check-ins / check-outs go to the writer as one batch
+        transitions = self.state_manager.process_frame(list(tracked.values()), now=now)
+        self.state_manager.dispatch(transitions, self.writer)
+        timings["state"] += time.perf_counter() - t1
+
+        if self.snapshotter is not None:
+            # Copies the best face crop per unknown track; encoding happens off-thread
+            self.snapshotter.observe(tracked, rgb_frame, now)
+
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] += seconds
+        self.frames += 1
+
+        if metrics.enabled:
+            self._record_metrics(timings, people, tracked)
+
+        return people, tracked
+
+    def _record_metrics(self, timings, people, tracked):
+        for stage, seconds in timings.items():
+            metrics.histogram("ffm_stage_seconds", stage=stage).observe(seconds)
+        metrics.histogram("ffm_frame_seconds").observe(sum(timings.values()))
+        metrics.histogram("ffm_faces_per_frame", buckets=COUNT_BUCKETS).observe(len(people))
+
+        unknown = sum(1 for person_id, _, _ in people if person_id == "UNKNOWN")
+        metrics.counter("ffm_detections_total", result="unknown").inc(unknown)
+        metrics.counter("ffm_detections_total", result="known").inc(len(people) - unknown)
+        metrics.counter("ffm_frames_total").inc()
+        metrics.gauge("ffm_tracked_people").set(len(tracked))
+
+    def flush(self, now):
+        """
+        Close every open session as if the gate stayed empty past the
+        check-out threshold (end of a replay).
+        """
+        exit_time = now + self.state_manager.out_threshold
+        transitions = self.state_manager.process_frame(list(self.tracker.tracked_people.values()), now=exit_time)
+        self.state_manager.dispatch(transitions, self.writer)
+
+    def stage_report(self):
+        """Per-stage mean ms/frame and share of pipeline time"""
+        total = sum(self.stage_seconds.values()) or 1.0
+        frames = self.frames or 1
+        return {
+            stage: {
+                "ms_per_frame": round(seconds * 1000 / frames, 3),
+                "share": round(seconds / total, 3)
+            }
+            for stage, seconds in self.stage_seconds.items()
+        }
@@ -1,14 +1,50 @@
 import cv2
 import time
+import threading
+import logging
+from collections import namedtuple
+
+from tracking.detection_regions import RegionDetector
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Published as a single object so readers never see a count from one sample
+# paired with the timestamp of another.
+OccupancySnapshot = namedtuple(
+    "OccupancySnapshot", ["count", "timestamp", "fps", "latency_ms"]
+)
 
 
 class OccupancyCounter:
-    def __init__(self, model_path, config_path, confidence_threshold=0.5, process_interval=1.0):
+    def __init__(self, model_path, config_path, confidence_threshold=0.5, process_interval=1.0,
+                 engine=None, camera_id=0, regions=None):
         self.net = cv2.dnn.readNetFromCaffe(config_path, model_path)
         self.confidence_threshold = confidence_threshold
         self.process_interval = process_interval
+
+        # Optional OccupancyEngine turning person boxes into an inside-count
+        self.engine = engine
+        self.camera_id = camera_id
+
+        # Optional ROIs / tiling (see tracking/detection_regions.py)
+        self.region_detector = RegionDetector.from_config(self._detect_window, regions)
+
         self.last_process_time = 0
-        self.current_count = 0
+        self.snapshot = OccupancySnapshot(0, 0.0, 0.0, 0.0)
+
+        # Background sampling state (see start())
+        self._thread = None
+        self._running = False
+        self._frame_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._wants_frame = False
+        self._latest_frame = None
+
+    @property
+    def current_count(self):
+        return self.snapshot.count
 
     def count_people(self, frame):
         current_time = time.time()
@@ -19,9 +55,24 @@ class OccupancyCounter:
 
         self.last_process_time = current_time
 
-        (h, w) = frame.shape[:2]
+        started = time.perf_counter()
+        count = self._detect(frame, current_time)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        self._publish(count, current_time, latency_ms)
+        return count
+
+    def detect_people(self, frame):
+        """
+        Run MobileNet-SSD on the frame (or its configured regions).
+        returns: list of person boxes (x, y, w, h) in frame coordinates
+        """
+        return [bbox for bbox, _, _ in self.region_detector.detect(frame)]
+
+    def _detect_window(self, image):
+        (h, w) = image.shape[:2]
         blob = cv2.dnn.blobFromImage(
-            cv2.resize(frame, (300, 300)),
+            cv2.resize(image, (300, 300)),
             0.007843,
             (300, 300),
             127.5
@@ -30,7 +81,7 @@ class OccupancyCounter:
         self.net.setInput(blob)
         detections = self.net.forward()
 
-        count = 0
+        people = []
 
         for i in range(detections.shape[2]):
             confidence = detections[0, 0, i, 2]
@@ -40,7 +91,120 @@ class OccupancyCounter:
 
                 # class_id 15 = person in MobileNet-SSD
                 if class_id == 15:
-                    count += 1
+                    x1, y1, x2, y2 = detections[0, 0, i, 3:7] * (w, h, w, h)
+                    x1, y1 = max(0, int(x1)), max(0, int(y1))
+                    x2, y2 = min(w, int(x2)), min(h, int(y2))
+                    people.append(((x1, y1, x2 - x1, y2 - y1), float(confidence), None))
 
-        self.current_count = count
-        return count
+        return people
+
+    def _detect(self, frame, timestamp):
+        boxes = self.detect_people(frame)
+
+        # With an engine configured the published count is the running
+        # inside-count from line crossings, not the boxes in this frame.
+        if self.engine is not None:
+            return self.engine.update(self.camera_id, boxes, timestamp)
+        return len(boxes)
+
+    def _publish(self, count, timestamp, latency_ms):
+        previous = self.snapshot
+        fps = previous.fps
+        if previous.timestamp > 0:
+            gap = timestamp - previous.timestamp
+            if gap > 0:
+                # Smooth so one slow sample doesn't make the dashboard jump
+                fps = 1.0 / gap if fps == 0 else 0.8 * fps + 0.2 * (1.0 / gap)
+
+        self.snapshot = OccupancySnapshot(count, timestamp, fps, latency_ms)
+        metrics.histogram("ffm_stage_seconds", stage="occupancy").observe(latency_ms / 1000.0)
+
+    # ---------------- BACKGROUND MODE ----------------
+
+    def start(self):
+        """
+        Run the SSD on its own thread, sampling the latest submitted frame
+        every `process_interval` seconds. The caller keeps feeding frames
+        with submit_frame() and reads `snapshot` without ever blocking.
+        """
+        if self._thread is not None:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="OccupancyCounter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        self._frame_ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit_frame(self, frame):
+        """
+        Offer a frame to the background sampler. Frames are only copied when
+        the sampler is actually waiting for one, so calling this every loop
+        iteration costs a flag check.
+        """
+        if not self._wants_frame:
+            return
+
+        with self._frame_lock:
+            if not self._wants_frame:
+                return
+            self._latest_frame = frame.copy()
+            self._wants_frame = False
+        self._frame_ready.set()
+
+    def _run(self):
+        while self._running:
+            tick = time.time()
+
+            self._frame_ready.clear()
+            with self._frame_lock:
+                self._latest_frame = None
+                self._wants_frame = True
+
+            # Timeout keeps stop() responsive when the camera stalls
+            if not self._frame_ready.wait(timeout=1.0):
+                continue
+            if not self._running:
+                break
+
+            with self._frame_lock:
+                frame = self._latest_frame
+                self._latest_frame = None
+
+            if frame is None:
+                continue
+
+            try:
+                self.last_process_time = time.time()
+                started = time.perf_counter()
+                count = self._detect(frame, self.last_process_time)
+                latency_ms = (time.perf_counter() - started) * 1000
+                self._publish(count, self.last_process_time, latency_ms)
+            except Exception as e:
+                logger.error(f"Occupancy sampling error: {e}")
+
+            remaining = self.process_interval - (time.time() - tick)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def stats(self):
+        """Freshness and throughput of the latest published count."""
+        snap = self.snapshot
+        stats = {
+            "count": snap.count,
+            "updated_at": snap.timestamp,
+            "age_sec": round(time.time() - snap.timestamp, 2) if snap.timestamp else None,
+            "fps": round(snap.fps, 2),
+            "latency_ms": round(snap.latency_ms, 1)
+        }
+        if self.engine is not None:
+            stats["in_view"] = self.engine.in_view()
+            stats["cameras"] = self.engine.camera_stats()
+        return stats
@@ -0,0 +1,204 @@
+import time
+from datetime import date
+
+from tracking.face_tracker import FaceTracker
+
+
+def _line_side(point, line):
+    """
+    Signed side of `point` relative to the directed line (a -> b).
+    Returns the cross product; its sign tells which side, its magnitude
+    (divided by the line length) the distance.
+    """
+    (ax, ay), (bx, by) = line
+    px, py = point
+    return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+
+def _point_in_polygon(point, polygon):
+    """Ray casting test, polygon given as [(x, y), ...]"""
+    x, y = point
+    inside = False
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y):
+            x_cross = (xj - xi) * (y - yi) / (yj - yi) + xi
+            if x < x_cross:
+                inside = not inside
+        j = i
+    return inside
+
+
+class EntryZone:
+    """
+    Boundary between "outside" and "inside" for one camera.
+
+    Either a line ((x1, y1), (x2, y2)) plus `inside_point`, any pixel known
+    to be on the inside of it, or a polygon covering the inside area.
+    Points closer than `margin` pixels to a line are ignored so people
+    standing on the line don't flap between sides.
+    """
+
+    def __init__(self, line=None, inside_point=None, polygon=None, margin=10):
+        if line is None and polygon is None:
+            raise ValueError("EntryZone needs a line or a polygon")
+        if line is not None and inside_point is None:
+            raise ValueError("EntryZone line needs an inside_point")
+
+        self.line = line
+        self.polygon = polygon
+        self.margin = margin
+
+        self._inside_sign = 0
+        self._line_length = 1.0
+        if line is not None:
+            (ax, ay), (bx, by) = line
+            self._line_length = max(((bx - ax) ** 2 + (by - ay) ** 2) ** 0.5, 1.0)
+            self._inside_sign = 1 if _line_side(inside_point, line) > 0 else -1
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            line=cfg.get("line"),
+            inside_point=cfg.get("inside_point"),
+            polygon=cfg.get("polygon"),
+            margin=cfg.get("margin", 10)
+        )
+
+    def side(self, point):
+        """True = inside, False = outside, None = too close to call"""
+        if self.polygon is not None:
+            return _point_in_polygon(point, self.polygon)
+
+        distance = _line_side(point, self.line) / self._line_length
+        if abs(distance) < self.margin:
+            return None
+        return (distance > 0) == (self._inside_sign > 0)
+
+
+class LineCrossingCounter:
+    """
+    Tracks person boxes from one camera and counts directional crossings
+    of its EntryZone.
+    """
+
+    def __init__(self, zone, iou_threshold=0.3, centroid_threshold=80, track_timeout=1.5):
+        self.zone = zone
+        self.tracker = FaceTracker(
+            iou_threshold=iou_threshold,
+            centroid_threshold=centroid_threshold,
+            track_timeout=track_timeout
+        )
+        self.track_sides = {}   # track_id -> last confirmed side
+        self.entries = 0
+        self.exits = 0
+        self.in_view = 0
+
+    @staticmethod
+    def _anchor(bbox):
+        # Bottom-centre of the box: where the person actually stands
+        x, y, w, h = bbox
+        return (x + w / 2.0, y + h)
+
+    def update(self, boxes, timestamp):
+        """
+        boxes: list of (x, y, w, h) person boxes in frame coordinates
+        returns: (entered, exited) during this update
+        """
+        tracks = self.tracker.update(boxes, timestamp)
+        self.in_view = len(boxes)
+
+        entered = 0
+        exited = 0
+        live_ids = set()
+
+        for track in tracks:
+            track_id = track["track_id"]
+            live_ids.add(track_id)
+
+            # Only tracks matched in this update carry a fresh position
+            if track["last_seen"] != timestamp:
+                continue
+
+            side = self.zone.side(self._anchor(track["bbox"]))
+            if side is None:
+                continue
+
+            previous = self.track_sides.get(track_id)
+            if previous is not None and previous != side:
+                if side:
+                    entered += 1
+                else:
+                    exited += 1
+            self.track_sides[track_id] = side
+
+        # Forget sides of tracks the tracker has dropped
+        for track_id in list(self.track_sides):
+            if track_id not in live_ids:
+                del self.track_sides[track_id]
+
+        self.entries += entered
+        self.exits += exited
+        return entered, exited
+
+
+class OccupancyEngine:
+    """
+    Running inside-count for the building, fed by per-camera
+    LineCrossingCounters. Reading the count is O(1); it is only changed
+    when someone crosses an entry line.
+    """
+
+    def __init__(self, zones, reset_daily=True):
+        """
+        zones: dict camera_id -> EntryZone (or its config dict)
+        """
+        self.counters = {}
+        for camera_id, zone in zones.items():
+            if isinstance(zone, dict):
+                zone = EntryZone.from_config(zone)
+            self.counters[camera_id] = LineCrossingCounter(zone)
+
+        self.reset_daily = reset_daily
+        self.inside_count = 0
+        self._day = date.today()
+
+    def update(self, camera_id, boxes, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        counter = self.counters.get(camera_id)
+        if counter is None:
+            return self.inside_count
+
+        if self.reset_daily:
+            day = date.fromtimestamp(timestamp)
+            if day != self._day:
+                # The plant empties overnight; drop any accumulated drift
+                self._day = day
+                self.inside_count = 0
+
+        entered, exited = counter.update(boxes, timestamp)
+        if entered or exited:
+            self.inside_count = max(0, self.inside_count + entered - exited)
+
+        return self.inside_count
+
+    def reset(self, inside_count=0):
+        self.inside_count = inside_count
+
+    def in_view(self):
+        return sum(c.in_view for c in self.counters.values())
+
+    def camera_stats(self):
+        return {
+            str(camera_id): {
+                "entries": c.entries,
+                "exits": c.exits,
+                "in_view": c.in_view
+            }
+            for camera_id, c in self.counters.items()
+        }
@@ -1,7 +1,8 @@
-import time
 import numpy as np
 import uuid
 
+from utils.clock import SYSTEM_CLOCK
+
 
 def compute_iou(boxA, boxB):
     # box: (x, y, w, h) -> convert to (x1, y1, x2, y2)
@@ -26,7 +27,7 @@ def compute_iou(boxA, boxB):
 
 
 class TrackedPerson:
-    def __init__(self, person_id, embedding, bbox=None):
+    def __init__(self, person_id, embedding, bbox=None, now=None):
         self.person_id = person_id
         
         # Store embedding
@@ -36,8 +37,11 @@ class TrackedPerson:
         # Store bbox 
         self.bbox = bbox
 
-        self.first_seen = time.time()
-        self.last_seen = time.time()
+        if now is None:
+            now = SYSTEM_CLOCK.now()
+
+        self.first_seen = now
+        self.last_seen = now
         
         # KEY FIX: "Active" Duration (only updated when visible)
         self.active_duration = 0.0 
@@ -45,7 +49,11 @@ class TrackedPerson:
         # Flag to indicate if seen in THIS current frame
         self.is_visible = True
 
-    def update(self, embedding, bbox=None):
+        # Set by StateManager when the person is checked IN / OUT
+        self.is_inside = False
+        self.in_time = None
+
+    def update(self, embedding, bbox=None, now=None):
         # Update embedding
         embedding = np.array(embedding, dtype=np.float32)
         self.embedding = embedding / np.linalg.norm(embedding)
@@ -53,7 +61,8 @@ class TrackedPerson:
         if bbox is not None:
             self.bbox = bbox
 
-        now = time.time()
+        if now is None:
+            now = SYSTEM_CLOCK.now()
         time_since_last = now - self.last_seen
         
         # Only add to duration if the gap is small (continuous tracking)
@@ -65,17 +74,20 @@ class TrackedPerson:
 
 
 class PersonTracker:
-    def __init__(self, similarity_threshold=0.6, iou_threshold=0.3, disappear_time=5):
+    def __init__(self, similarity_threshold=0.6, iou_threshold=0.3, disappear_time=5, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.tracked_people = {}
         self.similarity_threshold = similarity_threshold
         self.iou_threshold = iou_threshold
         self.disappear_time = disappear_time
 
-    def update(self, detections):
+    def update(self, detections, now=None):
         """
         detections: list of tuples (person_id, embedding, bbox)
+        now: frame timestamp (epoch seconds); read from the clock if None
         """
-        now = time.time()
+        if now is None:
+            now = self.clock.now()
         
         # 1. RESET VISIBILITY for all existing tracks
         for person in self.tracked_people.values():
@@ -121,7 +133,7 @@ class PersonTracker:
                     print(f"!!! UPGRADING TRACK: {existing_id} -> {person_id} !!!")
                     
                     # Create new track with old history
-                    new_track = TrackedPerson(person_id, embedding, bbox)
+                    new_track = TrackedPerson(person_id, embedding, bbox, now)
                     new_track.first_seen = track.first_seen
                     new_track.active_duration = track.active_duration
                     new_track.last_seen = now
@@ -144,7 +156,7 @@ class PersonTracker:
                     match_valid = False
                 
                 if match_valid:
-                    self.tracked_people[best_track_id].update(embedding, bbox)
+                    self.tracked_people[best_track_id].update(embedding, bbox, now)
                     used_track_ids.add(best_track_id)
                     detections[i] = (None, None, None) # Mark handled
 
@@ -156,7 +168,7 @@ class PersonTracker:
             if person_id != "UNKNOWN":
                 # 1. Update existing self
                 if person_id in self.tracked_people:
-                    self.tracked_people[person_id].update(embedding, bbox)
+                    self.tracked_people[person_id].update(embedding, bbox, now)
                     continue
                 
                 # 2. Try to find a LOST UNKNOWN track to upgrade
@@ -168,7 +180,7 @@ class PersonTracker:
                     track = self.tracked_people[match_id]
                     
                     # Create new track with old history
-                    new_track = TrackedPerson(person_id, embedding, bbox)
+                    new_track = TrackedPerson(person_id, embedding, bbox, now)
                     new_track.first_seen = track.first_seen
                     new_track.active_duration = track.active_duration
                     new_track.last_seen = now
@@ -179,7 +191,7 @@ class PersonTracker:
                     continue
                 
                 # 3. New Track (Do NOT merge into other Known tracks)
-                self.tracked_people[person_id] = TrackedPerson(person_id, embedding, bbox)
+                self.tracked_people[person_id] = TrackedPerson(person_id, embedding, bbox, now)
                 continue
 
             # B. HANDLE UNKNOWN IDENTITIES
@@ -192,11 +204,11 @@ class PersonTracker:
                  match_id = None 
 
             if match_id:
-                self.tracked_people[match_id].update(embedding, bbox)
+                self.tracked_people[match_id].update(embedding, bbox, now)
             else:
                 # NEW TRACK
                 temp_id = f"UNKNOWN_{uuid.uuid4().hex[:6]}"
-                self.tracked_people[temp_id] = TrackedPerson(temp_id, embedding, bbox)
+                self.tracked_people[temp_id] = TrackedPerson(temp_id, embedding, bbox, now)
 
         self._cleanup(now)
         return self.tracked_people
@@ -0,0 +1,189 @@
+"""
+Face snapshots of unknown people, taken off the frame loop.
+
+observe() runs once per frame: for each visible UNKNOWN_* track it scores
+the face crop (sharpness x size on a 64px grey copy) and keeps a copy of the
+best crop so far, never the frame. Once a track has stayed unknown for
+`settle_sec` and `min_sightings` frames its best crop is handed to a small
+thread pool, which JPEG-encodes it plus a square thumbnail and passes the
+path and embedding to `sink` (UnknownDetectionStore.add_detection). Tracks
+that vanish or get recognised before settling are dropped.
+
+The snapshot directory is capped at `max_bytes`: when a write pushes it over,
+the least recently used pairs (by mtime; the API touches files it serves)
+are deleted down to 90% of the budget.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SUFFIX = ".thumb.jpg"
+
+
+def thumbnail_path(snapshot_path):
+    """data/unknown_snapshots/x.jpg -> data/unknown_snapshots/x.thumb.jpg"""
+    snapshot_path = Path(snapshot_path)
+    return snapshot_path.with_name(snapshot_path.stem + THUMBNAIL_SUFFIX)
+
+
+def face_quality(crop):
+    """Higher for sharper, larger faces"""
+    import cv2
+    gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(small, cv2.CV_32F).var()) * min(crop.shape[:2])
+
+
+class _Candidate:
+    __slots__ = ("sightings", "quality", "crop", "embedding")
+
+    def __init__(self):
+        self.sightings = 0
+        self.quality = -1.0
+        self.crop = None
+        self.embedding = None
+
+
+class UnknownSnapshotter:
+    def __init__(self, snapshot_dir, sink=None, max_bytes=200 * 1024 * 1024,
+                 settle_sec=2.0, min_sightings=3, prefix="UNKNOWN",
+                 thumb_size=128, jpeg_quality=90, margin=0.2, workers=2):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.sink = sink
+        self.max_bytes = max_bytes
+        self.settle_sec = settle_sec
+        self.min_sightings = min_sightings
+        self.prefix = prefix
+        self.thumb_size = thumb_size
+        self.jpeg_quality = jpeg_quality
+        self.margin = margin
+
+        self._pending = {}       # track id -> _Candidate (frame loop only)
+        self._done = set()       # track ids already submitted
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot")
+        self._budget_lock = threading.Lock()
+        self._used_bytes = sum(size for _, size, _ in self._scan())
+
+    # ---------------- FRAME LOOP ----------------
+
+    def _crop(self, rgb_frame, bbox):
+        x, y, w, h = bbox
+        pad_x, pad_y = int(w * self.margin), int(h * self.margin)
+        frame_h, frame_w = rgb_frame.shape[:2]
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        return rgb_frame[y0:y1, x0:x1]
+
+    def observe(self, tracked, rgb_frame, now):
+        """tracked: PersonTracker.tracked_people after this frame's update"""
+        for track_id in [t for t in self._pending if t not in tracked]:
+            del self._pending[track_id]
+        self._done &= tracked.keys()
+
+        for track_id, person in tracked.items():
+            if not track_id.startswith(self.prefix) or track_id in self._done:
+                continue
+            if not person.is_visible or person.bbox is None:
+                continue
+            crop = self._crop(rgb_frame, person.bbox)
+            if crop is None:
+                continue
+
+            candidate = self._pending.setdefault(track_id, _Candidate())
+            candidate.sightings += 1
+            quality = face_quality(crop)
+            if quality > candidate.quality:
+                candidate.quality = quality
+                candidate.crop = crop.copy()
+                candidate.embedding = np.array(person.embedding, dtype=np.float32)
+
+            if candidate.sightings >= self.min_sightings and now - person.first_seen >= self.settle_sec:
+                del self._pending[track_id]
+                self._done.add(track_id)
+                self._executor.submit(self._write, track_id, candidate, now)
+
+    # ---------------- WORKERS ----------------
+
+    def _encode(self, rgb, size=None):
+        import cv2
+        img = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        if size is not None:
+            h, w = img.shape[:2]
+            side = min(h, w)
+            y0, x0 = (h - side) // 2, (w - side) // 2
+            img = cv2.resize(img[y0:y0 + side, x0:x0 + side], (size, size), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+    @staticmethod
+    def _write_file(path, data):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _write(self, track_id, candidate, now):
+        try:
+            path = self.snapshot_dir / f"{datetime.fromtimestamp(now):%Y%m%d_%H%M%S}_{track_id}.jpg"
+            full = self._encode(candidate.crop)
+            thumb = self._encode(candidate.crop, self.thumb_size)
+            # Both files land under the budget lock so eviction never sees half a pair
+            with self._budget_lock:
+                self._write_file(path, full)
+                self._write_file(thumbnail_path(path), thumb)
+                self._account(len(full) + len(thumb))
+
+            if self.sink is not None:
+                self.sink(str(path), 0.0, candidate.embedding)
+        except Exception as e:
+            logger.error(f"[SNAPSHOT] {track_id}: {e}")
+
+    # ---------------- DISK BUDGET ----------------
+
+    def _scan(self):
+        """[(stem, bytes, mtime)] per snapshot (full + thumbnail counted together)"""
+        groups = {}
+        for entry in os.scandir(self.snapshot_dir):
+            if not entry.is_file() or not entry.name.endswith(".jpg"):
+                continue
+            stem = entry.name[:-len(THUMBNAIL_SUFFIX)] if entry.name.endswith(THUMBNAIL_SUFFIX) else entry.name[:-4]
+            st = entry.stat()
+            size, mtime = groups.get(stem, (0, 0))
+            groups[stem] = (size + st.st_size, max(mtime, st.st_mtime_ns))
+        return [(stem, size, mtime) for stem, (size, mtime) in groups.items()]
+
+    def _account(self, nbytes):
+        """Called with _budget_lock held"""
+        self._used_bytes += nbytes
+        if self._used_bytes <= self.max_bytes:
+            return
+
+        snapshots = sorted(self._scan(), key=lambda s: s[2])
+        total = sum(size for _, size, _ in snapshots)
+        target = self.max_bytes * 0.9
+        for stem, size, _ in snapshots:
+            if total <= target:
+                break
+            for path in (self.snapshot_dir / f"{stem}.jpg", self.snapshot_dir / f"{stem}{THUMBNAIL_SUFFIX}"):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._used_bytes = total
+
+    def close(self):
+        """Finish queued encodes"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,33 @@
+"""
+Time sources for the tracking pipeline.
+
+Trackers and state machines take a frame timestamp (`now`) from the caller
+rather than reading the wall clock themselves; the clock is consulted once
+per frame by whoever drives the loop. SystemClock is the live camera,
+SimulatedClock is set or advanced by replay, tests and benchmarks so they
+can run far faster than real time with correct durations.
+"""
+import time
+
+
+class SystemClock:
+    def now(self):
+        return time.time()
+
+
+class SimulatedClock:
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def now(self):
+        return self._now
+
+    def set(self, timestamp):
+        self._now = float(timestamp)
+
+    def advance(self, seconds):
+        self._now += seconds
+        return self._now
+
+
+SYSTEM_CLOCK = SystemClock()
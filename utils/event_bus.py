@@ -0,0 +1,234 @@
+"""
+Local event bus from the tracking process to the API.
+
+The tracker runs an EventBus: a TCP server on 127.0.0.1 (Unix sockets are
+not an option on the Windows boxes this runs on) that sends every published
+event to connected subscribers as one JSON object per line:
+
+    {"seq": 42, "type": "check_in", "ts": 1718000000.0, "id": 7, "person_id": ...}
+
+Sequence numbers are per tracker run; each run has a new `epoch`. The last
+`ring_size` events are kept, so a subscriber that reconnects sends
+{"since": <last seq>, "epoch": <epoch>} and gets what it missed before the
+live stream. The first line back is a hello:
+
+    {"type": "hello", "epoch": ..., "seq": <latest seq>, "gap": bool}
+
+gap=true means events were lost (ring overrun or tracker restart) and the
+subscriber should rebuild its state from SQLite. A subscriber that can't keep
+up is disconnected rather than allowed to block the tracker; it reconnects
+and replays.
+"""
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("check_in", "check_out", "unknown", "occupancy", "health")
+
+
+def _encode(obj):
+    return (json.dumps(obj, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _Connection:
+    """One subscriber: a bounded send queue drained by its own thread"""
+
+    def __init__(self, sock, queue_size):
+        self.sock = sock
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, line):
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            logger.warning("[EVENTS] Subscriber too slow, disconnecting")
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+            try:
+                self.queue.put_nowait(None)  # wake the sender
+            except queue.Full:
+                pass  # it stops on `closed` / the dead socket anyway
+
+    def run(self):
+        try:
+            while not self.closed:
+                line = self.queue.get()
+                if line is None:
+                    break
+                self.sock.sendall(line)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+
+class EventBus:
+    def __init__(self, host="127.0.0.1", port=8765, ring_size=10000, queue_size=10000):
+        self.host = host
+        self.port = port             # 0 = pick a free port (see .port after start())
+        self.queue_size = queue_size
+        self.epoch = int(time.time() * 1000)
+
+        self._seq = 0
+        self._ring = deque(maxlen=ring_size)    # (seq, encoded line)
+        self._connections = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind((self.host, self.port))
+        self._server.listen()
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, name="event-bus", daemon=True).start()
+        logger.info(f"[EVENTS] Publishing on {self.host}:{self.port}")
+        return self
+
+    def publish(self, event_type, **data):
+        """Assign the next sequence number and fan the event out; never blocks"""
+        with self._lock:
+            self._seq += 1
+            event = {"seq": self._seq, "type": event_type, "ts": time.time(), **data}
+            line = _encode(event)
+            self._ring.append((self._seq, line))
+            self._connections = [c for c in self._connections if not c.closed]
+            for connection in self._connections:
+                connection.offer(line)
+        return event
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                break  # server closed
+            threading.Thread(target=self._serve, args=(sock,), name="event-bus-conn", daemon=True).start()
+
+    def _serve(self, sock):
+        try:
+            sock.settimeout(5.0)
+            request = json.loads(sock.makefile("rb").readline() or b"{}")
+            sock.settimeout(None)
+        except (OSError, ValueError):
+            sock.close()
+            return
+
+        since = int(request.get("since") or 0)
+        connection = _Connection(sock, self.queue_size + len(self._ring) + 1)
+        with self._lock:
+            oldest = self._ring[0][0] if self._ring else self._seq + 1
+            if request.get("epoch") != self.epoch:
+                # New tracker run: replay from the start if the ring still has it
+                gap = since > 0 or oldest > 1
+                since = 0
+            else:
+                gap = since < oldest - 1
+            connection.offer(_encode({"type": "hello", "epoch": self.epoch, "seq": self._seq, "gap": gap}))
+            for seq, line in self._ring:
+                if seq > since:
+                    connection.offer(line)
+            # Registered under the lock: nothing published in between is missed
+            self._connections.append(connection)
+        connection.run()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+
+
+class EventSubscriber:
+    """
+    Consumer side: keeps a connection to the EventBus, calls
+    handler(event) for every event in order (on its own thread) and replays
+    from the last seen seq after a reconnect. on_resync() is called when
+    events were lost, before any further events are handled.
+    """
+
+    def __init__(self, handler, host="127.0.0.1", port=8765, on_resync=None, reconnect_delay=2.0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.on_resync = on_resync
+        self.reconnect_delay = reconnect_delay
+
+        self.epoch = None
+        self.seq = 0
+        self.connected = False
+        self._stopped = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="event-subscriber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._consume()
+            except (OSError, ValueError) as e:
+                if self.connected:
+                    logger.warning(f"[EVENTS] Disconnected: {e}")
+            self.connected = False
+            self._stopped.wait(self.reconnect_delay)
+
+    def _consume(self):
+        with socket.create_connection((self.host, self.port), timeout=5.0) as sock:
+            self._sock = sock
+            sock.sendall(_encode({"since": self.seq, "epoch": self.epoch}))
+            stream = sock.makefile("rb")
+            hello = json.loads(stream.readline())
+            sock.settimeout(None)
+
+            if hello["epoch"] != self.epoch:
+                self.epoch = hello["epoch"]
+                self.seq = 0
+            if hello["gap"] and self.on_resync is not None:
+                self.on_resync()
+            self.connected = True
+
+            for line in stream:
+                event = json.loads(line)
+                if event["seq"] <= self.seq:
+                    continue
+                self.seq = event["seq"]
+                try:
+                    self.handler(event)
+                except Exception as e:
+                    logger.error(f"[EVENTS] Handler error on {event['type']}: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
@@ -0,0 +1,199 @@
+"""
+In-process metrics for the tracking loop.
+
+Histograms, counters and gauges aggregated in memory and rendered in the
+Prometheus text exposition format. When the registry is disabled every
+call returns immediately (span() hands back a shared no-op), so leaving
+the instrumentation in the hot path costs a couple of attribute lookups.
+
+    from utils.metrics import metrics
+
+    with metrics.span("ffm_stage_seconds", stage="detect"):
+        ...
+    metrics.counter("ffm_frames_dropped_total", reason="read_failed").inc()
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds: 1ms .. 10s, enough resolution for both Haar and RetinaFace on CPU
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+def _with_le(labels, le):
+    return _label_str(tuple(labels) + (("le", le),))
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Span:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _NullMetric:
+    """Stands in for every metric type while the registry is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+_NULL = _NullMetric()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._metrics = {}   # (kind, name, labels) -> metric
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, factory, name, labels):
+        key = (kind, name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def counter(self, name, **labels):
+        if not self.enabled:
+            return _NULL
+        return self._get("counter", Counter, name, labels)
+
+    def gauge(self, name, **labels):
+        if not self.enabled:
+            return _NULL
+        return self._get("gauge", Gauge, name, labels)
+
+    def histogram(self, name, buckets=DEFAULT_BUCKETS, **labels):
+        if not self.enabled:
+            return _NULL
+        return self._get("histogram", lambda: Histogram(buckets), name, labels)
+
+    def span(self, name, **labels):
+        """Context manager timing its body into a seconds histogram"""
+        if not self.enabled:
+            return _NULL
+        return _Span(self._get("histogram", Histogram, name, labels))
+
+    def timed(self, name, **labels):
+        """Decorator form of span()"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render_prometheus(self):
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda kv: (kv[0][1], kv[0][2]))
+
+        lines = []
+        declared = set()
+        for (kind, name, labels), metric in items:
+            if name not in declared:
+                declared.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            if kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric.buckets, metric.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_with_le(labels, bound)} {cumulative}")
+                cumulative += metric.counts[-1]
+                lines.append(f'{name}_bucket{_with_le(labels, "+Inf")} {cumulative}')
+                lines.append(f"{name}_sum{_label_str(labels)} {metric.sum:.6f}")
+                lines.append(f"{name}_count{_label_str(labels)} {metric.count}")
+            else:
+                lines.append(f"{name}{_label_str(labels)} {metric.value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Atomically replace `path` with the current exposition"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry, enabled by the entry point (run_system.py)
+metrics = MetricsRegistry(enabled=False)
+
+metrics.describe("ffm_stage_seconds", "Time per frame spent in each pipeline stage")
+metrics.describe("ffm_frame_seconds", "Total time to process one camera frame")
+metrics.describe("ffm_db_seconds", "Attendance DB write latency by operation")
+metrics.describe("ffm_faces_per_frame", "Faces passed to recognition per frame")
+metrics.describe("ffm_detections_total", "Recognised faces by result (known/unknown)")
+metrics.describe("ffm_frames_total", "Frames processed by the pipeline")
+metrics.describe("ffm_frames_dropped_total", "Camera frames not processed, by reason")
+metrics.describe("ffm_tracked_people", "Tracks currently held by PersonTracker")
@@ -0,0 +1,143 @@
+"""
+Opt-in sampling profiler for a live process.
+
+A background thread snapshots one thread's Python stack (the camera loop,
+by default the main thread) at a fixed rate for a bounded window, then
+writes the samples as collapsed stacks ("outer;inner;leaf count" per
+line). That file loads directly into speedscope or flamegraph.pl.
+
+Sampling only reads sys._current_frames(), so the profiled thread never
+pauses. A profile can be started at runtime by creating the control file
+(optionally containing {"duration": 20, "rate": 200}) or, where the
+platform has it, by sending SIGUSR1.
+"""
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MAX_RATE_HZ = 1000
+MAX_DURATION_SEC = 300
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir, rate_hz=100, duration=30, thread_id=None):
+        self.output_dir = Path(output_dir)
+        self.rate_hz = rate_hz
+        self.duration = duration
+        self.thread_id = thread_id or threading.main_thread().ident
+
+        self._sampler = None
+        self._watcher = None
+        self._labels = {}   # code object -> frame label
+
+    @property
+    def is_running(self):
+        return self._sampler is not None and self._sampler.is_alive()
+
+    def start(self, duration=None, rate_hz=None):
+        """Begin a profiling window. Returns False if one is already running."""
+        if self.is_running:
+            logger.info("[PROFILER] Already running, request ignored")
+            return False
+
+        duration = min(float(duration or self.duration), MAX_DURATION_SEC)
+        rate_hz = min(float(rate_hz or self.rate_hz), MAX_RATE_HZ)
+
+        self._sampler = threading.Thread(
+            target=self._sample, args=(duration, rate_hz),
+            name="SamplingProfiler", daemon=True
+        )
+        self._sampler.start()
+        logger.info(f"[PROFILER] Sampling for {duration:.0f}s at {rate_hz:.0f} Hz")
+        return True
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, duration, rate_hz):
+        interval = 1.0 / rate_hz
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + duration
+
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break   # profiled thread has exited
+
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stacks[";".join(reversed(stack))] += 1
+            samples += 1
+
+            time.sleep(interval)
+
+        self._write(stacks, samples, time.perf_counter() - started)
+
+    def _write(self, stacks, samples, elapsed):
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+            with open(path, "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            logger.info(f"[PROFILER] {samples} samples over {elapsed:.1f}s written to {path}")
+        except Exception as e:
+            logger.error(f"[PROFILER] Could not write profile: {e}")
+
+    # ---------------- TRIGGERS ----------------
+
+    def watch(self, control_file, poll_interval=1.0):
+        """
+        Start a profile whenever `control_file` appears. The file is deleted
+        once picked up; a JSON body may override duration / rate.
+        """
+        control_file = Path(control_file)
+
+        def poll():
+            while True:
+                if control_file.exists():
+                    options = {}
+                    try:
+                        text = control_file.read_text().strip()
+                        options = json.loads(text) if text else {}
+                    except Exception as e:
+                        logger.warning(f"[PROFILER] Ignoring bad control file: {e}")
+                    if not isinstance(options, dict):
+                        logger.warning(f"[PROFILER] Ignoring control file body (expected an object): {options!r}")
+                        options = {}
+                    try:
+                        control_file.unlink()
+                    except OSError:
+                        pass
+                    try:
+                        self.start(options.get("duration"), options.get("rate"))
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"[PROFILER] Ignoring bad control file options {options}: {e}")
+                time.sleep(poll_interval)
+
+        self._watcher = threading.Thread(target=poll, name="ProfilerWatcher", daemon=True)
+        self._watcher.start()
+
+    def install_signal_handler(self):
+        """SIGUSR1 starts a profile with the default settings (POSIX only)"""
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.start())
+        return True